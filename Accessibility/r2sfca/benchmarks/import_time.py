@@ -0,0 +1,111 @@
+"""
+Check the import-time budget of the R2SFCA package.
+
+Imports ``r2sfca`` in fresh interpreters with ``python -X importtime`` and
+reports the cumulative import time of the package and of its required
+dependencies (numpy and pandas). The check fails (exit status 1) if the
+package's own overhead on top of those dependencies exceeds the budget, or if
+``import r2sfca`` loads any of the optional heavy modules that are meant to be
+imported on first use (plotting, optimizers, sparse matrices).
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 150] [--repeat 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules that must not be loaded by a bare ``import r2sfca``
+LAZY_MODULES = [
+    "matplotlib",
+    "seaborn",
+    "scipy.optimize",
+    "scipy.sparse",
+    "scipy.stats",
+]
+
+REQUIRED = ["numpy", "pandas"]
+
+PACKAGE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def import_times(statement):
+    """Cumulative import time in ms of every top-level module of ``statement``."""
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Skip the header and nested imports
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def loaded_lazy_modules():
+    """Lazy modules present in ``sys.modules`` after ``import r2sfca``."""
+    code = (
+        "import sys, r2sfca; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    return [name for name in output.split(",") if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=150.0,
+        help="allowed import time of r2sfca on top of numpy and pandas",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Import the dependencies first so the package line only holds its own cost
+    statement = "; ".join(f"import {name}" for name in REQUIRED + ["r2sfca"])
+    runs = [import_times(statement) for _ in range(args.repeat)]
+    best = {
+        name: min(run.get(name, 0.0) for run in runs) for name in REQUIRED + ["r2sfca"]
+    }
+
+    for name in REQUIRED + ["r2sfca"]:
+        print(f"{name:10s} {best[name]:8.1f} ms")
+    print(f"{'total':10s} {sum(best.values()):8.1f} ms")
+
+    failed = False
+    if best["r2sfca"] > args.budget_ms:
+        print(
+            f"FAIL: r2sfca takes {best['r2sfca']:.1f} ms on top of its "
+            f"dependencies (budget {args.budget_ms:.0f} ms)"
+        )
+        failed = True
+    loaded = loaded_lazy_modules()
+    if loaded:
+        print(f"FAIL: import r2sfca loads {', '.join(loaded)}")
+        failed = True
+    if not failed:
+        print(f"OK: within the {args.budget_ms:.0f} ms budget, no lazy module loaded")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
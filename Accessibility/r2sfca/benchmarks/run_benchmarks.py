@@ -0,0 +1,213 @@
+"""
+Benchmark the R2SFCA package on synthetic tables of increasing size.
+
+For every table size this script times fij, tij, access_score, crowd_score,
+search_fij and solve_beta (minimize and adam) and records the wall time, the
+peak resident set size of the process and the throughput in pairs per second
+(pairs times evaluations per second where the number of evaluations is
+known). Each size runs in a fresh process so that peak memory is measured per
+size. Results are written as JSON so that runs can be compared over time.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 1e4 1e5 1e6] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Benchmark the working tree rather than an installed copy
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import r2sfca  # noqa: E402
+from r2sfca import R2SFCA  # noqa: E402
+from synthetic import COST_MODELS, make_od_pairs, table_shape  # noqa: E402
+
+OPERATIONS = [
+    "fij",
+    "tij",
+    "access_score",
+    "crowd_score",
+    "search_fij",
+    "solve_beta_minimize",
+    "solve_beta_adam",
+]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def operation(model, name, config):
+    """Callable running one benchmarked operation and its evaluation count."""
+    beta = config["beta"]
+    if name == "search_fij":
+        step = config["beta"] / 10
+        n_points = config["grid_points"]
+        end = step * n_points
+        return (
+            lambda: model.search_fij(
+                beta_range=(step, end - step / 2, step),
+                metrics=["cross_entropy", "correlation", "rmse"],
+            ),
+            n_points,
+        )
+    if name == "solve_beta_minimize":
+        return lambda: model.solve_beta(metric="cross_entropy"), None
+    if name == "solve_beta_adam":
+        epochs = config["adam_epochs"]
+        return (
+            lambda: model.solve_beta(
+                metric="cross_entropy", method="adam", num_epochs=epochs
+            ),
+            epochs,
+        )
+    return (lambda: getattr(model, name)(beta)), 1
+
+
+def run_size(config):
+    """Generate one table and time every operation on it (child process)."""
+    n_demand, n_supply, k = table_shape(
+        config["n_pairs"], config["pairs_per_demand"], config["supply_ratio"]
+    )
+    records = []
+
+    def record(name, wall, n_pairs, evaluations):
+        work = n_pairs * (evaluations or 1)
+        records.append(
+            {
+                "operation": name,
+                "n_pairs": n_pairs,
+                "n_demand": n_demand,
+                "n_supply": n_supply,
+                "evaluations": evaluations,
+                "wall_s": wall,
+                "peak_rss_mb": peak_rss_mb(),
+                "pairs_per_sec": work / wall if wall > 0 else None,
+            }
+        )
+
+    start = time.perf_counter()
+    table = make_od_pairs(
+        n_demand,
+        n_supply,
+        pairs_per_demand=k,
+        cost=config["cost"],
+        beta=config["beta"],
+        dtype=np.dtype(config["dtype"]),
+        seed=config["seed"],
+    )
+    n_pairs = len(table["TravelCost"])
+    record("generate", time.perf_counter() - start, n_pairs, 1)
+
+    start = time.perf_counter()
+    model = R2SFCA(table, observed_flow_col="O_Fij", dtype=config["dtype"])
+    record("construct", time.perf_counter() - start, n_pairs, 1)
+    del table
+
+    for name in config["operations"]:
+        func, evaluations = operation(model, name, config)
+        timings = []
+        for _ in range(config["repeat"]):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        record(name, min(timings), n_pairs, evaluations)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=float,
+        nargs="+",
+        default=[1e4, 1e5, 1e6],
+        help="approximate numbers of pairs (up to 1e8 with enough memory)",
+    )
+    parser.add_argument("--pairs-per-demand", type=int, default=100)
+    parser.add_argument(
+        "--supply-ratio",
+        type=float,
+        default=0.1,
+        help="supply locations per demand location",
+    )
+    parser.add_argument("--cost", choices=COST_MODELS, default="distance")
+    parser.add_argument("--dtype", choices=["float64", "float32"], default="float64")
+    parser.add_argument("--beta", type=float, default=0.1)
+    parser.add_argument("--grid-points", type=int, default=20)
+    parser.add_argument("--adam-epochs", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--operations", nargs="+", choices=OPERATIONS, default=OPERATIONS
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'pairs':>12s} {'operation':22s} {'wall_s':>9s} {'peak_mb':>9s} {'pairs/s':>10s}"
+    )
+    for size in args.sizes:
+        config = {
+            "n_pairs": int(size),
+            "pairs_per_demand": args.pairs_per_demand,
+            "supply_ratio": args.supply_ratio,
+            "cost": args.cost,
+            "dtype": args.dtype,
+            "beta": args.beta,
+            "grid_points": args.grid_points,
+            "adam_epochs": args.adam_epochs,
+            "repeat": args.repeat,
+            "operations": args.operations,
+            "seed": args.seed,
+        }
+        # A fresh process per size keeps the peak RSS of each size separate
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+            records = executor.submit(run_size, config).result()
+        for row in records:
+            peak = row["peak_rss_mb"]
+            print(
+                f"{row['n_pairs']:12d} {row['operation']:22s} {row['wall_s']:9.4f} "
+                f"{peak if peak is not None else float('nan'):9.1f} "
+                f"{row['pairs_per_sec']:10.3g}"
+            )
+        results.extend(records)
+
+    metadata = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "r2sfca_version": r2sfca.__version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump({"metadata": metadata, "results": results}, fh, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
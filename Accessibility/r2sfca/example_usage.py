@@ -6,12 +6,10 @@ This script demonstrates the main features and usage patterns of the R2SFCA pack
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from r2sfca import R2SFCA, DecayFunction
+from r2sfca import R2SFCA
 from r2sfca.utils import (
     plot_grid_search_results,
     plot_model_comparison,
-    create_summary_table,
 )
 
 
@@ -183,33 +181,27 @@ def example_model_comparison():
     # Create sample data
     df = create_sample_data(n_demand=20, n_supply=8)
 
-    # Compare different decay functions
+    # Compare different decay functions on one shared copy of the pairs
     decay_functions = ["exponential", "power", "gaussian"]
-    results_list = []
-    labels = []
-
-    for decay_func in decay_functions:
-        print(f"Testing {decay_func} decay function...")
-
-        model = R2SFCA(
-            df=df,
-            demand_col="Demand",
-            supply_col="Supply",
-            travel_cost_col="TravelCost",
-            demand_id_col="DemandID",
-            supply_id_col="SupplyID",
-            observed_flow_col="O_Fij",
-            decay_function=decay_func,
-        )
-
-        # Grid search
-        results = model.search_fij(
-            beta_range=(0.0, 2.0, 0.1),
-            metrics=["cross_entropy", "fij_flow_correlation"],
-        )
-
-        results_list.append(results)
-        labels.append(decay_func.title())
+    model = R2SFCA(
+        df=df,
+        demand_col="Demand",
+        supply_col="Supply",
+        travel_cost_col="TravelCost",
+        demand_id_col="DemandID",
+        supply_id_col="SupplyID",
+        observed_flow_col="O_Fij",
+    )
+
+    # Grid search every decay function (n_jobs=-1 runs them concurrently)
+    summary, results = model.compare_decay_functions(
+        decay_functions=decay_functions,
+        beta_range=(0.0, 2.0, 0.1),
+        metrics=["cross_entropy", "fij_flow_correlation"],
+        callback=lambda name, _: print(f"Tested {name} decay function"),
+    )
+    results_list = list(results.values())
+    labels = [name.title() for name in results]
 
     # Create comparison plot
     fig = plot_model_comparison(
@@ -221,10 +213,6 @@ def example_model_comparison():
     )
     print("Model comparison plot saved as 'model_comparison_example.png'")
 
-    # Create summary table
-    summary = create_summary_table(
-        results_dfs=results_list, labels=labels, metric="cross_entropy", minimize=True
-    )
     print("\nSummary Table:")
     print(summary.to_string(index=False))
 
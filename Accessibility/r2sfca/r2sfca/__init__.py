@@ -7,6 +7,8 @@ methods through distance decay parameterization and cross-entropy minimization.
 Main Classes:
     R2SFCA: Main class for spatial accessibility analysis
     DecayFunction: Enum for available decay functions
+    StreamingR2SFCA: Out-of-core R2SFCA over a chunked CSV or Parquet file
+    MetricAccumulator: Single-pass evaluation metrics over chunks of pairs
 
 Example:
     >>> import pandas as pd
@@ -30,10 +32,19 @@ Example:
 """
 
 from .core import R2SFCA, DecayFunction
+from .metrics import MetricAccumulator
+from .streaming import StreamingR2SFCA
 from .utils import evaluate_model, plot_grid_search_results
 
 __version__ = "1.1.3"
 __author__ = "Lingbo Liu, Fahui Wang"
 __email__ = "lingboliu@harvard.edu, fwang@lsu.edu"
 
-__all__ = ["R2SFCA", "DecayFunction", "evaluate_model", "plot_grid_search_results"]
+__all__ = [
+    "R2SFCA",
+    "DecayFunction",
+    "StreamingR2SFCA",
+    "MetricAccumulator",
+    "evaluate_model",
+    "plot_grid_search_results",
+]
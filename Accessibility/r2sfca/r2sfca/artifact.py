@@ -0,0 +1,138 @@
+"""
+Saved model artifacts for the R2SFCA package.
+
+An artifact is a directory holding one ``.npy`` file per array and a
+``model.json`` metadata file. ``.npy`` files are written uncompressed so that
+they can be opened as read-only memory maps: loading a model then maps the
+files instead of reading them, and pages are only read from disk when an
+evaluation touches them.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Tuple
+
+import numpy as np
+
+FORMAT = "r2sfca-model"
+FORMAT_VERSION = 1
+METADATA_FILE = "model.json"
+
+
+def storable_ids(uniques: np.ndarray, side: str) -> np.ndarray:
+    """
+    ID lookup table in a dtype that ``np.save`` writes without pickling.
+
+    Object arrays of strings (or of integers) are converted to a fixed-width
+    string (integer) dtype; other object arrays cannot be stored.
+    """
+    if uniques.dtype != object:
+        return uniques
+    try:
+        converted = np.array(uniques.tolist())
+    except ValueError:
+        converted = uniques
+    if converted.dtype == object or converted.tolist() != uniques.tolist():
+        raise ValueError(f"{side} IDs must be all strings or all numbers to be saved")
+    return converted
+
+
+def write_artifact(path: str, arrays: Dict[str, np.ndarray], metadata: Dict):
+    """
+    Write arrays and metadata to the directory ``path``.
+
+    Files are first written to a temporary directory inside ``path`` and
+    then moved into place, so arrays memory-mapped from an earlier artifact
+    in ``path`` (e.g. those of the model being saved) are never truncated
+    while they are read. The metadata file is moved last, so an interrupted
+    save leaves no loadable artifact behind.
+
+    Parameters:
+    -----------
+    path : str
+        Target directory, created if needed; an earlier artifact in it is
+        replaced
+    arrays : dict
+        Array name -> array; names become file names
+    metadata : dict
+        JSON-serializable metadata
+    """
+    os.makedirs(path, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".saving-", dir=path)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+        document = {
+            "format": FORMAT,
+            "format_version": FORMAT_VERSION,
+            "arrays": sorted(arrays),
+            **metadata,
+        }
+        with open(os.path.join(staging, METADATA_FILE), "w", encoding="utf-8") as fh:
+            json.dump(document, fh, indent=2)
+
+        metadata_path = os.path.join(path, METADATA_FILE)
+        previous = []
+        if os.path.exists(metadata_path):
+            with open(metadata_path, encoding="utf-8") as fh:
+                previous = json.load(fh).get("arrays", [])
+            os.remove(metadata_path)
+        # Renaming over a file leaves existing memory maps of it intact
+        for name in arrays:
+            os.replace(
+                os.path.join(staging, f"{name}.npy"),
+                os.path.join(path, f"{name}.npy"),
+            )
+        # Drop the previous artifact's arrays that were not rewritten
+        for name in set(previous) - set(arrays):
+            stale = os.path.join(path, f"{name}.npy")
+            if os.path.exists(stale):
+                os.remove(stale)
+        os.replace(os.path.join(staging, METADATA_FILE), metadata_path)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def read_artifact(
+    path: str, mmap_mode: str = "r"
+) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Read the arrays and metadata of an artifact.
+
+    Parameters:
+    -----------
+    path : str
+        Artifact directory
+    mmap_mode : str or None
+        Memory-map mode passed to ``np.load`` ('r' maps read-only without
+        copying); None reads the arrays into memory
+
+    Returns:
+    --------
+    tuple
+        (arrays dict, metadata dict)
+    """
+    metadata_path = os.path.join(path, METADATA_FILE)
+    if not os.path.isfile(metadata_path):
+        raise ValueError(f"{path} is not a saved R2SFCA model")
+    with open(metadata_path, encoding="utf-8") as fh:
+        metadata = json.load(fh)
+    if metadata.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a saved R2SFCA model")
+    if metadata.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported model format version {metadata.get('format_version')} "
+            f"(expected {FORMAT_VERSION})"
+        )
+
+    arrays = {}
+    for name in metadata["arrays"]:
+        array = np.load(
+            os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False
+        )
+        # A plain ndarray view keeps the mapping alive without the memmap
+        # subclass propagating into every result
+        arrays[name] = array.view(np.ndarray) if mmap_mode else array
+    return arrays, metadata
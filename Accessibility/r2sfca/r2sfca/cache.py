@@ -0,0 +1,88 @@
+"""
+Array caching for the R2SFCA package.
+
+This module provides a small least-recently-used cache of numpy arrays with a
+byte budget, used to reuse decay vectors and flows across repeated
+evaluations of the same parameter point.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+
+
+class ArrayCache:
+    """
+    LRU cache of numpy arrays bounded by their total size in bytes.
+
+    Stored arrays are made read-only so that a cached value can be handed out
+    repeatedly without copies; callers that need to modify a result must copy
+    it first. Arrays larger than the whole budget are not stored.
+
+    Parameters:
+    -----------
+    max_bytes : int
+        Upper bound on the total ``nbytes`` of the cached arrays
+    """
+
+    def __init__(self, max_bytes: int):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative")
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """Return the cached array for ``key`` (or None) and update counters."""
+        array = self._entries.get(key)
+        if array is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return array
+
+    def put(self, key: Hashable, array: np.ndarray) -> np.ndarray:
+        """
+        Store ``array`` under ``key``, evicting least recently used entries.
+
+        Returns:
+        --------
+        np.ndarray
+            The array, now read-only if it was stored
+        """
+        if array.nbytes > self.max_bytes:
+            return array
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key).nbytes
+        while self._entries and self.nbytes + array.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+        array.flags.writeable = False
+        self._entries[key] = array
+        self.nbytes += array.nbytes
+        return array
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> Dict:
+        """Hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -2,16 +2,164 @@
 Core functionality for the R2SFCA package.
 
 This module contains the main R2SFCA class and decay function implementations.
+scipy.optimize is imported by the optimizers on first use, so evaluating a
+model does not load it.
 """
 
 import numpy as np
 import pandas as pd
 from enum import Enum
-from typing import Optional, Dict, List, Tuple, Union
-from scipy.optimize import minimize
-from scipy.stats import pearsonr
+from typing import Callable, Optional, Dict, List, Mapping, Tuple, Union
 import warnings
 
+from .artifact import read_artifact, storable_ids, write_artifact
+from .cache import ArrayCache
+from .gradients import metric_gradient
+from .grouping import GroupIndex
+from .incremental import IncrementalState, group_pairs
+from .metrics import compute_metrics
+from .parallel import imap_with_model, map_with_model, resolve_n_jobs, split_evenly
+from .profiling import Profiler, ProfileReport
+from .sparse import SparseBackend
+
+
+def _pearson_rows(
+    x: np.ndarray,
+    y: np.ndarray,
+    scratch: np.ndarray,
+    zeros: Optional[Tuple[int, float, float]] = None,
+) -> np.ndarray:
+    """
+    Row-wise Pearson correlation of a matrix with a matrix or vector.
+
+    ``zeros`` = (count, mean of y, sum of squared deviations of y) adds
+    further columns where x is zero (see ``gradients.pearson_gradient``).
+    """
+    count, zero_y_mean, zero_y_m2 = zeros if zeros is not None else (0, 0.0, 0.0)
+    n = x.shape[1] + count
+    y = np.broadcast_to(y, x.shape)
+    x_mean = np.sum(x, axis=1, keepdims=True, dtype=np.float64) / n
+    y_mean = (
+        np.sum(y, axis=1, keepdims=True, dtype=np.float64) + count * zero_y_mean
+    ) / n
+    np.subtract(x, x_mean, out=scratch, casting="unsafe")
+    sxx = np.einsum("ij,ij->i", scratch, scratch, dtype=np.float64)
+    sxy = np.einsum("ij,ij->i", scratch, y, dtype=np.float64) - y_mean[:, 0] * np.sum(
+        scratch, axis=1, dtype=np.float64
+    )
+    np.subtract(y, y_mean, out=scratch, casting="unsafe")
+    syy = np.einsum("ij,ij->i", scratch, scratch, dtype=np.float64)
+    if count:
+        x_mean, zero_y_delta = x_mean[:, 0], zero_y_mean - y_mean[:, 0]
+        sxx += count * x_mean**2
+        syy += zero_y_m2 + count * zero_y_delta**2
+        sxy -= count * x_mean * zero_y_delta
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = sxy / np.sqrt(sxx * syy)
+    return np.clip(r, -1.0, 1.0)
+
+
+# Points per searched axis and level in search_fij(strategy="adaptive")
+_ADAPTIVE_POINTS = 9
+
+# Ratio between successive reduced pair sets of the min_decay catchment
+_CATCHMENT_STEP = 1.25
+
+
+def _one_evaluation(*args, **kwargs) -> int:
+    return 1
+
+
+def _batch_evaluations(betas, *args, **kwargs) -> int:
+    return len(betas)
+
+
+# Methods wrapped by enable_profiling: stage, evaluation count, attach report
+_PROFILED_METHODS = {
+    "dist_decay": ("dist_decay", None, False),
+    "fij": ("fij", None, False),
+    "tij": ("tij", None, False),
+    "_flows": ("flows", None, False),
+    "_calculate_metrics": ("metrics", None, False),
+    "_calculate_batch_metrics": ("metrics", None, False),
+    "_evaluate": ("objective", _one_evaluation, False),
+    "_evaluate_gradient": ("objective_gradient", _one_evaluation, False),
+    "_evaluate_batch": ("objective_batch", _batch_evaluations, False),
+    "_pairs_within": ("catchment", None, False),
+    "access_score": ("access_score", None, False),
+    "crowd_score": ("crowd_score", None, False),
+    "scores": ("scores", None, False),
+    "search_fij": ("search_fij", None, True),
+    "solve_beta": ("solve_beta", None, True),
+    "solve_params": ("solve_params", None, True),
+}
+
+# Stages recorded inside the reduced pair sets of a catchment cutoff
+_PROFILED_SUBMODEL_METHODS = {
+    name: _PROFILED_METHODS[name]
+    for name in (
+        "dist_decay",
+        "_flows",
+        "_calculate_metrics",
+        "_calculate_batch_metrics",
+    )
+}
+
+
+def _search_points(
+    model: "R2SFCA",
+    points: List[Tuple[float, float]],
+    metrics: List[str],
+    normalize: bool,
+    memory_budget: Optional[int],
+) -> List[Dict]:
+    """Evaluate metrics at (beta, param2) points, in order, on one process."""
+    if memory_budget is None:
+        return [
+            model._evaluate(beta, param2, metrics, normalize, full_flows=False)[0]
+            for beta, param2 in points
+        ]
+
+    point_metrics = []
+    block_size = model._batch_block_size(memory_budget)
+    for start in range(0, len(points), block_size):
+        block = points[start : start + block_size]
+        block_metrics = model._evaluate_batch(
+            [beta for beta, _ in block],
+            [param2 for _, param2 in block],
+            metrics,
+            normalize,
+        )
+        for k in range(len(block)):
+            point_metrics.append(
+                {name: values[k] for name, values in block_metrics.items()}
+            )
+    return point_metrics
+
+
+def _bootstrap_fits(
+    model: "R2SFCA",
+    seeds: List[np.random.SeedSequence],
+    unit: str,
+    fit_kwargs: Dict,
+) -> List[Tuple[float, bool]]:
+    """Re-fit beta on one resample per seed, in order, on one process."""
+    fits = []
+    for seed in seeds:
+        resampled = model._resample(unit, np.random.default_rng(seed))
+        result = resampled.solve_beta(**fit_kwargs)
+        fits.append(
+            (float(result["optimal_beta"]), bool(result["optimization_success"]))
+        )
+    return fits
+
+
+def _decay_search(
+    model: "R2SFCA", decay_function: str, search_kwargs: Dict
+) -> pd.DataFrame:
+    """Run ``search_fij`` for one decay function on the model's pair arrays."""
+    return model._with_decay_function(decay_function).search_fij(**search_kwargs)
+
 
 class DecayFunction(Enum):
     """Enumeration of available distance decay functions."""
@@ -24,6 +172,136 @@ class DecayFunction(Enum):
     LOG_SQUARED = "log_squared"
 
 
+# Default parameters for different decay functions
+_DEFAULT_PARAMS = {
+    DecayFunction.EXPONENTIAL: {"beta": 1.0},
+    DecayFunction.POWER: {"beta": 1.0},
+    DecayFunction.SIGMOID: {"beta": 1.0, "steepness": 3.0},
+    DecayFunction.SQRT_EXPONENTIAL: {"beta": 1.0},
+    DecayFunction.GAUSSIAN: {"beta": 1.0, "d0": 20.0},
+    DecayFunction.LOG_SQUARED: {"beta": 1.0},
+}
+
+
+def transformed_cost(
+    decay_function: "DecayFunction",
+    travel_cost: np.ndarray,
+    epsilon: float = 1e-15,
+) -> Optional[np.ndarray]:
+    """
+    Beta-independent part g(d) of a decay function of the form exp(-c * g(d)).
+
+    Exponential, power, square-root exponential, Gaussian and log-squared
+    decay all have this form, so once g(d) is known each evaluation is one
+    multiply and one exp. The Gaussian uses g(d) = d**2 with c = beta / d0**2.
+
+    Parameters:
+    -----------
+    decay_function : DecayFunction
+        Decay function
+    travel_cost : np.ndarray
+        Travel costs
+    epsilon : float
+        Small value added before log and sqrt
+
+    Returns:
+    --------
+    np.ndarray or None
+        g(d), or None for the sigmoid decay, which has no such form. For the
+        exponential decay this is ``travel_cost`` itself if it is already
+        floating point, so the result must not be modified in place.
+    """
+    distance = travel_cost
+    if distance.dtype.kind != "f":
+        distance = distance.astype(np.float64)
+
+    if decay_function == DecayFunction.EXPONENTIAL:
+        return distance
+    elif decay_function == DecayFunction.POWER:
+        values = np.add(distance, epsilon)
+        return np.log(values, out=values)
+    elif decay_function == DecayFunction.SQRT_EXPONENTIAL:
+        values = np.add(distance, epsilon)
+        return np.sqrt(values, out=values)
+    elif decay_function == DecayFunction.GAUSSIAN:
+        return np.square(distance)
+    elif decay_function == DecayFunction.LOG_SQUARED:
+        values = np.add(distance, epsilon)
+        np.log(values, out=values)
+        return np.square(values, out=values)
+    elif decay_function == DecayFunction.SIGMOID:
+        return None
+    raise ValueError(f"Unknown decay function: {decay_function}")
+
+
+def decay_values(
+    decay_function: "DecayFunction",
+    travel_cost: np.ndarray,
+    beta: float,
+    median_travel_cost: float,
+    transformed: Optional[np.ndarray] = None,
+    **kwargs,
+) -> np.ndarray:
+    """
+    Evaluate a distance decay function on an array of travel costs.
+
+    This is the computation behind ``R2SFCA.dist_decay``, usable on any array
+    (e.g. one chunk of a streamed OD table).
+
+    Parameters:
+    -----------
+    decay_function : DecayFunction
+        Decay function to evaluate
+    travel_cost : np.ndarray
+        Travel costs
+    beta : float
+        Primary decay parameter
+    median_travel_cost : float
+        Median travel cost of the whole table (scales beta for SIGMOID)
+    transformed : np.ndarray, optional
+        Precomputed ``transformed_cost`` of ``travel_cost`` (same epsilon)
+    **kwargs
+        steepness (SIGMOID), d0 (GAUSSIAN) and epsilon
+
+    Returns:
+    --------
+    np.ndarray
+        Decay values
+    """
+    # Get default parameters for this decay function
+    default_params = dict(_DEFAULT_PARAMS[decay_function])
+    default_params.update(kwargs)
+
+    # Allow epsilon to be overridden by kwargs
+    epsilon = kwargs.get("epsilon", 1e-15)
+
+    if decay_function == DecayFunction.SIGMOID:
+        distance = travel_cost
+        if distance.dtype.kind != "f":
+            distance = distance.astype(np.float64)
+        steepness = default_params.get("steepness", 3.0)
+        # Use beta * median_travel_cost as the scale parameter
+        scale_beta = beta * median_travel_cost
+        # Calculate argument with overflow protection
+        values = np.subtract(distance, scale_beta)
+        np.multiply(values, steepness, out=values)
+        # Clip argument to prevent overflow/underflow
+        np.clip(values, -500, 500, out=values)
+        np.exp(values, out=values)
+        values += 1
+        return np.divide(1.0, values, out=values)
+
+    if transformed is None:
+        transformed = transformed_cost(decay_function, travel_cost, epsilon)
+
+    # Every other family is exp(-coefficient * g(d))
+    coefficient = beta
+    if decay_function == DecayFunction.GAUSSIAN:
+        coefficient = beta / default_params.get("d0", 20.0) ** 2
+    values = np.multiply(transformed, -coefficient)
+    return np.exp(values, out=values)
+
+
 class R2SFCA:
     """
     Reconciled Two-Step Floating Catchment Area (R2SFCA) model.
@@ -33,8 +311,9 @@ class R2SFCA:
 
     Parameters:
     -----------
-    df : pandas.DataFrame
-        Input dataframe containing spatial accessibility data
+    df : pandas.DataFrame, mapping or structured numpy array
+        Input data containing spatial accessibility data: a dataframe, a
+        mapping of column names to arrays, or a structured numpy array
     demand_col : str
         Column name for demand values
     supply_col : str
@@ -51,6 +330,45 @@ class R2SFCA:
         Type of decay function to use
     epsilon : float, default 1e-15
         Small value to avoid division by zero
+    lean : bool, default False
+        If True, do not keep a copy of the input dataframe. Only contiguous
+        typed arrays are stored: demand, supply, travel cost and observed
+        flow as ``dtype``, and the ID columns as int32 codes plus a lookup
+        table, so the caller can release the input right after construction.
+        ``demand_ids``/``supply_ids`` then hold the codes. Non-dataframe
+        input is always stored this way.
+    dtype : str or numpy dtype, optional
+        Floating-point dtype ('float32' or 'float64') for the numeric arrays.
+        Defaults to the input dtypes, or float64 when ``lean`` is set. With
+        float32, decay values and flows are float32 while per-location sums
+        and metrics accumulate in float64; optimal beta then agrees with
+        float64 to a relative 1e-4 (see ``validate_float32.py``).
+    cache_bytes : int, optional
+        Byte budget of an LRU cache of decay vectors keyed by decay function
+        and parameters, so repeated evaluations of a parameter point reuse
+        them. Cached arrays are returned read-only. Disabled by default.
+    cache_flows : bool, default True
+        Also cache Fij and Tij when ``cache_bytes`` is set
+    max_travel_cost : float, optional
+        Catchment cutoff: pairs with a larger travel cost are dropped from
+        every evaluation (their Fij and Tij are zero, and the metrics count
+        them as such)
+    min_decay : float, optional
+        Relative catchment cutoff in (0, 1): a pair is dropped when its decay
+        is below ``min_decay`` times the largest decay of both its demand and
+        its supply location at the evaluated parameters, which bounds the
+        relative change of every retained Fij and Tij. The reduced pair set is
+        derived lazily, with some slack, and rebuilt only when the parameters
+        move past it. Not available for sigmoid decay. See
+        ``catchment_report`` for the error introduced.
+    backend : str, default 'pairs'
+        'pairs' computes per-location sums as segmented reductions over the
+        pair list. 'sparse' stores the decay as a scipy.sparse CSR matrix
+        (demand x supply) with one demand and supply value per location, so
+        Fij, Tij and the scores are sparse row/column scalings and
+        matrix-vector products; it requires demand and supply values that are
+        constant per location and no duplicate pairs. Gradients and batched
+        search always use the pair form.
     """
 
     def __init__(
@@ -64,8 +382,37 @@ class R2SFCA:
         observed_flow_col: Optional[str] = None,
         decay_function: Union[str, DecayFunction] = "exponential",
         epsilon: float = 1e-15,
+        lean: bool = False,
+        dtype: Optional[Union[str, np.dtype]] = None,
+        cache_bytes: Optional[int] = None,
+        cache_flows: bool = True,
+        max_travel_cost: Optional[float] = None,
+        min_decay: Optional[float] = None,
+        backend: str = "pairs",
     ):
 
+        # Accept dataframes, column mappings and structured arrays
+        if isinstance(df, pd.DataFrame):
+            columns = df.columns
+        elif isinstance(df, np.ndarray) and df.dtype.names is not None:
+            columns = df.dtype.names
+            lean = True
+        elif isinstance(df, Mapping):
+            columns = list(df.keys())
+            lean = True
+        else:
+            raise TypeError(
+                "df must be a pandas DataFrame, a mapping of column names to "
+                "arrays or a structured numpy array"
+            )
+
+        if dtype is not None:
+            dtype = np.dtype(dtype)
+            if dtype not in (np.dtype(np.float32), np.dtype(np.float64)):
+                raise ValueError(f"dtype must be float32 or float64, got {dtype}")
+        elif lean:
+            dtype = np.dtype(np.float64)
+
         # Validate input dataframe
         required_cols = [
             demand_col,
@@ -74,7 +421,9 @@ class R2SFCA:
             demand_id_col,
             supply_id_col,
         ]
-        missing_cols = [col for col in required_cols if col not in df.columns]
+        if observed_flow_col:
+            required_cols.append(observed_flow_col)
+        missing_cols = [col for col in required_cols if col not in columns]
         if missing_cols:
             raise ValueError(f"Missing required columns: {missing_cols}")
 
@@ -87,13 +436,33 @@ class R2SFCA:
         self.observed_flow_col = observed_flow_col
 
         # Store data
-        self.df = df.copy()
-        self.demand = df[demand_col].values
-        self.supply = df[supply_col].values
-        self.travel_cost = df[travel_cost_col].values
-        self.demand_ids = df[demand_id_col].values
-        self.supply_ids = df[supply_id_col].values
-        self.observed_flow = df[observed_flow_col].values if observed_flow_col else None
+        self.df = None if lean else df.copy()
+
+        def values(col):
+            array = np.asarray(df[col])
+            if lean:
+                # Own the data even where the dtype already matches, so the
+                # input can be released
+                array = np.array(array, dtype=dtype, order="C", copy=True)
+            elif dtype is not None:
+                array = np.ascontiguousarray(array, dtype=dtype)
+            return array
+
+        self.demand = values(demand_col)
+        self.supply = values(supply_col)
+        self.travel_cost = values(travel_cost_col)
+        self.observed_flow = values(observed_flow_col) if observed_flow_col else None
+
+        # Factorize IDs once so Fij/Tij are segmented reductions over the pairs
+        self._demand_groups = GroupIndex(np.asarray(df[demand_id_col]))
+        self._supply_groups = GroupIndex(np.asarray(df[supply_id_col]))
+        if lean:
+            # Keep only the codes; the IDs live in the groups' lookup tables
+            self.demand_ids = self._demand_groups.codes
+            self.supply_ids = self._supply_groups.codes
+        else:
+            self.demand_ids = df[demand_id_col].values
+            self.supply_ids = df[supply_id_col].values
 
         # Store parameters
         self.epsilon = epsilon
@@ -113,14 +482,408 @@ class R2SFCA:
             )
 
         # Default parameters for different decay functions
-        self._default_params = {
-            DecayFunction.EXPONENTIAL: {"beta": 1.0},
-            DecayFunction.POWER: {"beta": 1.0},
-            DecayFunction.SIGMOID: {"beta": 1.0, "steepness": 3.0},
-            DecayFunction.SQRT_EXPONENTIAL: {"beta": 1.0},
-            DecayFunction.GAUSSIAN: {"beta": 1.0, "d0": 20.0},
-            DecayFunction.LOG_SQUARED: {"beta": 1.0},
+        self._default_params = self._build_default_params()
+
+        # Beta-independent transformed costs, computed lazily per family
+        self._transformed_costs = {}
+
+        # Optional LRU cache of decay vectors (and flows)
+        self._cache = ArrayCache(cache_bytes) if cache_bytes else None
+        self._cache_flows = cache_flows
+
+        # Optional catchment truncation
+        if min_decay is not None:
+            if not 0 < min_decay < 1:
+                raise ValueError("min_decay must be between 0 and 1")
+            if self.decay_function == DecayFunction.SIGMOID:
+                raise ValueError("min_decay is not available for sigmoid decay")
+        if max_travel_cost is not None and not np.any(
+            self.travel_cost <= max_travel_cost
+        ):
+            raise ValueError("max_travel_cost excludes every demand-supply pair")
+        self.max_travel_cost = max_travel_cost
+        self.min_decay = min_decay
+        self._catchment = None
+        self._decay_excess = None
+        # Summary of the pairs a reduced pair set drops (see _subset_model)
+        self._zero_flows = None
+
+        # Optional matrix-form backend
+        self._sparse_pattern = None
+        if backend not in ("pairs", "sparse"):
+            raise ValueError(f"Unknown backend: {backend}")
+        self.backend = backend
+        self._sparse = self._sparse_operators() if backend == "sparse" else None
+
+        # Flows kept by update_supply/update_demand at one parameter point
+        self._incremental = None
+        self._owned_values = set()
+
+        # Opt-in instrumentation (see enable_profiling)
+        self._profiler = None
+
+        # Parameters of the last solve_beta/solve_params fit
+        self.fitted_params = None
+
+    @classmethod
+    def from_arrays(
+        cls,
+        demand: np.ndarray,
+        supply: np.ndarray,
+        travel_cost: np.ndarray,
+        demand_ids: np.ndarray,
+        supply_ids: np.ndarray,
+        observed_flow: Optional[np.ndarray] = None,
+        **kwargs,
+    ) -> "R2SFCA":
+        """
+        Build a lean model directly from pair arrays.
+
+        Parameters:
+        -----------
+        demand, supply, travel_cost : np.ndarray
+            Demand, supply and travel cost of every pair
+        demand_ids, supply_ids : np.ndarray
+            Demand and supply location IDs of every pair
+        observed_flow : np.ndarray, optional
+            Observed flow of every pair (for validation)
+        **kwargs
+            Other constructor arguments (decay_function, epsilon, dtype)
+
+        Returns:
+        --------
+        R2SFCA
+            Model storing only typed arrays and ID codes
+        """
+        columns = {
+            "Demand": demand,
+            "Supply": supply,
+            "TravelCost": travel_cost,
+            "DemandID": demand_ids,
+            "SupplyID": supply_ids,
+        }
+        if observed_flow is not None:
+            columns["ObservedFlow"] = observed_flow
+            kwargs["observed_flow_col"] = "ObservedFlow"
+        return cls(columns, **kwargs)
+
+    @property
+    def demand_id_values(self) -> np.ndarray:
+        """Distinct demand IDs, in the order used by ``access_score``."""
+        return self._demand_groups.uniques
+
+    @property
+    def supply_id_values(self) -> np.ndarray:
+        """Distinct supply IDs, in the order used by ``crowd_score``."""
+        return self._supply_groups.uniques
+
+    @staticmethod
+    def _build_default_params() -> Dict:
+        """Default parameters for the different decay functions."""
+        return {
+            decay_function: dict(params)
+            for decay_function, params in _DEFAULT_PARAMS.items()
+        }
+
+    def _shared_state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """
+        Numeric arrays and scalar settings needed to rebuild the model.
+
+        Used to publish the model to worker processes; the dataframe and the
+        original ID values are not included.
+        """
+        arrays = {
+            "travel_cost": self.travel_cost,
+            "demand": self.demand,
+            "supply": self.supply,
+        }
+        if self.observed_flow is not None:
+            arrays["observed_flow"] = self.observed_flow
+        for prefix, groups in (
+            ("demand", self._demand_groups),
+            ("supply", self._supply_groups),
+        ):
+            for name, values in groups.arrays().items():
+                arrays[f"{prefix}_{name}"] = values
+
+        config = {
+            "decay_function": self.decay_function.value,
+            "epsilon": self.epsilon,
+            "median_travel_cost": self.median_travel_cost,
+            "max_travel_cost": self.max_travel_cost,
+            "min_decay": self.min_decay,
+            "demand_contiguous": self._demand_groups.contiguous,
+            "supply_contiguous": self._supply_groups.contiguous,
+        }
+        return arrays, config
+
+    @classmethod
+    def _from_shared_state(
+        cls, arrays: Dict[str, np.ndarray], config: Dict
+    ) -> "R2SFCA":
+        """Rebuild a computation-only model from ``_shared_state`` output."""
+        model = cls.__new__(cls)
+        model.demand_col = model.supply_col = model.travel_cost_col = None
+        model.demand_id_col = model.supply_id_col = model.observed_flow_col = None
+        model.df = None
+
+        model.travel_cost = arrays["travel_cost"]
+        model.demand = arrays["demand"]
+        model.supply = arrays["supply"]
+        model.observed_flow = arrays.get("observed_flow")
+
+        model._demand_groups = GroupIndex.from_arrays(
+            **{
+                name: arrays[f"demand_{name}"]
+                for name in ("codes", "order", "offsets", "first")
+            },
+            contiguous=config.get("demand_contiguous"),
+        )
+        model._supply_groups = GroupIndex.from_arrays(
+            **{
+                name: arrays[f"supply_{name}"]
+                for name in ("codes", "order", "offsets", "first")
+            },
+            contiguous=config.get("supply_contiguous"),
+        )
+        model.demand_ids = model._demand_groups.codes
+        model.supply_ids = model._supply_groups.codes
+
+        model.epsilon = config["epsilon"]
+        model.decay_function = DecayFunction(config["decay_function"])
+        model.median_travel_cost = config["median_travel_cost"]
+        model._default_params = cls._build_default_params()
+        model._transformed_costs = {}
+        model._cache = None
+        model._cache_flows = False
+        model.max_travel_cost = config.get("max_travel_cost")
+        model.min_decay = config.get("min_decay")
+        model._catchment = None
+        model._decay_excess = None
+        model._zero_flows = None
+        model.backend = "pairs"
+        model._sparse = None
+        model._sparse_pattern = None
+        model._incremental = None
+        model._owned_values = set()
+        model._profiler = None
+        model.fitted_params = None
+        return model
+
+    def save(self, path: str):
+        """
+        Save the preprocessed model to a directory of ``.npy`` files.
+
+        The artifact holds the typed pair arrays, the ID codes with their
+        group offsets and lookup tables, the transformed travel costs of the
+        decay function, the settings and ``fitted_params``, so that
+        ``R2SFCA.load`` restores the model without parsing the input or
+        factorizing the IDs again. The input dataframe is not saved (a
+        loaded model is lean); caches and catchment pair sets are rebuilt on
+        demand.
+
+        Parameters:
+        -----------
+        path : str
+            Target directory, created if needed; may be the directory a
+            memory-mapped model was loaded from
+        """
+        from . import __version__
+
+        arrays, config = self._shared_state()
+        for prefix, groups in (
+            ("demand", self._demand_groups),
+            ("supply", self._supply_groups),
+        ):
+            arrays[f"{prefix}_uniques"] = storable_ids(groups.uniques, prefix)
+
+        # Store the transform of the model's own family even if not used yet
+        self._transformed_cost(self.epsilon)
+        transforms = []
+        for (decay_function, epsilon), transformed in self._transformed_costs.items():
+            if transformed is not None:
+                if (
+                    decay_function == DecayFunction.EXPONENTIAL
+                    and transformed.dtype == self.travel_cost.dtype
+                ):
+                    # g(d) = d: map the travel cost file again on load
+                    name = "travel_cost"
+                else:
+                    name = f"transformed_cost_{len(transforms)}"
+                    arrays[name] = transformed
+                transforms.append(
+                    {
+                        "name": name,
+                        "decay_function": decay_function.value,
+                        "epsilon": epsilon,
+                    }
+                )
+
+        config["backend"] = self.backend
+        metadata = {
+            "r2sfca_version": __version__,
+            "n_pairs": len(self.travel_cost),
+            "config": {
+                key: value.item() if isinstance(value, np.generic) else value
+                for key, value in config.items()
+            },
+            "columns": {
+                attr: getattr(self, attr)
+                for attr in (
+                    "demand_col",
+                    "supply_col",
+                    "travel_cost_col",
+                    "demand_id_col",
+                    "supply_id_col",
+                    "observed_flow_col",
+                )
+            },
+            "transformed_costs": transforms,
+            "fitted_params": self.fitted_params,
         }
+        write_artifact(path, arrays, metadata)
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        mmap_mode: Optional[str] = "r",
+        cache_bytes: Optional[int] = None,
+        cache_flows: bool = True,
+    ) -> "R2SFCA":
+        """
+        Load a model written by ``save``.
+
+        With the default ``mmap_mode='r'`` every array is a read-only memory
+        map of its file, so loading costs no copies and no parsing; values
+        changed later through ``update_supply``/``update_demand`` are copied
+        into memory first.
+
+        Parameters:
+        -----------
+        path : str
+            Directory written by ``save``
+        mmap_mode : str or None
+            Memory-map mode for ``np.load``; None reads the arrays into memory
+        cache_bytes : int, optional
+            Byte budget of the decay cache (see ``R2SFCA``)
+        cache_flows : bool, default True
+            Also cache Fij and Tij when ``cache_bytes`` is set
+
+        Returns:
+        --------
+        R2SFCA
+            Lean model with the saved arrays, settings and ``fitted_params``
+        """
+        arrays, metadata = read_artifact(path, mmap_mode)
+        config = metadata["config"]
+        model = cls._from_shared_state(arrays, config)
+        model._demand_groups.uniques = arrays["demand_uniques"]
+        model._supply_groups.uniques = arrays["supply_uniques"]
+        for attr, column in metadata["columns"].items():
+            setattr(model, attr, column)
+        for entry in metadata["transformed_costs"]:
+            key = (DecayFunction(entry["decay_function"]), entry["epsilon"])
+            model._transformed_costs[key] = arrays[entry["name"]]
+        model.fitted_params = metadata["fitted_params"]
+        model._cache = ArrayCache(cache_bytes) if cache_bytes else None
+        model._cache_flows = cache_flows
+        if config["backend"] == "sparse":
+            model.backend = "sparse"
+            model._sparse = model._sparse_operators()
+        return model
+
+    def enable_profiling(self, track_memory: bool = False) -> Profiler:
+        """
+        Record calls, time and (optionally) allocations per computation stage.
+
+        Stages are the decay ('dist_decay'), the Fij/Tij pass ('flows', 'fij',
+        'tij'), the metrics, the objective evaluations of the optimizers and
+        searches, the catchment lookup and the public entry points; each
+        reports inclusive ('total_s') and exclusive ('self_s') time, so the
+        optimizer's own overhead is the 'self_s' of 'solve_beta'. While
+        enabled, ``solve_beta``/``solve_params`` results carry the report of
+        the call under 'profile' and ``search_fij`` results under
+        ``attrs['profile']``. Work done in worker processes (``n_jobs``) is
+        not recorded.
+
+        Methods are wrapped on this instance only, so a model without
+        profiling runs the unwrapped methods.
+
+        Parameters:
+        -----------
+        track_memory : bool
+            Also record bytes allocated per stage with ``tracemalloc``
+            (slows the computation down)
+
+        Returns:
+        --------
+        Profiler
+            The profiler; its ``report()`` covers every call since enabling
+        """
+        self.disable_profiling()
+        profiler = Profiler(track_memory)
+        profiler.start()
+        self._instrument(profiler, _PROFILED_METHODS)
+        if self._catchment is not None:
+            self._catchment[1]._instrument(profiler, _PROFILED_SUBMODEL_METHODS)
+        self._profiler = profiler
+        return profiler
+
+    def disable_profiling(self):
+        """Remove the instrumentation added by ``enable_profiling``."""
+        if self._profiler is None:
+            return
+        self._profiler.stop()
+        models = [self] + ([self._catchment[1]] if self._catchment is not None else [])
+        for model in models:
+            for name in _PROFILED_METHODS:
+                model.__dict__.pop(name, None)
+        self._profiler = None
+
+    def profile_report(self) -> Optional[ProfileReport]:
+        """
+        Profiling report since ``enable_profiling`` (None if not enabled).
+
+        Returns:
+        --------
+        ProfileReport or None
+            Dict with 'stages', 'objective_evaluations', 'wall_s' and
+            'track_memory'; ``to_frame()`` and ``to_json()`` convert it
+        """
+        return self._profiler.report() if self._profiler is not None else None
+
+    def _instrument(self, profiler: Profiler, methods: Dict):
+        """Shadow ``methods`` on this instance with profiled wrappers."""
+        for name, (stage, evaluations, attach) in methods.items():
+            method = getattr(type(self), name).__get__(self)
+            setattr(self, name, profiler.wrap(stage, method, evaluations, attach))
+
+    def cache_info(self) -> Optional[Dict]:
+        """
+        Hit/miss counters and size of the decay cache.
+
+        Returns:
+        --------
+        dict or None
+            'hits', 'misses', 'entries', 'nbytes' and 'max_bytes', or None if
+            the model was built without ``cache_bytes``
+        """
+        return self._cache.info() if self._cache is not None else None
+
+    def clear_cache(self):
+        """Drop all cached decay vectors and flows."""
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _cache_key(self, kind: str, beta: float, kwargs: Dict) -> Tuple:
+        """Cache key of a decay-dependent array at one parameter point."""
+        return (
+            kind,
+            self.decay_function.value,
+            float(beta),
+            tuple(sorted((name, float(value)) for name, value in kwargs.items())),
+        )
 
     def dist_decay(self, beta: float, **kwargs) -> np.ndarray:
         """
@@ -140,44 +903,37 @@ class R2SFCA:
         np.ndarray
             Decay values
         """
-        # Use the travel_cost stored in the model
-        distance = self.travel_cost
-
-        # Get default parameters for this decay function
-        default_params = self._default_params[self.decay_function].copy()
-        default_params.update(kwargs)
-
-        # Allow epsilon to be overridden by kwargs
-        epsilon = kwargs.get("epsilon", self.epsilon)
-
-        if self.decay_function == DecayFunction.EXPONENTIAL:
-            return np.exp(-beta * distance)
+        if self._cache is not None:
+            key = self._cache_key("decay", beta, kwargs)
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
 
-        elif self.decay_function == DecayFunction.POWER:
-            return np.power(distance + epsilon, -beta)
-
-        elif self.decay_function == DecayFunction.SIGMOID:
-            steepness = default_params.get("steepness", 3.0)
-            # Use beta * median_travel_cost as the scale parameter
-            scale_beta = beta * self.median_travel_cost
-            # Calculate argument with overflow protection
-            arg = steepness * (distance - scale_beta)
-            # Clip argument to prevent overflow/underflow
-            arg = np.clip(arg, -500, 500)
-            return 1.0 / (1 + np.exp(arg))
-
-        elif self.decay_function == DecayFunction.SQRT_EXPONENTIAL:
-            return np.exp(-beta * np.sqrt(distance + epsilon))
-
-        elif self.decay_function == DecayFunction.GAUSSIAN:
-            d0 = default_params.get("d0", 20.0)
-            return np.exp(-beta * np.power(distance / d0, 2))
-
-        elif self.decay_function == DecayFunction.LOG_SQUARED:
-            return np.exp(-beta * np.power(np.log(distance + epsilon), 2))
-
-        else:
-            raise ValueError(f"Unknown decay function: {self.decay_function}")
+        # Use the travel_cost stored in the model
+        values = decay_values(
+            self.decay_function,
+            self.travel_cost,
+            beta,
+            self.median_travel_cost,
+            transformed=self._transformed_cost(kwargs.get("epsilon", self.epsilon)),
+            **{"epsilon": self.epsilon, **kwargs},
+        )
+        if self._cache is not None:
+            self._cache.put(key, values)
+        return values
+
+    def _transformed_cost(self, epsilon: float) -> Optional[np.ndarray]:
+        """Beta-independent ``transformed_cost`` of the travel costs, memoized."""
+        key = (self.decay_function, epsilon)
+        if key not in self._transformed_costs:
+            transformed = transformed_cost(
+                self.decay_function, self.travel_cost, epsilon
+            )
+            # The exponential's g(d) is the travel cost array itself
+            if transformed is not None and transformed is not self.travel_cost:
+                transformed.flags.writeable = False
+            self._transformed_costs[key] = transformed
+        return self._transformed_costs[key]
 
     def fij(self, beta: float, **kwargs) -> np.ndarray:
         """
@@ -195,31 +951,31 @@ class R2SFCA:
         np.ndarray
             Fij values
         """
-        # Calculate supply-side decay coefficients
-        decay_values = self.dist_decay(beta, **kwargs)
-        sf_d = self.supply * decay_values
-
-        # Get unique demand IDs
-        unique_demand_ids = np.unique(self.demand_ids)
-
-        # Initialize Fij result array
-        fij = np.zeros_like(sf_d)
-
-        # Calculate Fij for each demand location
-        for d_id in unique_demand_ids:
-            # Get indices where demand ID matches current ID
-            d_mask = self.demand_ids == d_id
-
-            # Get demand value for this ID
-            d_value = self.demand[d_mask][0]
-
-            # Calculate sum of supply * decay for this demand location
-            sum_sf_d = np.sum(sf_d[d_mask])
-
-            # Calculate Fij
-            if sum_sf_d > 0:
-                fij[d_mask] = d_value * sf_d[d_mask] / sum_sf_d
-
+        key = self._flow_cache_key("fij", beta, kwargs)
+        if key is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        model = self._pairs_for(beta, kwargs)
+        state = self._state_at(beta, kwargs)
+        if model is not self:
+            fij = self._full_pairs(model.fij(beta, **kwargs), model)
+        elif state is not None:
+            fij = state.flows["demand"].copy()
+        elif self._sparse is not None:
+            fij = self._sparse.fij(self.dist_decay(beta, **kwargs))
+        else:
+            # Calculate supply-side decay coefficients
+            decay_values = self.dist_decay(beta, **kwargs)
+            sf_d = self.supply * decay_values
+
+            # Distribute each demand location's value by its share of supply * decay
+            demand_groups = self._demand_groups
+            d_values = self.demand[demand_groups.first]
+            fij = demand_groups.distribute(d_values, sf_d, out=sf_d)
+        if key is not None:
+            self._cache.put(key, fij)
         return fij
 
     def tij(self, beta: float, **kwargs) -> np.ndarray:
@@ -238,31 +994,31 @@ class R2SFCA:
         np.ndarray
             Tij values
         """
-        # Calculate demand-side decay coefficients
-        decay_values = self.dist_decay(beta, **kwargs)
-        df_d = self.demand * decay_values
-
-        # Get unique supply IDs
-        unique_supply_ids = np.unique(self.supply_ids)
-
-        # Initialize Tij result array
-        tij = np.zeros_like(df_d)
-
-        # Calculate Tij for each supply location
-        for s_id in unique_supply_ids:
-            # Get indices where supply ID matches current ID
-            s_mask = self.supply_ids == s_id
-
-            # Get supply value for this ID
-            s_value = self.supply[s_mask][0]
-
-            # Calculate sum of demand * decay for this supply location
-            sum_df_d = np.sum(df_d[s_mask])
-
-            # Calculate Tij
-            if sum_df_d > 0:
-                tij[s_mask] = s_value * df_d[s_mask] / sum_df_d
-
+        key = self._flow_cache_key("tij", beta, kwargs)
+        if key is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        model = self._pairs_for(beta, kwargs)
+        state = self._state_at(beta, kwargs)
+        if model is not self:
+            tij = self._full_pairs(model.tij(beta, **kwargs), model)
+        elif state is not None:
+            tij = state.flows["supply"].copy()
+        elif self._sparse is not None:
+            tij = self._sparse.tij(self.dist_decay(beta, **kwargs))
+        else:
+            # Calculate demand-side decay coefficients
+            decay_values = self.dist_decay(beta, **kwargs)
+            df_d = self.demand * decay_values
+
+            # Distribute each supply location's value by its share of demand * decay
+            supply_groups = self._supply_groups
+            s_values = self.supply[supply_groups.first]
+            tij = supply_groups.distribute(s_values, df_d, out=df_d)
+        if key is not None:
+            self._cache.put(key, tij)
         return tij
 
     def search_fij(
@@ -271,6 +1027,10 @@ class R2SFCA:
         param2_range: Optional[Union[float, Tuple[float, float, float]]] = None,
         metrics: List[str] = ["cross_entropy", "correlation", "rmse"],
         normalize: bool = True,
+        memory_budget: Optional[int] = None,
+        n_jobs: Optional[int] = 1,
+        strategy: str = "grid",
+        target_metric: Optional[str] = None,
     ) -> pd.DataFrame:
         """
         Perform grid search over parameter ranges to find optimal values.
@@ -288,6 +1048,24 @@ class R2SFCA:
             List of evaluation metrics to calculate
         normalize : bool
             Whether to normalize Fij and Tij for cross-entropy calculation
+        memory_budget : int, optional
+            If given, evaluate blocks of parameter points at once as
+            (n_points x n_pairs) matrices, with the block size chosen so the
+            working matrices fit in this many bytes. If None, evaluate one
+            point at a time.
+        n_jobs : int, optional
+            Number of worker processes. Grid points are split into contiguous
+            chunks and the pair arrays are shared with the workers through
+            shared memory; results are returned in grid order. -1 uses all
+            CPUs. With ``memory_budget`` the budget applies per worker.
+        strategy : str
+            'grid' evaluates every point of the ranges. 'adaptive' evaluates a
+            coarse grid spanning each range, then repeatedly refines a finer
+            grid around the best cell until the spacing reaches the range's
+            step, and returns every evaluated point.
+        target_metric : str, optional
+            Metric whose optimum drives the adaptive refinement; defaults to
+            the first entry of ``metrics``
 
         Returns:
         --------
@@ -337,40 +1115,270 @@ class R2SFCA:
                 "Both beta_range and param2_range are fixed values. At least one parameter must have a range for grid search."
             )
 
+        if strategy == "adaptive":
+            return self._adaptive_search(
+                beta_values,
+                param2_values,
+                beta_range,
+                param2_range,
+                metrics,
+                normalize,
+                memory_budget,
+                n_jobs,
+                target_metric or metrics[0],
+            )
+        elif strategy != "grid":
+            raise ValueError(f"Unknown search strategy: {strategy}")
+
+        points = [(beta, param2) for beta in beta_values for param2 in param2_values]
+        point_metrics = self._evaluate_points(
+            points, metrics, normalize, memory_budget, n_jobs
+        )
+        return self._search_results(points, point_metrics)
+
+    def compare_decay_functions(
+        self,
+        decay_functions: Optional[List[Union[str, "DecayFunction"]]] = None,
+        beta_range: Union[float, Tuple[float, float, float]] = (0.0, 2.0, 0.1),
+        param2_ranges: Optional[
+            Dict[str, Union[float, Tuple[float, float, float]]]
+        ] = None,
+        metrics: List[str] = ["cross_entropy", "correlation", "rmse"],
+        summary_metric: str = "cross_entropy",
+        minimize: bool = True,
+        normalize: bool = True,
+        memory_budget: Optional[int] = None,
+        strategy: str = "grid",
+        n_jobs: Optional[int] = None,
+        callback: Optional[Callable[[str, pd.DataFrame], None]] = None,
+    ) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+        """
+        Grid-search several decay functions on the same pairs and summarize.
+
+        Every family is searched with ``search_fij`` on models that share this
+        model's pair arrays; with ``n_jobs`` the families run concurrently in
+        worker processes that map the arrays from shared memory once.
+
+        Parameters:
+        -----------
+        decay_functions : list, optional
+            Decay functions to compare (default: all)
+        beta_range : float or tuple
+            Beta range for every family (see ``search_fij``)
+        param2_ranges : dict, optional
+            Second-parameter range by decay function name; families not
+            listed use the ``search_fij`` default
+        metrics : list
+            Evaluation metrics to calculate
+        summary_metric : str
+            Metric that selects each family's optimum in the summary
+        minimize : bool
+            Whether ``summary_metric`` is minimized (True) or maximized
+        normalize : bool
+            Whether to normalize Fij and Tij for cross-entropy calculation
+        memory_budget : int, optional
+            Byte budget of batched evaluation (see ``search_fij``)
+        strategy : str
+            'grid' or 'adaptive' (see ``search_fij``)
+        n_jobs : int, optional
+            Number of worker processes (-1 for all CPUs)
+        callback : callable, optional
+            Called as ``callback(name, results)`` as each family finishes
+
+        Returns:
+        --------
+        tuple
+            (``create_summary_table`` output with one row per family,
+            dict of search results by decay function name)
+        """
+        from .utils import create_summary_table
+
+        if decay_functions is None:
+            decay_functions = list(DecayFunction)
+        names = [DecayFunction(function).value for function in decay_functions]
+        if self.min_decay is not None and DecayFunction.SIGMOID.value in names:
+            raise ValueError("min_decay is not available for sigmoid decay")
+        param2_ranges = param2_ranges or {}
+
+        tasks = [
+            (
+                name,
+                {
+                    "beta_range": beta_range,
+                    "param2_range": param2_ranges.get(name),
+                    "metrics": metrics,
+                    "normalize": normalize,
+                    "memory_budget": memory_budget,
+                    "strategy": strategy,
+                    "target_metric": summary_metric,
+                },
+            )
+            for name in names
+        ]
+
+        n_workers = resolve_n_jobs(n_jobs)
+        if n_workers > 1 and len(tasks) > 1:
+            searches = imap_with_model(self, _decay_search, tasks, n_workers)
+        else:
+            searches = (_decay_search(self, *task) for task in tasks)
+
+        results = {}
+        for name, search in zip(names, searches):
+            results[name] = search
+            if callback is not None:
+                callback(name, search)
+
+        summary = create_summary_table(
+            list(results.values()),
+            labels=names,
+            metric=summary_metric,
+            minimize=minimize,
+        )
+        return summary, results
+
+    def _with_decay_function(self, decay_function: str) -> "R2SFCA":
+        """Computation-only model sharing the pair arrays with another decay."""
+        arrays, config = self._shared_state()
+        return self._from_shared_state(
+            arrays, {**config, "decay_function": decay_function}
+        )
+
+    def _evaluate_points(
+        self,
+        points: List[Tuple[float, float]],
+        metrics: List[str],
+        normalize: bool,
+        memory_budget: Optional[int],
+        n_jobs: Optional[int],
+    ) -> List[Dict]:
+        """Evaluate metrics at (beta, param2) points, serially or in a pool."""
+        n_workers = resolve_n_jobs(n_jobs)
+        if n_workers > 1 and len(points) > 1:
+            chunks = split_evenly(points, 4 * n_workers)
+            chunk_metrics = map_with_model(
+                self,
+                _search_points,
+                [(chunk, metrics, normalize, memory_budget) for chunk in chunks],
+                n_workers,
+            )
+            return [m for chunk in chunk_metrics for m in chunk]
+        return _search_points(self, points, metrics, normalize, memory_budget)
+
+    def _search_results(
+        self, points: List[Tuple[float, float]], point_metrics: List[Dict]
+    ) -> pd.DataFrame:
+        """Assemble the ``search_fij`` results table."""
         results = []
+        for (beta, param2), eval_metrics in zip(points, point_metrics):
+            result = {
+                "beta": beta,
+                "param2": param2,
+                "decay_function": self.decay_function.value,
+                **eval_metrics,
+            }
+            results.append(result)
+
+        return pd.DataFrame(results)
+
+    def _adaptive_search(
+        self,
+        beta_values: np.ndarray,
+        param2_values: np.ndarray,
+        beta_range,
+        param2_range,
+        metrics: List[str],
+        normalize: bool,
+        memory_budget: Optional[int],
+        n_jobs: Optional[int],
+        target_metric: str,
+    ) -> pd.DataFrame:
+        """
+        Coarse-to-fine search over the ``search_fij`` ranges.
+
+        Each searched axis starts with ``_ADAPTIVE_POINTS`` values spanning its
+        range. After every level the window shrinks to one spacing on each
+        side of the best point, so the spacing drops by a factor of
+        (_ADAPTIVE_POINTS - 1) / 2 per level, until it is at most the range's
+        step. Points are evaluated once; the result is every evaluated point
+        sorted by (beta, param2).
+        """
+        if target_metric not in metrics:
+            metrics = list(metrics) + [target_metric]
+        sign = self._metric_sign(target_metric)
+
+        # (lower, upper, tolerance) per searched axis; fixed axes keep one value
+        axes = []
+        for values, value_range in (
+            (beta_values, beta_range),
+            (param2_values, param2_range),
+        ):
+            if len(values) > 1:
+                axes.append(
+                    (float(values[0]), float(values[-1]), float(value_range[2]))
+                )
+            else:
+                axes.append(None)
 
-        for beta in beta_values:
-            for param2 in param2_values:
-                # Calculate Fij and Tij
-                if self.decay_function == DecayFunction.SIGMOID:
-                    fij = self.fij(beta, steepness=param2)
-                    tij = self.tij(beta, steepness=param2)
-                elif self.decay_function == DecayFunction.GAUSSIAN:
-                    fij = self.fij(beta, d0=param2)
-                    tij = self.tij(beta, d0=param2)
+        windows = [
+            (axis[0], axis[1]) if axis else (float(values[0]), float(values[0]))
+            for axis, values in zip(axes, (beta_values, param2_values))
+        ]
+
+        evaluated = {}
+        while True:
+            axis_values = []
+            spacings = []
+            for axis, (low, high) in zip(axes, windows):
+                if axis is None:
+                    axis_values.append(np.array([low]))
+                    spacings.append(0.0)
                 else:
-                    fij = self.fij(beta)
-                    tij = self.tij(beta)
-
-                # Calculate evaluation metrics
-                eval_metrics = self._calculate_metrics(fij, tij, metrics, normalize)
-
-                # Store results
-                result = {
-                    "beta": beta,
-                    "param2": param2,
-                    "decay_function": self.decay_function.value,
-                    **eval_metrics,
-                }
-                results.append(result)
+                    axis_values.append(np.linspace(low, high, _ADAPTIVE_POINTS))
+                    spacings.append((high - low) / (_ADAPTIVE_POINTS - 1))
+
+            points = [
+                (beta, param2)
+                for beta in axis_values[0]
+                for param2 in axis_values[1]
+                if (beta, param2) not in evaluated
+            ]
+            point_metrics = self._evaluate_points(
+                points, metrics, normalize, memory_budget, n_jobs
+            )
+            evaluated.update(zip(points, point_metrics))
 
-        return pd.DataFrame(results)
+            scores = np.array(
+                [sign * m.get(target_metric, np.nan) for m in evaluated.values()]
+            )
+            if np.all(np.isnan(scores)):
+                break
+            best = list(evaluated)[int(np.nanargmin(scores))]
+
+            if all(
+                axis is None or spacing <= axis[2]
+                for axis, spacing in zip(axes, spacings)
+            ):
+                break
+
+            windows = [
+                (
+                    (max(axis[0], center - spacing), min(axis[1], center + spacing))
+                    if axis
+                    else window
+                )
+                for axis, window, center, spacing in zip(axes, windows, best, spacings)
+            ]
+
+        points = sorted(evaluated)
+        return self._search_results(points, [evaluated[p] for p in points])
 
     def solve_beta(
         self,
         metric: str = "cross_entropy",
         param2: Optional[float] = None,
         method: str = "minimize",
+        gradient: str = "analytic",
+        x0: Optional[float] = None,
         **kwargs,
     ) -> Dict:
         """
@@ -384,199 +1392,1372 @@ class R2SFCA:
             Second parameter value (steepness for sigmoid, d0 for gaussian)
         method : str
             Optimization method ('minimize' or 'adam')
+        gradient : str
+            'analytic' uses the closed-form derivative of the decay function and
+            metric; 'numeric' keeps finite differences (L-BFGS-B's own for
+            'minimize', a forward difference for 'adam') as a check
+        x0 : float, optional
+            Initial beta (default: 1.0), e.g. a previous optimum
         **kwargs
             Additional parameters for optimization
 
         Returns:
         --------
         dict
-            Optimization results including optimal beta and metrics
+            Optimization results including optimal beta and metrics; beta and
+            param2 are also kept in ``fitted_params``
         """
         if param2 is None:
             if self.decay_function == DecayFunction.SIGMOID:
                 param2 = 3.0  # default steepness
             elif self.decay_function == DecayFunction.GAUSSIAN:
-                param2 = np.median(self.travel_cost)  # default d0
+                param2 = self.median_travel_cost  # default d0
             else:
                 param2 = 1.0
 
+        if gradient not in ("analytic", "numeric"):
+            raise ValueError(f"Unknown gradient type: {gradient}")
+
+        x0 = 1.0 if x0 is None else float(x0)
         if method == "minimize":
-            return self._solve_beta_minimize(metric, param2, **kwargs)
+            result = self._solve_beta_minimize(metric, param2, gradient, x0, **kwargs)
         elif method == "adam":
-            return self._solve_beta_adam(metric, param2, **kwargs)
+            result = self._solve_beta_adam(metric, param2, gradient, x0, **kwargs)
         else:
             raise ValueError(f"Unknown optimization method: {method}")
+        self._record_fit(metric, result)
+        return result
 
-    def access_score(self, beta: float, **kwargs) -> pd.Series:
+    def bootstrap_beta(
+        self,
+        n_boot: int = 200,
+        metric: str = "cross_entropy",
+        param2: Optional[float] = None,
+        unit: str = "demand",
+        confidence: float = 0.95,
+        method: str = "minimize",
+        gradient: str = "analytic",
+        n_jobs: Optional[int] = None,
+        random_state: Optional[int] = None,
+        **kwargs,
+    ) -> Dict:
         """
-        Calculate accessibility scores (Ai) for each demand location.
+        Bootstrap distribution and percentile interval of the optimal beta.
+
+        Each replicate resamples demand locations (with all their pairs) or
+        individual pairs with replacement and re-fits beta with
+        ``solve_beta``, warm-started from the full-data optimum. Replicate
+        ``k`` draws from the ``k``-th child of ``SeedSequence(random_state)``,
+        so results do not depend on ``n_jobs``.
 
         Parameters:
         -----------
-        beta : float
-            Decay parameter
+        n_boot : int
+            Number of bootstrap replicates
+        metric : str
+            Metric to optimize (see ``solve_beta``)
+        param2 : float, optional
+            Second parameter value (steepness for sigmoid, d0 for gaussian)
+        unit : str
+            'demand' resamples demand locations; 'pairs' resamples pairs,
+            which also changes every location's set of destinations and can
+            shift the distribution away from the full-data optimum
+        confidence : float
+            Coverage of the percentile interval
+        method : str
+            Optimization method ('minimize' or 'adam')
+        gradient : str
+            'analytic' or 'numeric' (see ``solve_beta``)
+        n_jobs : int, optional
+            Number of worker processes (-1 for all CPUs); the pair arrays are
+            shared with the workers through shared memory
+        random_state : int, optional
+            Seed of the resampling
         **kwargs
-            Additional parameters for decay function
+            Additional parameters for optimization
 
         Returns:
         --------
-        pd.Series
-            Accessibility scores indexed by demand IDs
+        dict
+            'optimal_beta' and 'param2' of the full data, the replicate
+            'betas', their 'std_error', 'ci_lower' and 'ci_upper',
+            'confidence', 'unit' and 'n_failed' (replicates whose optimizer
+            reported failure)
         """
-        tij = self.tij(beta, **kwargs)
+        if self.observed_flow is None:
+            raise ValueError("bootstrap_beta requires observed_flow_col")
+        if unit not in ("demand", "pairs"):
+            raise ValueError(f"Unknown bootstrap unit: {unit}")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        if n_boot < 1:
+            raise ValueError("n_boot must be positive")
+
+        full = self.solve_beta(metric, param2, method, gradient, **kwargs)
+        fit_kwargs = {
+            "metric": metric,
+            "param2": full["param2"],
+            "method": method,
+            "gradient": gradient,
+            "x0": full["optimal_beta"],
+            **kwargs,
+        }
+        seeds = np.random.SeedSequence(random_state).spawn(n_boot)
+
+        n_workers = resolve_n_jobs(n_jobs)
+        if n_workers > 1 and n_boot > 1:
+            chunks = split_evenly(seeds, 4 * n_workers)
+            chunk_fits = map_with_model(
+                self,
+                _bootstrap_fits,
+                [(chunk, unit, fit_kwargs) for chunk in chunks],
+                n_workers,
+            )
+            fits = [fit for chunk in chunk_fits for fit in chunk]
+        else:
+            fits = _bootstrap_fits(self, seeds, unit, fit_kwargs)
 
-        # Calculate accessibility for each demand location
-        unique_demand_ids = np.unique(self.demand_ids)
-        accessibility = {}
+        betas = np.array([beta for beta, _ in fits])
+        tail = 50 * (1 - confidence)
+        ci_lower, ci_upper = np.percentile(betas, [tail, 100 - tail])
+        return {
+            "optimal_beta": full["optimal_beta"],
+            "param2": full["param2"],
+            "betas": betas,
+            "std_error": float(np.std(betas, ddof=1)) if n_boot > 1 else 0.0,
+            "ci_lower": float(ci_lower),
+            "ci_upper": float(ci_upper),
+            "confidence": confidence,
+            "unit": unit,
+            "n_failed": sum(not success for _, success in fits),
+        }
 
-        for d_id in unique_demand_ids:
-            d_mask = self.demand_ids == d_id
-            d_value = self.demand[d_mask][0]
+    def _resample(self, unit: str, rng: np.random.Generator) -> "R2SFCA":
+        """
+        Computation-only model over a bootstrap resample of the pairs.
 
-            if d_value > 0:
-                accessibility[d_id] = np.sum(tij[d_mask]) / d_value
-            else:
-                accessibility[d_id] = 0.0
+        With ``unit='demand'`` every drawn demand location contributes all of
+        its pairs as a separate location, so a location drawn twice counts
+        twice in the supply-side sums and the metrics.
+        """
+        if unit == "demand":
+            draws = rng.integers(
+                0, self._demand_groups.n_groups, self._demand_groups.n_groups
+            )
+            pairs, segment_starts = group_pairs(self._demand_groups, draws)
+            lengths = np.diff(np.append(segment_starts, len(pairs)))
+            demand_codes = np.repeat(np.arange(len(draws)), lengths)
+        else:
+            pairs = np.sort(
+                rng.integers(0, len(self.travel_cost), len(self.travel_cost))
+            )
+            demand_codes = self._demand_groups.codes[pairs]
 
-        # Create series with all demand IDs, filling missing values with 0
-        all_demand_ids = np.unique(self.demand_ids)
-        access_series = pd.Series(0.0, index=all_demand_ids)
-        for d_id, score in accessibility.items():
-            access_series[d_id] = score
+        arrays = {
+            "travel_cost": self.travel_cost[pairs],
+            "demand": self.demand[pairs],
+            "supply": self.supply[pairs],
+            "observed_flow": self.observed_flow[pairs],
+        }
+        config = self._shared_state()[1]
+        for prefix, codes in (
+            ("demand", demand_codes),
+            ("supply", self._supply_groups.codes[pairs]),
+        ):
+            # Resampling reorders the pairs, so the parent's contiguity flags
+            # do not carry over
+            groups = GroupIndex(codes)
+            config[f"{prefix}_contiguous"] = groups.contiguous
+            for name, values in groups.arrays().items():
+                arrays[f"{prefix}_{name}"] = values
+        return self._from_shared_state(arrays, config)
+
+    def solve_params(
+        self,
+        metric: str = "cross_entropy",
+        x0: Optional[Tuple[float, float]] = None,
+        bounds: Optional[List[Tuple[float, float]]] = None,
+        gradient: str = "analytic",
+        **kwargs,
+    ) -> Dict:
+        """
+        Jointly optimize beta and the second decay parameter.
 
-        return access_series
+        Optimizes (beta, steepness) for SIGMOID or (beta, d0) for GAUSSIAN decay
+        with bounded L-BFGS-B, instead of nesting 1-D ``solve_beta`` calls
+        inside a grid over the second parameter.
 
-    def crowd_score(self, beta: float, **kwargs) -> pd.Series:
-        """
-        Calculate crowdedness scores (Cj) for each supply location.
+        Note that the gaussian decay depends on beta and d0 only through
+        beta / d0**2, so its optimum is a ridge and the returned point is the
+        one on that ridge reached from ``x0``.
 
         Parameters:
         -----------
-        beta : float
-            Decay parameter
+        metric : str
+            Metric to optimize ('cross_entropy', 'correlation', 'rmse', 'mse', 'mae')
+        x0 : tuple, optional
+            Starting (beta, param2), e.g. the optimum of a previous fit or the
+            best point of a coarse ``search_fij``. Defaults to beta=1.0 with
+            steepness 3.0 or d0 equal to the median travel cost.
+        bounds : list of tuple, optional
+            [(beta_min, beta_max), (param2_min, param2_max)]. Defaults to
+            beta in [0.001, 10] with steepness in [0.01, 100] or d0 in
+            [0.1 * median travel cost, max travel cost].
+        gradient : str
+            'analytic' or 'numeric', as in ``solve_beta``
         **kwargs
-            Additional parameters for decay function
+            Additional parameters for scipy.optimize.minimize
 
         Returns:
         --------
-        pd.Series
-            Crowdedness scores indexed by supply IDs
+        dict
+            Optimization results including optimal beta, optimal param2,
+            the number of objective evaluations and final metrics; beta and
+            param2 are also kept in ``fitted_params``
         """
-        fij = self.fij(beta, **kwargs)
-
-        # Calculate crowdedness for each supply location
-        unique_supply_ids = np.unique(self.supply_ids)
-        crowdedness = {}
-
-        for s_id in unique_supply_ids:
-            s_mask = self.supply_ids == s_id
-            s_value = self.supply[s_mask][0]
+        if self.decay_function == DecayFunction.SIGMOID:
+            default_x0 = (1.0, 3.0)
+            default_param2_bounds = (0.01, 100.0)
+        elif self.decay_function == DecayFunction.GAUSSIAN:
+            default_x0 = (1.0, self.median_travel_cost)
+            default_param2_bounds = (
+                0.1 * self.median_travel_cost,
+                float(np.max(self.travel_cost)),
+            )
+        else:
+            raise ValueError(
+                f"{self.decay_function.value} decay has no second parameter; "
+                "use solve_beta instead"
+            )
+        if gradient not in ("analytic", "numeric"):
+            raise ValueError(f"Unknown gradient type: {gradient}")
 
-            if s_value > 0:
-                crowdedness[s_id] = np.sum(fij[s_mask]) / s_value
-            else:
-                crowdedness[s_id] = 0.0
+        if x0 is None:
+            x0 = default_x0
+        if bounds is None:
+            bounds = [(0.001, 10.0), default_param2_bounds]
 
-        # Create series with all supply IDs, filling missing values with 0
-        all_supply_ids = np.unique(self.supply_ids)
-        crowd_series = pd.Series(0.0, index=all_supply_ids)
-        for s_id, score in crowdedness.items():
-            crowd_series[s_id] = score
+        from scipy.optimize import minimize
 
-        return crowd_series
+        sign = self._metric_sign(metric)
 
-    def _calculate_metrics(
-        self,
-        fij: np.ndarray,
-        tij: np.ndarray,
-        metrics: List[str],
-        normalize: bool = True,
-    ) -> Dict:
-        """Calculate evaluation metrics between Fij and Tij."""
-        results = {}
+        def objective(params):
+            eval_metrics, _, _ = self._evaluate(
+                params[0], params[1], [metric], full_flows=False
+            )
+            return sign * eval_metrics[metric]
 
-        if normalize:
-            fij_norm = fij / (np.sum(fij) + self.epsilon)
-            tij_norm = tij / (np.sum(tij) + self.epsilon)
+        def objective_and_gradient(params):
+            value, grad, _, _ = self._evaluate_gradient(
+                params[0], params[1], metric, wrt=("beta", "param2"), full_flows=False
+            )
+            return sign * value, sign * grad
+
+        if gradient == "analytic":
+            result = minimize(
+                objective_and_gradient,
+                list(x0),
+                jac=True,
+                bounds=bounds,
+                method="L-BFGS-B",
+                **kwargs,
+            )
         else:
-            fij_norm = fij
-            tij_norm = tij
+            result = minimize(
+                objective, list(x0), bounds=bounds, method="L-BFGS-B", **kwargs
+            )
 
-        for metric in metrics:
+        optimal_beta, optimal_param2 = result.x
+
+        # Calculate final metrics
+        final_metrics, fij, tij = self._evaluate(
+            optimal_beta,
+            optimal_param2,
+            ["cross_entropy", "correlation", "rmse", "mse", "mae"],
+        )
+
+        fit = {
+            "optimal_beta": optimal_beta,
+            "optimal_param2": optimal_param2,
+            "param2": optimal_param2,
+            "optimization_success": result.success,
+            "optimization_message": result.message,
+            "n_evaluations": result.nfev,
+            "final_metrics": final_metrics,
+            "fij": fij,
+            "tij": tij,
+        }
+        self._record_fit(metric, fit)
+        return fit
+
+    def _record_fit(self, metric: str, result: Dict):
+        """Keep the parameters of a fit in ``fitted_params`` (saved by ``save``)."""
+        self.fitted_params = {
+            "decay_function": self.decay_function.value,
+            "metric": metric,
+            "beta": float(result["optimal_beta"]),
+            "param2": float(result["param2"]),
+            "optimization_success": bool(result["optimization_success"]),
+        }
+
+    def access_score(self, beta: float, **kwargs) -> pd.Series:
+        """
+        Calculate accessibility scores (Ai) for each demand location.
+
+        Parameters:
+        -----------
+        beta : float
+            Decay parameter
+        **kwargs
+            Additional parameters for decay function
+
+        Returns:
+        --------
+        pd.Series
+            Accessibility scores indexed by demand IDs
+        """
+        model = self._pairs_for(beta, kwargs)
+        if model is not self:
+            return model.access_score(beta, **kwargs)
+        state = self._state_at(beta, kwargs)
+        if state is not None:
+            return pd.Series(state.score("demand"), index=self._demand_groups.uniques)
+        if self._sparse is not None:
+            return self._sparse_scores(beta, kwargs)[0]
+        return self._access_from_tij(self.tij(beta, **kwargs))
+
+    def crowd_score(self, beta: float, **kwargs) -> pd.Series:
+        """
+        Calculate crowdedness scores (Cj) for each supply location.
+
+        Parameters:
+        -----------
+        beta : float
+            Decay parameter
+        **kwargs
+            Additional parameters for decay function
+
+        Returns:
+        --------
+        pd.Series
+            Crowdedness scores indexed by supply IDs
+        """
+        model = self._pairs_for(beta, kwargs)
+        if model is not self:
+            return model.crowd_score(beta, **kwargs)
+        state = self._state_at(beta, kwargs)
+        if state is not None:
+            return pd.Series(state.score("supply"), index=self._supply_groups.uniques)
+        if self._sparse is not None:
+            return self._sparse_scores(beta, kwargs)[1]
+        return self._crowd_from_fij(self.fij(beta, **kwargs))
+
+    def scores(self, beta: float, **kwargs) -> Tuple[pd.Series, pd.Series]:
+        """
+        Calculate accessibility (Ai) and crowdedness (Cj) scores together.
+
+        The decay function is evaluated once and shared by Fij and Tij.
+
+        Parameters:
+        -----------
+        beta : float
+            Decay parameter
+        **kwargs
+            Additional parameters for decay function
+
+        Returns:
+        --------
+        tuple
+            (accessibility indexed by demand IDs, crowdedness indexed by
+            supply IDs)
+        """
+        model = self._pairs_for(beta, kwargs)
+        if model is not self:
+            return model.scores(beta, **kwargs)
+        state = self._state_at(beta, kwargs)
+        if state is not None:
+            return (
+                pd.Series(state.score("demand"), index=self._demand_groups.uniques),
+                pd.Series(state.score("supply"), index=self._supply_groups.uniques),
+            )
+        if self._sparse is not None:
+            return self._sparse_scores(beta, kwargs)
+
+        fij, tij = self._cached_flows(beta, kwargs)
+        return self._access_from_tij(tij), self._crowd_from_fij(fij)
+
+    def update_supply(
+        self, changes: Union[Mapping, pd.Series], beta: float, **kwargs
+    ) -> Tuple[pd.Series, pd.Series]:
+        """
+        Change the supply of some locations and update the scores at ``beta``.
+
+        The first update at a parameter point evaluates the model once and
+        keeps its flows, per-location denominators and score sums; later
+        updates at the same point only recompute the pairs of the changed
+        locations and of the demand locations they reach. ``fij``, ``tij``
+        and the score methods at that point are served from the kept state.
+        The new values apply to every later evaluation.
+
+        Parameters:
+        -----------
+        changes : dict or pd.Series
+            New supply by supply ID; 0 removes a site. A new site must
+            already have its pairs in the table.
+        beta : float
+            Decay parameter
+        **kwargs
+            Additional parameters for decay function
+
+        Returns:
+        --------
+        tuple
+            (accessibility indexed by demand IDs, crowdedness indexed by
+            supply IDs) after the change
+        """
+        return self._update_locations("supply", changes, beta, kwargs)
+
+    def update_demand(
+        self, changes: Union[Mapping, pd.Series], beta: float, **kwargs
+    ) -> Tuple[pd.Series, pd.Series]:
+        """
+        Change the demand of some locations and update the scores at ``beta``.
+
+        Works as ``update_supply`` with the roles of demand and supply
+        swapped.
+
+        Parameters:
+        -----------
+        changes : dict or pd.Series
+            New demand by demand ID
+        beta : float
+            Decay parameter
+        **kwargs
+            Additional parameters for decay function
+
+        Returns:
+        --------
+        tuple
+            (accessibility indexed by demand IDs, crowdedness indexed by
+            supply IDs) after the change
+        """
+        return self._update_locations("demand", changes, beta, kwargs)
+
+    def _update_locations(
+        self, side: str, changes: Union[Mapping, pd.Series], beta: float, kwargs: Dict
+    ) -> Tuple[pd.Series, pd.Series]:
+        """Validate ``changes``, apply them and return the scores at ``beta``."""
+        groups = self._demand_groups if side == "demand" else self._supply_groups
+        changes = pd.Series(changes, dtype=np.float64)
+        if not np.all(np.isfinite(changes.values)) or np.any(changes.values < 0):
+            raise ValueError(f"New {side} values must be finite and non-negative")
+        changes = changes[~changes.index.duplicated(keep="last")]
+
+        codes = pd.Index(groups.uniques).get_indexer(changes.index)
+        unknown = codes < 0
+        if unknown.any():
+            raise ValueError(
+                f"Unknown {side} IDs (pairs must already exist): "
+                f"{list(changes.index[unknown])}"
+            )
+
+        self._set_location_values(side, codes, changes.values)
+        if self._cache is not None:
+            self._cache.clear()
+        if self.df is not None:
+            column = self.demand_col if side == "demand" else self.supply_col
+            if self.df[column].dtype.kind != "f":
+                self.df[column] = self.df[column].astype(np.float64)
+            pairs, _ = group_pairs(groups, codes)
+            self.df.iloc[pairs, self.df.columns.get_loc(column)] = getattr(self, side)[
+                pairs
+            ]
+
+        model = self._pairs_for(beta, kwargs)
+        key = self._cache_key("state", beta, kwargs)
+        if model._incremental is None or model._incremental.key != key:
+            model._incremental = IncrementalState(
+                key, model, model.dist_decay(beta, **kwargs)
+            )
+        return model.scores(beta, **kwargs)
+
+    def _set_location_values(self, side: str, codes: np.ndarray, values: np.ndarray):
+        """Write new location values into the pair arrays and kept states."""
+        groups = self._demand_groups if side == "demand" else self._supply_groups
+        pair_values = getattr(self, side)
+        if side not in self._owned_values:
+            # Never write into the caller's arrays; integer columns become float
+            pair_values = pair_values.astype(np.result_type(pair_values, np.float32))
+            setattr(self, side, pair_values)
+            self._owned_values.add(side)
+
+        pairs, segment_starts = group_pairs(groups, codes)
+        lengths = np.diff(np.append(segment_starts, len(pairs)))
+        pair_values[pairs] = np.repeat(values, lengths)
+
+        if self._sparse_pattern is not None:
+            getattr(self._sparse_pattern, side)[codes] = values
+        if self._incremental is not None:
+            self._incremental.update(side, codes)
+        if self._catchment is not None:
+            self._catchment[1]._set_location_values(side, codes, values)
+
+    def _state_at(self, beta: float, kwargs: Dict) -> Optional[IncrementalState]:
+        """The kept incremental state if it belongs to this parameter point."""
+        state = self._incremental
+        if state is not None and state.key == self._cache_key("state", beta, kwargs):
+            return state
+        return None
+
+    def scenario_scores(
+        self,
+        beta: float,
+        supply: Optional[Union[np.ndarray, pd.DataFrame, pd.Series]] = None,
+        demand: Optional[Union[np.ndarray, pd.DataFrame, pd.Series]] = None,
+        **kwargs,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Accessibility and crowdedness for K alternative supply/demand scenarios.
+
+        The decay is evaluated once and every scenario is scored from the same
+        demand x supply decay matrix with batched sparse products, so
+        hundreds of siting scenarios (capacity changes, closures as zero
+        supply) cost little more than one. A new site needs its pairs in the
+        input table, e.g. with zero supply in the baseline.
+
+        Parameters:
+        -----------
+        beta : float
+            Decay parameter
+        supply : array-like or pd.DataFrame, optional
+            Supply per location: an array of shape (n_supply,) or
+            (n_supply, K) ordered like ``supply_id_values``, or a
+            Series/DataFrame indexed by supply ID with one column per
+            scenario. Defaults to the model's supply.
+        demand : array-like or pd.DataFrame, optional
+            Demand per location, as ``supply`` but over ``demand_id_values``.
+            Defaults to the model's demand.
+        **kwargs
+            Additional parameters for decay function
+
+        Returns:
+        --------
+        tuple
+            (accessibility DataFrame indexed by demand IDs, crowdedness
+            DataFrame indexed by supply IDs), one column per scenario
+        """
+        model = self._pairs_for(beta, kwargs)
+        if model is not self:
+            return model.scenario_scores(beta, supply, demand, **kwargs)
+
+        operators = self._sparse_operators()
+        supply, supply_names = self._scenario_matrix(
+            supply, operators.supply, self._supply_groups.uniques, "supply"
+        )
+        demand, demand_names = self._scenario_matrix(
+            demand, operators.demand, self._demand_groups.uniques, "demand"
+        )
+
+        n_scenarios = max(supply.shape[1], demand.shape[1])
+        for name, values in (("supply", supply), ("demand", demand)):
+            if values.shape[1] not in (1, n_scenarios):
+                raise ValueError(
+                    f"{name} has {values.shape[1]} scenarios, expected {n_scenarios}"
+                )
+        supply = np.broadcast_to(supply, (supply.shape[0], n_scenarios))
+        demand = np.broadcast_to(demand, (demand.shape[0], n_scenarios))
+        names = supply_names if len(supply_names) == n_scenarios else demand_names
+
+        access, crowd = operators.scenario_scores(
+            self.dist_decay(beta, **kwargs), demand, supply
+        )
+        return (
+            pd.DataFrame(access, index=self._demand_groups.uniques, columns=names),
+            pd.DataFrame(crowd, index=self._supply_groups.uniques, columns=names),
+        )
+
+    @staticmethod
+    def _scenario_matrix(
+        values, baseline: np.ndarray, ids: np.ndarray, name: str
+    ) -> Tuple[np.ndarray, List]:
+        """Scenario values as a float (n_locations, K) matrix plus column names."""
+        if values is None:
+            return baseline[:, None].astype(np.float64), [0]
+
+        if isinstance(values, (pd.Series, pd.DataFrame)):
+            frame = values.to_frame() if isinstance(values, pd.Series) else values
+            missing = pd.Index(ids).difference(frame.index)
+            if len(missing):
+                raise ValueError(f"{name} scenarios miss {len(missing)} location IDs")
+            frame = frame.reindex(ids)
+            return frame.to_numpy(dtype=np.float64), list(frame.columns)
+
+        matrix = np.asarray(values, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix[:, None]
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError(
+                f"{name} scenarios must have shape ({len(ids)}, K), got {matrix.shape}"
+            )
+        return matrix, list(range(matrix.shape[1]))
+
+    def _sparse_operators(self) -> SparseBackend:
+        """Demand x supply CSR operators, built on first use."""
+        if self._sparse_pattern is None:
+            self._sparse_pattern = SparseBackend(
+                self._demand_groups.codes,
+                self._supply_groups.codes,
+                self.demand,
+                self.supply,
+            )
+        return self._sparse_pattern
+
+    def _sparse_scores(self, beta: float, kwargs: Dict) -> Tuple[pd.Series, pd.Series]:
+        """Accessibility and crowdedness as sparse matrix-vector products."""
+        access, crowd = self._sparse.scores(self.dist_decay(beta, **kwargs))
+        return (
+            pd.Series(access, index=self._demand_groups.uniques),
+            pd.Series(crowd, index=self._supply_groups.uniques),
+        )
+
+    def _access_from_tij(self, tij: np.ndarray) -> pd.Series:
+        """Ai = sum of Tij over each demand location / its demand (0 if none)."""
+        demand_groups = self._demand_groups
+        return self._location_scores(demand_groups, demand_groups.sum(tij), self.demand)
+
+    def _crowd_from_fij(self, fij: np.ndarray) -> pd.Series:
+        """Cj = sum of Fij over each supply location / its supply (0 if none)."""
+        supply_groups = self._supply_groups
+        return self._location_scores(supply_groups, supply_groups.sum(fij), self.supply)
+
+    @staticmethod
+    def _location_scores(
+        groups: GroupIndex, flow_sums: np.ndarray, values: np.ndarray
+    ) -> pd.Series:
+        """Divide per-location flow sums by location values into a Series."""
+        location_values = values[groups.first]
+        scores = np.zeros(groups.n_groups)
+        positive = location_values > 0
+        np.divide(flow_sums, location_values, out=scores, where=positive)
+        return pd.Series(scores, index=groups.uniques)
+
+    def catchment_report(
+        self,
+        beta: float,
+        metrics: List[str] = ["cross_entropy", "correlation", "rmse"],
+        **kwargs,
+    ) -> Dict:
+        """
+        Error introduced by the catchment cutoff at one parameter point.
+
+        Parameters:
+        -----------
+        beta : float
+            Decay parameter
+        metrics : list
+            Metrics whose truncation error is reported
+        **kwargs
+            Additional parameters for decay function
+
+        Returns:
+        --------
+        dict
+            - n_pairs, n_kept, kept_fraction: size of the reduced pair set
+            - max_dropped_decay: largest decay among dropped pairs
+            - max_fij_error, max_tij_error: largest relative change of a
+              retained Fij (Tij) against the untruncated model
+            - dropped_fij_share, dropped_tij_share: share of total Fij (Tij)
+              that the untruncated model assigns to dropped pairs, including
+              locations left without any pair by ``max_travel_cost``
+            - metric_errors: metric name -> metric with the cutoff minus the
+              metric of the untruncated model (dropped pairs count as zero
+              flows, as in every evaluation)
+        """
+        n_pairs = len(self.travel_cost)
+        model = self._pairs_for(beta, kwargs)
+        if model is self:
+            return {
+                "n_pairs": n_pairs,
+                "n_kept": n_pairs,
+                "kept_fraction": 1.0,
+                "max_dropped_decay": 0.0,
+                "max_fij_error": 0.0,
+                "max_tij_error": 0.0,
+                "dropped_fij_share": 0.0,
+                "dropped_tij_share": 0.0,
+                "metric_errors": {metric: 0.0 for metric in metrics},
+            }
+
+        dropped = np.ones(n_pairs, dtype=bool)
+        dropped[model._keep] = False
+        dropped_decay = decay_values(
+            self.decay_function,
+            self.travel_cost[dropped],
+            beta,
+            self.median_travel_cost,
+            **{"epsilon": self.epsilon, **kwargs},
+        )
+        kept_decay = model.dist_decay(beta, **kwargs)
+
+        report = {
+            "n_pairs": n_pairs,
+            "n_kept": len(model._keep),
+            "kept_fraction": len(model._keep) / n_pairs,
+            "max_dropped_decay": float(np.max(dropped_decay, initial=0.0)),
+        }
+        for name, groups, kept_groups, totals, weights, kept_weights in (
+            (
+                "fij",
+                self._demand_groups,
+                model._demand_groups,
+                self.demand,
+                self.supply,
+                model.supply,
+            ),
+            (
+                "tij",
+                self._supply_groups,
+                model._supply_groups,
+                self.supply,
+                self.demand,
+                model.demand,
+            ),
+        ):
+            kept_sums = kept_groups.sum(kept_weights * kept_decay).astype(np.float64)
+            dropped_sums = np.bincount(
+                groups.codes[dropped],
+                weights=weights[dropped] * dropped_decay,
+                minlength=groups.n_groups,
+            )
+            location_totals = totals[groups.first].astype(np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                # Retained flows grow by dropped / kept; dropped flows are lost
+                error = np.where(kept_sums > 0, dropped_sums / kept_sums, 0.0)
+                lost = np.where(
+                    kept_sums + dropped_sums > 0,
+                    location_totals * dropped_sums / (kept_sums + dropped_sums),
+                    0.0,
+                )
+            report[f"max_{name}_error"] = float(np.max(error, initial=0.0))
+            report[f"dropped_{name}_share"] = float(
+                np.sum(lost) / np.sum(location_totals)
+            )
+
+        truncated = model._calculate_metrics(
+            *model._flows(model.dist_decay(beta, **kwargs)), metrics
+        )
+        untruncated = self._calculate_metrics(
+            *self._flows(self.dist_decay(beta, **kwargs)), metrics
+        )
+        report["metric_errors"] = {
+            metric: float(truncated[metric] - untruncated[metric])
+            for metric in truncated
+        }
+        return report
+
+    def _required_cutoff(self, beta: float, kwargs: Dict) -> float:
+        """
+        Largest decay excess (see ``_catchment_excess``) a pair may have.
+
+        Every decay except sigmoid is exp(-c * g(d)), so a pair's decay is at
+        least ``min_decay`` times the largest decay of a location exactly
+        when its excess over that location's smallest g(d) is at most
+        -log(min_decay) / c.
+        """
+        if self.min_decay is None:
+            return np.inf
+        params = self._default_params[self.decay_function].copy()
+        params.update(kwargs)
+        coefficient = beta
+        if self.decay_function == DecayFunction.GAUSSIAN:
+            coefficient = beta / params["d0"] ** 2
+        if coefficient <= 0:
+            return np.inf
+        return -np.log(self.min_decay) / coefficient
+
+    def _catchment_excess(self) -> np.ndarray:
+        """
+        Beta-independent decay excess of every pair.
+
+        The excess is g(d) minus the smallest g(d) of the pair's demand or of
+        its supply location, whichever is smaller, where g is the
+        ``transformed_cost`` of the decay function.
+        """
+        if self._decay_excess is None:
+            transformed = self._transformed_cost(self.epsilon)
+            excess = np.full(len(transformed), np.inf)
+            for groups in (self._demand_groups, self._supply_groups):
+                grouped = np.take(transformed, groups.order)
+                group_min = np.minimum.reduceat(grouped, groups.offsets[:-1])
+                np.minimum(excess, transformed - group_min[groups.codes], out=excess)
+            self._decay_excess = excess
+        return self._decay_excess
+
+    @staticmethod
+    def _catchment_level(required: float) -> float:
+        """Round an excess cutoff up to the next power of 1.25."""
+        if np.isinf(required):
+            return required
+        return _CATCHMENT_STEP ** np.ceil(np.log(required) / np.log(_CATCHMENT_STEP))
+
+    def _pairs_for(self, beta: float, kwargs: Dict) -> "R2SFCA":
+        """Model to evaluate at a parameter point: self or a reduced pair set."""
+        if self.max_travel_cost is None and self.min_decay is None:
+            return self
+        return self._pairs_within(self._required_cutoff(beta, kwargs))
+
+    def _pairs_within(self, required: float) -> "R2SFCA":
+        """
+        Model over the pairs within ``max_travel_cost`` whose decay excess is
+        at most ``required`` rounded up to a power of 1.25.
+
+        Rounding gives nearby parameter points the same reduced set, so the
+        set is only rebuilt when the parameters cross a level, and results do
+        not depend on the order of evaluation.
+        """
+        cutoff = self._catchment_level(required)
+        if self.max_travel_cost is None and np.isinf(cutoff):
+            return self
+        if self._catchment is not None and self._catchment[0] == cutoff:
+            return self._catchment[1]
+
+        keep = np.ones(len(self.travel_cost), dtype=bool)
+        if self.max_travel_cost is not None:
+            keep &= self.travel_cost <= self.max_travel_cost
+        if not np.isinf(cutoff):
+            keep &= self._catchment_excess() <= cutoff
+        model = self._subset_model(np.flatnonzero(keep))
+        if self._profiler is not None:
+            model._instrument(self._profiler, _PROFILED_SUBMODEL_METHODS)
+        self._catchment = (cutoff, model)
+        return model
+
+    def _subset_model(self, keep: np.ndarray) -> "R2SFCA":
+        """Computation-only model over the pairs ``keep`` (same location codes)."""
+        arrays = {
+            "travel_cost": self.travel_cost[keep],
+            "demand": self.demand[keep],
+            "supply": self.supply[keep],
+        }
+        if self.observed_flow is not None:
+            arrays["observed_flow"] = self.observed_flow[keep]
+        for prefix, groups in (
+            ("demand", self._demand_groups),
+            ("supply", self._supply_groups),
+        ):
+            for name, values in groups.subset(keep).arrays().items():
+                arrays[f"{prefix}_{name}"] = values
+
+        config = {
+            "decay_function": self.decay_function.value,
+            "epsilon": self.epsilon,
+            "median_travel_cost": self.median_travel_cost,
+        }
+        model = self._from_shared_state(arrays, config)
+        model._demand_groups.uniques = self._demand_groups.uniques
+        model._supply_groups.uniques = self._supply_groups.uniques
+        model._keep = keep
+        model._zero_flows = self._dropped_pairs_summary(keep)
+        return model
+
+    def _dropped_pairs_summary(self, keep: np.ndarray) -> Tuple[int, float, float]:
+        """
+        (count, observed mean, observed sum of squared deviations) of the
+        pairs outside ``keep``.
+
+        A reduced model adds the dropped pairs to its metrics as pairs with
+        zero Fij and Tij, so metrics stay comparable across pair sets.
+        """
+        count = len(self.travel_cost) - len(keep)
+        if self.observed_flow is None or count == 0:
+            return count, 0.0, 0.0
+        dropped = np.ones(len(self.travel_cost), dtype=bool)
+        dropped[keep] = False
+        observed = self.observed_flow[dropped].astype(np.float64)
+        mean = float(np.mean(observed))
+        observed -= mean
+        return count, mean, float(np.dot(observed, observed))
+
+    def _full_pairs(self, values: np.ndarray, model: "R2SFCA") -> np.ndarray:
+        """Expand values of a reduced pair set to every pair (zeros elsewhere)."""
+        full = np.zeros(len(self.travel_cost), dtype=values.dtype)
+        full[model._keep] = values
+        return full
+
+    def _param2_kwargs(self, param2: Optional[float]) -> Dict:
+        """Map the generic second parameter onto the decay function keyword."""
+        if param2 is None:
+            return {}
+        if self.decay_function == DecayFunction.SIGMOID:
+            return {"steepness": param2}
+        if self.decay_function == DecayFunction.GAUSSIAN:
+            return {"d0": param2}
+        return {}
+
+    @staticmethod
+    def _metric_sign(metric: str) -> float:
+        """Sign that turns a metric into a loss (correlations are maximized)."""
+        if metric == "correlation" or metric.endswith("_correlation"):
+            return -1.0
+        return 1.0
+
+    def _evaluate(
+        self,
+        beta: float,
+        param2: Optional[float],
+        metrics: List[str],
+        normalize: bool = True,
+        full_flows: bool = True,
+    ) -> Tuple[Dict, np.ndarray, np.ndarray]:
+        """
+        Evaluate metrics at one parameter point in a single fused pass.
+
+        The decay vector is computed once and feeds both the supply-side (Fij)
+        and the demand-side (Tij) normalization. Tij is written over the decay
+        buffer, per-location factors are broadcast through a single scratch
+        vector, and the metrics are accumulated in one blocked pass over Fij
+        and Tij, so the only allocations besides Fij and Tij are that scratch
+        vector, per-location sums and cache-sized blocks.
+
+        With a catchment cutoff the flows are computed on the retained pairs
+        and the dropped pairs enter the metrics with zero Fij and Tij, so the
+        metrics cover every pair; ``full_flows=False`` then returns the
+        retained flows without expanding them to every pair.
+
+        Returns:
+        --------
+        tuple
+            (metrics dict, fij, tij)
+        """
+        model = self._pairs_for(beta, self._param2_kwargs(param2))
+        if model is not self:
+            eval_metrics, fij, tij = model._evaluate(beta, param2, metrics, normalize)
+            if full_flows:
+                fij = self._full_pairs(fij, model)
+                tij = self._full_pairs(tij, model)
+            return eval_metrics, fij, tij
+
+        fij, tij = self._cached_flows(beta, self._param2_kwargs(param2))
+        eval_metrics = self._calculate_metrics(fij, tij, metrics, normalize)
+        return eval_metrics, fij, tij
+
+    def _flow_cache_key(self, kind: str, beta: float, kwargs: Dict) -> Optional[Tuple]:
+        """Cache key for Fij or Tij, or None when flows are not cached."""
+        if self._cache is None or not self._cache_flows:
+            return None
+        return self._cache_key(kind, beta, kwargs)
+
+    def _cached_flows(self, beta: float, kwargs: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Fij and Tij at one parameter point, through the cache when enabled."""
+        fij_key = self._flow_cache_key("fij", beta, kwargs)
+        if fij_key is None:
+            return self._flows(self.dist_decay(beta, **kwargs))
+
+        tij_key = self._flow_cache_key("tij", beta, kwargs)
+        fij = self._cache.get(fij_key)
+        tij = self._cache.get(tij_key)
+        if fij is not None and tij is not None:
+            return fij, tij
+
+        fij, tij = self._flows(self.dist_decay(beta, **kwargs))
+        self._cache.put(fij_key, fij)
+        self._cache.put(tij_key, tij)
+        return fij, tij
+
+    def _flows(self, decay: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fij and Tij from one decay vector, which is overwritten with Tij
+        unless it is a read-only cached vector.
+        """
+        if self._sparse is not None:
+            return self._sparse.flows(decay)
+
+        fij = np.multiply(self.supply, decay)
+        scratch = np.empty_like(fij)
+        d_values = self.demand[self._demand_groups.first]
+        self._demand_groups.distribute(d_values, fij, out=fij, scratch=scratch)
+
+        tij = np.multiply(
+            self.demand, decay, out=decay if decay.flags.writeable else None
+        )
+        s_values = self.supply[self._supply_groups.first]
+        self._supply_groups.distribute(s_values, tij, out=tij, scratch=scratch)
+        return fij, tij
+
+    def _dist_decay_log_derivatives(
+        self, beta: float, param2: Optional[float], wrt: Tuple[str, ...]
+    ) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Decay values and closed-form partial derivatives of log(decay).
+
+        Log-derivatives stay finite where the decay itself underflows, which
+        keeps the flow derivatives well defined for steep decays.
+
+        Parameters:
+        -----------
+        beta : float
+            Primary decay parameter
+        param2 : float, optional
+            Second parameter (steepness for sigmoid, d0 for gaussian)
+        wrt : tuple of str
+            Parameters to differentiate with respect to ('beta', 'param2')
+
+        Returns:
+        --------
+        tuple
+            (decay values, list of d log(decay) vectors in ``wrt`` order)
+        """
+        params = self._default_params[self.decay_function].copy()
+        params.update(self._param2_kwargs(param2))
+        decay = self.dist_decay(beta, **self._param2_kwargs(param2))
+
+        distance = self.travel_cost
+        if distance.dtype.kind != "f":
+            distance = distance.astype(np.float64)
+        transformed = self._transformed_cost(self.epsilon)
+
+        derivatives = []
+        for name in wrt:
+            if name == "beta":
+                # Every family except sigmoid has the form exp(-beta * g(d))
+                if self.decay_function == DecayFunction.GAUSSIAN:
+                    derivative = transformed * (-1.0 / params["d0"] ** 2)
+                elif transformed is not None:
+                    derivative = np.negative(transformed)
+                elif self.decay_function == DecayFunction.SIGMOID:
+                    derivative = self._sigmoid_log_slope(beta, params, decay) * (
+                        -params["steepness"] * self.median_travel_cost
+                    )
+            elif name == "param2":
+                if self.decay_function == DecayFunction.GAUSSIAN:
+                    d0 = params["d0"]
+                    derivative = transformed * (2.0 * beta / d0**3)
+                elif self.decay_function == DecayFunction.SIGMOID:
+                    derivative = self._sigmoid_log_slope(beta, params, decay) * (
+                        distance - beta * self.median_travel_cost
+                    )
+                else:
+                    raise ValueError(
+                        f"{self.decay_function.value} decay has no second parameter"
+                    )
+            else:
+                raise ValueError(f"Unknown parameter: {name}")
+            derivatives.append(np.broadcast_to(derivative, decay.shape))
+
+        return decay, derivatives
+
+    def _sigmoid_log_slope(
+        self, beta: float, params: Dict, decay: np.ndarray
+    ) -> np.ndarray:
+        """Derivative of log(sigmoid decay) with respect to its clipped argument."""
+        arg = params["steepness"] * (self.travel_cost - beta * self.median_travel_cost)
+        slope = decay - 1.0
+        slope[np.abs(arg) > 500] = 0.0
+        return slope
+
+    def _evaluate_gradient(
+        self,
+        beta: float,
+        param2: Optional[float],
+        metric: str,
+        normalize: bool = True,
+        wrt: Tuple[str, ...] = ("beta",),
+        full_flows: bool = True,
+    ) -> Tuple[float, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluate a metric and its exact gradient at one parameter point.
+
+        With w = supply * decay and W the per-demand sum of w, Fij = D * w / W,
+        so dFij = Fij * (dlog(decay) - dW / W) where dW / W is the w-weighted
+        mean of dlog(decay) over the demand location; Tij is differentiated the
+        same way over supply locations. The metric derivative is then taken
+        from ``gradients.metric_gradient``.
+
+        Returns:
+        --------
+        tuple
+            (metric value, gradient array in ``wrt`` order, fij, tij)
+        """
+        model = self._pairs_for(beta, self._param2_kwargs(param2))
+        if model is not self:
+            value, gradient, fij, tij = model._evaluate_gradient(
+                beta, param2, metric, normalize, wrt
+            )
+            if full_flows:
+                fij = self._full_pairs(fij, model)
+                tij = self._full_pairs(tij, model)
+            return value, gradient, fij, tij
+
+        decay, d_log_decay = self._dist_decay_log_derivatives(beta, param2, wrt)
+        d_log_decay = np.stack(d_log_decay)
+
+        flows = []
+        d_flows = []
+        for groups, totals_source, weight_source in (
+            (self._demand_groups, self.demand, self.supply),
+            (self._supply_groups, self.supply, self.demand),
+        ):
+            totals = totals_source[groups.first]
+            weights = weight_source * decay
+            weight_sums = groups.sum(weights)
+            flow = groups.distribute(totals, weights, weight_sums=weight_sums)
+
+            d_weight_sums = groups.sum_rows(weights * d_log_decay)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                d_log_sums = np.where(weight_sums > 0, d_weight_sums / weight_sums, 0.0)
+            d_flow = flow * (d_log_decay - d_log_sums[:, groups.codes])
+
+            flows.append(flow)
+            d_flows.append(d_flow)
+
+        fij, tij = flows
+        value = self._calculate_metrics(fij, tij, [metric], normalize)[metric]
+        gradient = np.array(
+            [
+                metric_gradient(
+                    metric,
+                    fij,
+                    tij,
+                    dfij,
+                    dtij,
+                    self.observed_flow,
+                    normalize,
+                    self.epsilon,
+                    self._zero_flows,
+                )
+                for dfij, dtij in zip(*d_flows)
+            ]
+        )
+        return value, gradient, fij, tij
+
+    @property
+    def _compute_dtype(self) -> np.dtype:
+        """Floating-point dtype of the decay and flow vectors."""
+        return np.result_type(self.demand, self.supply, self.travel_cost, np.float32)
+
+    def _log_epsilon(self, dtype: np.dtype) -> float:
+        """``epsilon`` raised to the smallest normal number of ``dtype``."""
+        return max(self.epsilon, float(np.finfo(dtype).tiny))
+
+    def _batch_block_size(self, memory_budget: int) -> int:
+        """Number of parameter points whose working matrices fit the budget."""
+        # Fij, Tij (written over the decay matrix) and one scratch matrix
+        bytes_per_point = 3 * len(self.travel_cost) * self._compute_dtype.itemsize
+        return max(1, int(memory_budget // bytes_per_point))
+
+    def _evaluate_batch(
+        self,
+        betas: List[float],
+        param2s: List[Optional[float]],
+        metrics: List[str],
+        normalize: bool = True,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Evaluate metrics for a block of parameter points at once.
+
+        Decay values for the block are stacked into an (n_points x n_pairs)
+        matrix and the per-location sums of every point are taken with one
+        segmented reduction along the pair axis.
+
+        Returns:
+        --------
+        dict
+            Metric name -> array of values, one per parameter point
+        """
+        if self.max_travel_cost is not None or self.min_decay is not None:
+            return self._evaluate_batch_by_catchment(betas, param2s, metrics, normalize)
+
+        n_points = len(betas)
+        decay = np.empty((n_points, len(self.travel_cost)), dtype=self._compute_dtype)
+        for k, (beta, param2) in enumerate(zip(betas, param2s)):
+            decay[k] = self.dist_decay(beta, **self._param2_kwargs(param2))
+
+        scratch = np.empty_like(decay)
+        fij = np.multiply(decay, self.supply)
+        d_values = self.demand[self._demand_groups.first]
+        self._demand_groups.distribute_rows(d_values, fij, scratch=scratch)
+
+        tij = np.multiply(decay, self.demand, out=decay)
+        s_values = self.supply[self._supply_groups.first]
+        self._supply_groups.distribute_rows(s_values, tij, scratch=scratch)
+
+        return self._calculate_batch_metrics(fij, tij, metrics, normalize, scratch)
+
+    def _evaluate_batch_by_catchment(
+        self,
+        betas: List[float],
+        param2s: List[Optional[float]],
+        metrics: List[str],
+        normalize: bool,
+    ) -> Dict[str, np.ndarray]:
+        """``_evaluate_batch`` with points grouped by their reduced pair set."""
+        levels = [
+            self._catchment_level(
+                self._required_cutoff(beta, self._param2_kwargs(param2))
+            )
+            for beta, param2 in zip(betas, param2s)
+        ]
+        results = {}
+        for level in dict.fromkeys(levels):
+            index = [k for k, point_level in enumerate(levels) if point_level == level]
+            model = self._pairs_within(level)
+            block_betas = [betas[k] for k in index]
+            block_param2s = [param2s[k] for k in index]
+            if model is self:
+                # No truncation at these points: evaluate on every pair
+                block = [
+                    self._evaluate(beta, param2, metrics, normalize, full_flows=False)[
+                        0
+                    ]
+                    for beta, param2 in zip(block_betas, block_param2s)
+                ]
+                block = {
+                    name: np.array([values[name] for values in block])
+                    for name in block[0]
+                }
+            else:
+                block = model._evaluate_batch(
+                    block_betas, block_param2s, metrics, normalize
+                )
+            for name, values in block.items():
+                results.setdefault(name, np.empty(len(betas)))[index] = values
+        return results
+
+    def _calculate_batch_metrics(
+        self,
+        fij: np.ndarray,
+        tij: np.ndarray,
+        metrics: List[str],
+        normalize: bool,
+        scratch: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """Row-wise version of ``_calculate_metrics`` for (n_points x n_pairs) blocks."""
+        results = {}
+        zero_flows = self._zero_flows
+        n_zero = zero_flows[0] if zero_flows is not None else 0
+        n_pairs = fij.shape[1] + n_zero
+        epsilon = self._log_epsilon(scratch.dtype)
+
+        mse = None
+        for metric in metrics:
             if metric == "cross_entropy":
-                results[metric] = -np.sum(fij_norm * np.log(tij_norm + self.epsilon))
+                if normalize:
+                    fij_total = np.sum(fij, axis=1, dtype=np.float64) + self.epsilon
+                    tij_total = np.sum(tij, axis=1, dtype=np.float64) + self.epsilon
+                else:
+                    fij_total = np.ones(len(fij))
+                    tij_total = np.ones(len(tij))
+                np.divide(tij, tij_total[:, None], out=scratch, casting="unsafe")
+                scratch += epsilon
+                np.log(scratch, out=scratch)
+                scratch *= fij
+                results[metric] = -np.sum(scratch, axis=1, dtype=np.float64) / fij_total
 
             elif metric == "correlation":
-                corr, _ = pearsonr(fij, tij)
-                results[metric] = corr
-
-            elif metric == "rmse":
-                results[metric] = np.sqrt(np.mean((fij - tij) ** 2))
+                results[metric] = _pearson_rows(fij, tij, scratch, (n_zero, 0.0, 0.0))
 
-            elif metric == "mse":
-                results[metric] = np.mean((fij - tij) ** 2)
+            elif metric in ("rmse", "mse"):
+                if mse is None:
+                    np.subtract(fij, tij, out=scratch)
+                    mse = (
+                        np.einsum("ij,ij->i", scratch, scratch, dtype=np.float64)
+                        / n_pairs
+                    )
+                results[metric] = np.sqrt(mse) if metric == "rmse" else mse
 
             elif metric == "mae":
-                results[metric] = np.mean(np.abs(fij - tij))
+                np.subtract(fij, tij, out=scratch)
+                np.abs(scratch, out=scratch)
+                results[metric] = np.sum(scratch, axis=1, dtype=np.float64) / n_pairs
 
             elif metric == "fij_flow_correlation" and self.observed_flow is not None:
-                corr, _ = pearsonr(fij, self.observed_flow)
-                results[metric] = corr
+                results[metric] = _pearson_rows(
+                    fij, self.observed_flow, scratch, zero_flows
+                )
 
             elif metric == "tij_flow_correlation" and self.observed_flow is not None:
-                corr, _ = pearsonr(tij, self.observed_flow)
-                results[metric] = corr
+                results[metric] = _pearson_rows(
+                    tij, self.observed_flow, scratch, zero_flows
+                )
 
         return results
 
-    def _solve_beta_minimize(self, metric: str, param2: float, **kwargs) -> Dict:
+    def _calculate_metrics(
+        self,
+        fij: np.ndarray,
+        tij: np.ndarray,
+        metrics: List[str],
+        normalize: bool = True,
+    ) -> Dict:
+        """
+        Calculate evaluation metrics between Fij and Tij.
+
+        On a reduced pair set the dropped pairs are added as zero flows.
+        """
+        # One pass over the flows in float64 blocks; the logarithm's epsilon
+        # still follows the flows' dtype
+        return compute_metrics(
+            fij,
+            tij,
+            metrics,
+            observed=self.observed_flow,
+            normalize=normalize,
+            epsilon=self.epsilon,
+            log_epsilon=self._log_epsilon(np.result_type(fij, tij, np.float32)),
+            zero_flows=self._zero_flows,
+        )
+
+    def _solve_beta_minimize(
+        self,
+        metric: str,
+        param2: float,
+        gradient: str = "analytic",
+        x0: float = 1.0,
+        **kwargs,
+    ) -> Dict:
         """Solve for optimal beta using scipy.optimize.minimize."""
+        from scipy.optimize import minimize
 
-        def objective(beta):
-            if self.decay_function == DecayFunction.SIGMOID:
-                fij = self.fij(beta[0], steepness=param2)
-                tij = self.tij(beta[0], steepness=param2)
-            elif self.decay_function == DecayFunction.GAUSSIAN:
-                fij = self.fij(beta[0], d0=param2)
-                tij = self.tij(beta[0], d0=param2)
-            else:
-                fij = self.fij(beta[0])
-                tij = self.tij(beta[0])
+        sign = self._metric_sign(metric)
 
-            eval_metrics = self._calculate_metrics(fij, tij, [metric])
+        def objective(beta):
+            eval_metrics, _, _ = self._evaluate(
+                beta[0], param2, [metric], full_flows=False
+            )
 
             # For metrics that should be maximized, return negative value
-            if metric == "correlation" or metric.endswith("_correlation"):
-                return -eval_metrics[
-                    metric
-                ]  # Maximize correlation = minimize negative correlation
-            else:
-                return eval_metrics[metric]  # Minimize error metrics
+            return sign * eval_metrics[metric]
+
+        def objective_and_gradient(beta):
+            value, grad, _, _ = self._evaluate_gradient(
+                beta[0], param2, metric, full_flows=False
+            )
+            return sign * value, sign * grad
 
         # Set up optimization bounds
         bounds = [(0.001, 10.0)]  # beta must be positive
 
         # Initial guess
-        x0 = [1.0]
+        x0 = [min(max(x0, bounds[0][0]), bounds[0][1])]
 
         # Optimize
-        result = minimize(objective, x0, bounds=bounds, method="L-BFGS-B", **kwargs)
+        if gradient == "analytic":
+            result = minimize(
+                objective_and_gradient,
+                x0,
+                jac=True,
+                bounds=bounds,
+                method="L-BFGS-B",
+                **kwargs,
+            )
+        else:
+            result = minimize(objective, x0, bounds=bounds, method="L-BFGS-B", **kwargs)
 
         optimal_beta = result.x[0]
 
         # Calculate final metrics
-        if self.decay_function == DecayFunction.SIGMOID:
-            fij = self.fij(optimal_beta, steepness=param2)
-            tij = self.tij(optimal_beta, steepness=param2)
-        elif self.decay_function == DecayFunction.GAUSSIAN:
-            fij = self.fij(optimal_beta, d0=param2)
-            tij = self.tij(optimal_beta, d0=param2)
-        else:
-            fij = self.fij(optimal_beta)
-            tij = self.tij(optimal_beta)
-
-        final_metrics = self._calculate_metrics(
-            fij, tij, ["cross_entropy", "correlation", "rmse", "mse", "mae"]
+        final_metrics, fij, tij = self._evaluate(
+            optimal_beta, param2, ["cross_entropy", "correlation", "rmse", "mse", "mae"]
         )
 
         return {
@@ -593,13 +2774,15 @@ class R2SFCA:
         self,
         metric: str,
         param2: float,
+        gradient: str = "analytic",
+        x0: float = 1.0,
         num_epochs: int = 400,
         learning_rate: float = 0.01,
         **kwargs,
     ) -> Dict:
         """Solve for optimal beta using Adam optimizer."""
         # Initialize parameters
-        log_beta = np.log(1.0)  # Use log space for stability
+        log_beta = np.log(x0)  # Use log space for stability
 
         # Adam parameters
         m_beta = 0.0
@@ -609,7 +2792,7 @@ class R2SFCA:
         epsilon = 1e-8
 
         best_loss = float("inf")
-        best_beta = 1.0
+        best_beta = x0
         best_fij = None
         best_tij = None
 
@@ -617,27 +2800,19 @@ class R2SFCA:
             try:
                 beta = np.exp(log_beta)
 
-                # Calculate Fij and Tij
-                if self.decay_function == DecayFunction.SIGMOID:
-                    fij = self.fij(beta, steepness=param2)
-                    tij = self.tij(beta, steepness=param2)
-                elif self.decay_function == DecayFunction.GAUSSIAN:
-                    fij = self.fij(beta, d0=param2)
-                    tij = self.tij(beta, d0=param2)
+                sign = self._metric_sign(metric)
+                if gradient == "analytic":
+                    # Loss and exact d(loss)/d(beta) from one pass
+                    value, grad, fij, tij = self._evaluate_gradient(
+                        beta, param2, metric
+                    )
+                    loss = sign * value
                 else:
-                    fij = self.fij(beta)
-                    tij = self.tij(beta)
-
-                # Calculate loss
-                eval_metrics = self._calculate_metrics(fij, tij, [metric])
+                    # Calculate loss from one fused Fij/Tij pass
+                    eval_metrics, fij, tij = self._evaluate(beta, param2, [metric])
 
-                # For metrics that should be maximized, negate the value
-                if metric == "correlation" or metric.endswith("_correlation"):
-                    loss = -eval_metrics[
-                        metric
-                    ]  # Maximize correlation = minimize negative correlation
-                else:
-                    loss = eval_metrics[metric]  # Minimize error metrics
+                    # For metrics that should be maximized, negate the value
+                    loss = sign * eval_metrics[metric]
 
                 # Add regularization
                 regularization = 0.001 * (log_beta**2)
@@ -646,32 +2821,25 @@ class R2SFCA:
                 if np.isnan(total_loss):
                     continue
 
-                # Calculate gradient using finite differences
-                h = 1e-8
-                log_beta_plus = log_beta + h
-                beta_plus = np.exp(log_beta_plus)
-
-                if self.decay_function == DecayFunction.SIGMOID:
-                    fij_plus = self.fij(beta_plus, steepness=param2)
-                    tij_plus = self.tij(beta_plus, steepness=param2)
-                elif self.decay_function == DecayFunction.GAUSSIAN:
-                    fij_plus = self.fij(beta_plus, d0=param2)
-                    tij_plus = self.tij(beta_plus, d0=param2)
+                if gradient == "analytic":
+                    # Chain rule through beta = exp(log_beta)
+                    grad_log_beta = sign * grad[0] * beta + 0.002 * log_beta
                 else:
-                    fij_plus = self.fij(beta_plus)
-                    tij_plus = self.tij(beta_plus)
+                    # Calculate gradient using finite differences
+                    h = 1e-8
+                    log_beta_plus = log_beta + h
+                    beta_plus = np.exp(log_beta_plus)
 
-                eval_metrics_plus = self._calculate_metrics(
-                    fij_plus, tij_plus, [metric]
-                )
+                    eval_metrics_plus, _, _ = self._evaluate(
+                        beta_plus, param2, [metric], full_flows=False
+                    )
 
-                # Apply same logic for maximization metrics
-                if metric == "correlation" or metric.endswith("_correlation"):
-                    loss_plus = -eval_metrics_plus[metric] + 0.001 * (log_beta_plus**2)
-                else:
-                    loss_plus = eval_metrics_plus[metric] + 0.001 * (log_beta_plus**2)
+                    # Apply same logic for maximization metrics
+                    loss_plus = sign * eval_metrics_plus[metric] + 0.001 * (
+                        log_beta_plus**2
+                    )
 
-                grad_log_beta = (loss_plus - total_loss) / h
+                    grad_log_beta = (loss_plus - total_loss) / h
 
                 # Adam update
                 t = epoch + 1
@@ -686,17 +2854,24 @@ class R2SFCA:
                 if total_loss < best_loss:
                     best_loss = total_loss
                     best_beta = beta
-                    best_fij = fij.copy()
-                    best_tij = tij.copy()
+                    best_fij = fij
+                    best_tij = tij
 
             except Exception as e:
                 warnings.warn(f"Error at epoch {epoch+1}: {str(e)}")
                 continue
 
         # Calculate final metrics
-        final_metrics = self._calculate_metrics(
-            best_fij, best_tij, ["cross_entropy", "correlation", "rmse", "mse", "mae"]
-        )
+        final_metric_names = ["cross_entropy", "correlation", "rmse", "mse", "mae"]
+        if self._pairs_for(best_beta, self._param2_kwargs(param2)) is not self:
+            # Expand the retained flows of the reduced pair set
+            final_metrics, best_fij, best_tij = self._evaluate(
+                best_beta, param2, final_metric_names
+            )
+        else:
+            final_metrics = self._calculate_metrics(
+                best_fij, best_tij, final_metric_names
+            )
 
         return {
             "optimal_beta": best_beta,
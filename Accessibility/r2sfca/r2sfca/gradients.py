@@ -0,0 +1,140 @@
+"""
+Analytic derivatives for the R2SFCA package.
+
+This module contains the closed-form derivatives of the R2SFCA evaluation
+metrics with respect to the flows, used to give the optimizers an exact
+gradient instead of finite differences.
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+
+def pearson_gradient(
+    x: np.ndarray,
+    y: np.ndarray,
+    dx: np.ndarray,
+    dy: Optional[np.ndarray] = None,
+    zeros: Optional[Tuple[int, float, float]] = None,
+) -> float:
+    """
+    Directional derivative of the Pearson correlation r(x, y).
+
+    Parameters:
+    -----------
+    x, y : np.ndarray
+        Vectors being correlated
+    dx, dy : np.ndarray
+        Derivatives of ``x`` and ``y``; ``dy=None`` means ``y`` is constant
+    zeros : tuple, optional
+        (count, mean of y, sum of squared deviations of y) of further
+        elements where x is zero and neither vector changes
+
+    Returns:
+    --------
+    float
+        d r(x, y) over all elements
+    """
+    count, zero_y_mean, zero_y_m2 = zeros if zeros is not None else (0, 0.0, 0.0)
+    n = len(x) + count
+    x_mean = np.sum(x) / n
+    y_mean = (np.sum(y) + count * zero_y_mean) / n
+    xc = x - x_mean
+    yc = y - y_mean
+    sxx = np.dot(xc, xc) + count * x_mean**2
+    syy = np.dot(yc, yc) + zero_y_m2 + count * (zero_y_mean - y_mean) ** 2
+    sxy = np.dot(xc, yc) - count * x_mean * (zero_y_mean - y_mean)
+
+    # Centering can be skipped on the derivative side because xc and yc sum
+    # to zero over all elements, and dx, dy are zero on the further ones
+    dsxy = np.dot(dx, yc)
+    dsxx = 2.0 * np.dot(xc, dx)
+    dsyy = 0.0
+    if dy is not None:
+        dsxy += np.dot(xc, dy)
+        dsyy = 2.0 * np.dot(yc, dy)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        norm = np.sqrt(sxx * syy)
+        r = sxy / norm
+        return dsxy / norm - 0.5 * r * (dsxx / sxx + dsyy / syy)
+
+
+def metric_gradient(
+    metric: str,
+    fij: np.ndarray,
+    tij: np.ndarray,
+    dfij: np.ndarray,
+    dtij: np.ndarray,
+    observed_flow: Optional[np.ndarray] = None,
+    normalize: bool = True,
+    epsilon: float = 1e-15,
+    zero_flows: Optional[Tuple[int, float, float]] = None,
+) -> float:
+    """
+    Derivative of an evaluation metric given the derivatives of Fij and Tij.
+
+    Parameters:
+    -----------
+    metric : str
+        One of 'cross_entropy', 'correlation', 'rmse', 'mse', 'mae',
+        'fij_flow_correlation' or 'tij_flow_correlation'
+    fij, tij : np.ndarray
+        Flows at the current parameter point
+    dfij, dtij : np.ndarray
+        Derivatives of the flows with respect to one parameter
+    observed_flow : np.ndarray, optional
+        Observed flows, required for the flow correlations
+    normalize : bool
+        Whether Fij and Tij are normalized in the cross-entropy
+    epsilon : float
+        Epsilon used by the metric
+    zero_flows : tuple, optional
+        (count, observed mean, observed sum of squared deviations) of further
+        pairs whose Fij and Tij are zero at every parameter value
+
+    Returns:
+    --------
+    float
+        Derivative of the metric with respect to the parameter
+    """
+    n_zero = zero_flows[0] if zero_flows is not None else 0
+    n_pairs = len(fij) + n_zero
+
+    if metric == "cross_entropy":
+        # Zero flows add nothing to the cross-entropy or its derivative
+        # CE = -sum(p * log(q + eps)) with p = Fij / F, q = Tij / T
+        if normalize:
+            fij_total = np.sum(fij) + epsilon
+            tij_total = np.sum(tij) + epsilon
+            dp = (dfij - fij * (np.sum(dfij) / fij_total)) / fij_total
+            dq = (dtij - tij * (np.sum(dtij) / tij_total)) / tij_total
+        else:
+            fij_total = tij_total = 1.0
+            dp, dq = dfij, dtij
+        q = tij / tij_total + epsilon
+        return -(np.dot(dp, np.log(q)) + np.dot(fij / fij_total, dq / q))
+
+    elif metric in ("rmse", "mse"):
+        diff = fij - tij
+        mse = np.dot(diff, diff) / n_pairs
+        d_mse = 2.0 * np.dot(diff, dfij - dtij) / n_pairs
+        if metric == "mse":
+            return d_mse
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return d_mse / (2.0 * np.sqrt(mse))
+
+    elif metric == "mae":
+        return np.dot(np.sign(fij - tij), dfij - dtij) / n_pairs
+
+    elif metric == "correlation":
+        zeros = (n_zero, 0.0, 0.0)
+        return pearson_gradient(fij, tij, dfij, dtij, zeros)
+
+    elif metric == "fij_flow_correlation" and observed_flow is not None:
+        return pearson_gradient(fij, observed_flow, dfij, zeros=zero_flows)
+
+    elif metric == "tij_flow_correlation" and observed_flow is not None:
+        return pearson_gradient(tij, observed_flow, dtij, zeros=zero_flows)
+
+    raise ValueError(f"No analytic gradient for metric: {metric}")
@@ -0,0 +1,332 @@
+"""
+Group indexing for the R2SFCA package.
+
+This module factorizes demand and supply ID columns into integer codes with
+CSR-style offsets so that per-location reductions run in a single pass over
+the demand-supply pairs.
+
+Every index links two orderings of the pairs: the pair order of the model's
+arrays and the group-sorted order, through the ``order`` permutation. When
+the pairs are already sorted by the grouping ID (e.g. a table ordered by
+demand ID) the permutation is the identity, which is detected at
+construction; reductions then run as contiguous ``np.add.reduceat`` segments
+and per-group values are broadcast back with ``np.repeat``. Otherwise values
+are reduced in pair order by a scatter-add into the per-group table, which
+reads the pairs once instead of gathering them through the permutation.
+"""
+
+import numpy as np
+
+
+def _is_sorted(codes: np.ndarray) -> bool:
+    """Whether codes never decrease, i.e. the pairs are grouped contiguously."""
+    return bool(len(codes) < 2 or not np.any(codes[1:] < codes[:-1]))
+
+
+def _segment_sums(grouped: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Sums of the contiguous segments ``offsets[g]:offsets[g + 1]`` along the
+    last axis, accumulated in float64; empty segments sum to zero.
+    """
+    starts = offsets[:-1]
+    empty = starts == offsets[1:]
+    if empty.any():
+        # reduceat returns the element at the start of an empty segment
+        starts = np.minimum(starts, max(grouped.shape[-1] - 1, 0))
+    if grouped.shape[-1] == 0:
+        return np.zeros(grouped.shape[:-1] + (len(starts),))
+    sums = np.add.reduceat(grouped, starts, axis=-1, dtype=np.float64)
+    if empty.any():
+        sums[..., empty] = 0.0
+    return sums
+
+
+def _divisors(weight_sums: np.ndarray, dtype) -> np.ndarray:
+    """Weight sums as divisors; infinite where not positive so shares are zero."""
+    return np.where(weight_sums > 0, weight_sums, np.inf).astype(dtype, copy=False)
+
+
+def _scatter_sums(values: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Per-group sums along the last axis by a float64 scatter-add (bincount).
+
+    Rows (parameter points) are scatter-added one at a time: a single
+    ``np.bincount`` over row-offset bins ``r * n_groups + codes`` has to
+    materialize an index per matrix element and measured slower.
+    """
+    # bincount converts its indices to intp; convert once for all rows
+    codes = codes.astype(np.intp, copy=False)
+    rows = values.reshape(-1, values.shape[-1])
+    sums = np.empty((len(rows), n_groups))
+    for row, row_sums in zip(rows, sums):
+        row_sums[:] = np.bincount(codes, weights=row, minlength=n_groups)
+    return sums.reshape(values.shape[:-1] + (n_groups,))
+
+
+class GroupIndex:
+    """
+    Factorized ID column with CSR-style offsets.
+
+    Pairs are grouped by ID through a stable sort, so the members of group
+    ``g`` are ``order[offsets[g]:offsets[g + 1]]`` in their original order.
+    If the pairs are already sorted by ID, ``order`` is the identity and
+    ``contiguous`` is True.
+
+    Parameters:
+    -----------
+    ids : array-like
+        ID value of every demand-supply pair
+
+    Attributes:
+    -----------
+    uniques : np.ndarray
+        Sorted distinct IDs (the code -> ID lookup table)
+    codes : np.ndarray
+        Group code of every pair (int32 unless there are 2**31 or more pairs)
+    contiguous : bool
+        Whether every group occupies a contiguous run of pairs
+    """
+
+    def __init__(self, ids):
+        ids = np.asarray(ids)
+        uniques, codes = np.unique(ids, return_inverse=True)
+
+        # int32 codes and order halve the index footprint on large tables
+        index_dtype = np.int32 if len(ids) < np.iinfo(np.int32).max else np.intp
+        self.uniques = uniques
+        self.codes = codes.reshape(-1).astype(index_dtype)
+        self.contiguous = _is_sorted(self.codes)
+        if self.contiguous:
+            self.order = np.arange(len(self.codes), dtype=index_dtype)
+        else:
+            self.order = np.argsort(self.codes, kind="stable").astype(index_dtype)
+
+        counts = np.bincount(self.codes, minlength=len(uniques))
+        self.offsets = np.zeros(len(uniques) + 1, dtype=np.intp)
+        np.cumsum(counts, out=self.offsets[1:])
+
+        # Index of the first pair of every group (the stable sort keeps it first)
+        self.first = self.order[self.offsets[:-1]]
+
+    @classmethod
+    def from_arrays(
+        cls, codes, order, offsets, first, uniques=None, contiguous=None
+    ) -> "GroupIndex":
+        """
+        Rebuild an index from previously computed arrays without re-sorting.
+
+        Parameters:
+        -----------
+        codes, order, offsets, first : np.ndarray
+            Arrays of an existing index
+        uniques : np.ndarray, optional
+            ID lookup table; defaults to the group numbers
+        contiguous : bool, optional
+            Whether the codes are sorted, if known; detected otherwise
+
+        Returns:
+        --------
+        GroupIndex
+            Index sharing the given arrays
+        """
+        index = cls.__new__(cls)
+        index.codes = codes
+        index.order = order
+        index.offsets = offsets
+        index.first = first
+        index.uniques = uniques if uniques is not None else np.arange(len(offsets) - 1)
+        index.contiguous = _is_sorted(codes) if contiguous is None else contiguous
+        return index
+
+    def subset(self, indices: np.ndarray) -> "GroupIndex":
+        """
+        Index over a subset of the pairs that keeps every group.
+
+        Groups without remaining pairs are empty; their ``first`` entry is
+        only a placeholder.
+
+        Parameters:
+        -----------
+        indices : np.ndarray
+            Sorted positions of the retained pairs
+
+        Returns:
+        --------
+        GroupIndex
+            Index over the retained pairs with the same group numbering
+        """
+        codes = self.codes[indices]
+        if self.contiguous:
+            # A subset of sorted pairs stays sorted
+            order = np.arange(len(codes), dtype=codes.dtype)
+        else:
+            order = np.argsort(codes, kind="stable").astype(codes.dtype)
+        counts = np.bincount(codes, minlength=self.n_groups)
+        offsets = np.zeros(self.n_groups + 1, dtype=np.intp)
+        np.cumsum(counts, out=offsets[1:])
+        first = order[np.minimum(offsets[:-1], max(len(order) - 1, 0))]
+        return GroupIndex.from_arrays(codes, order, offsets, first, self.uniques)
+
+    def arrays(self) -> dict:
+        """Numeric arrays that fully describe the index (see ``from_arrays``)."""
+        return {
+            "codes": self.codes,
+            "order": self.order,
+            "offsets": self.offsets,
+            "first": self.first,
+        }
+
+    @property
+    def n_groups(self) -> int:
+        """Number of distinct IDs."""
+        return len(self.offsets) - 1
+
+    def sum(self, values: np.ndarray) -> np.ndarray:
+        """
+        Sum pair values within each group.
+
+        A contiguous index reduces every group as one segment with a single
+        ``np.add.reduceat`` call; otherwise the values are scatter-added in
+        pair order. Sums are accumulated in float64 and rounded once per
+        group to the values' dtype.
+
+        Parameters:
+        -----------
+        values : np.ndarray
+            Values aligned with the pairs
+
+        Returns:
+        --------
+        np.ndarray
+            Per-group sums ordered like ``uniques``
+        """
+        return self.sum_rows(values)
+
+    def expand(self, group_values: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Broadcast per-group values to the pairs (``group_values[..., codes]``).
+
+        Parameters:
+        -----------
+        group_values : np.ndarray
+            Values ordered like ``uniques`` along the last axis
+        out : np.ndarray, optional
+            Output buffer of the result's shape and dtype; not used by a
+            contiguous index
+
+        Returns:
+        --------
+        np.ndarray
+            Values aligned with the pairs
+        """
+        if self.contiguous:
+            # Sequential writes instead of a gather through the codes
+            return np.repeat(group_values, np.diff(self.offsets), axis=-1)
+        if out is not None and out.dtype != group_values.dtype:
+            out = None
+        return np.take(group_values, self.codes, axis=-1, out=out)
+
+    def distribute(
+        self,
+        totals: np.ndarray,
+        weights: np.ndarray,
+        out: np.ndarray = None,
+        scratch: np.ndarray = None,
+        weight_sums: np.ndarray = None,
+    ) -> np.ndarray:
+        """
+        Split each group's total across its pairs in proportion to weights.
+
+        Computes ``totals[g] * weights / sum(weights in g)`` for every pair;
+        pairs in groups whose weight sum is not positive get zero.
+
+        Parameters:
+        -----------
+        totals : np.ndarray
+            Per-group totals ordered like ``uniques``
+        weights : np.ndarray
+            Non-negative weights aligned with the pairs
+        out : np.ndarray, optional
+            Pair-length output buffer; may be ``weights`` itself
+        scratch : np.ndarray, optional
+            Pair-length work buffer of the output dtype, distinct from ``out``
+        weight_sums : np.ndarray, optional
+            Precomputed ``sum(weights)``
+
+        Returns:
+        --------
+        np.ndarray
+            Distributed values aligned with the pairs
+        """
+        dtype = np.result_type(totals, weights)
+        if out is None:
+            out = np.empty(len(self.codes), dtype=dtype)
+        if weight_sums is None:
+            weight_sums = self.sum(weights)
+
+        totals = totals.astype(dtype, copy=False)
+        divisors = _divisors(weight_sums, dtype)
+        np.multiply(weights, self.expand(totals, out=scratch), out=out)
+        return np.divide(out, self.expand(divisors, out=scratch), out=out)
+
+    def sum_rows(self, values: np.ndarray) -> np.ndarray:
+        """
+        Sum pair values within each group along the last axis.
+
+        A contiguous index reduces a whole block of parameter points with one
+        ``np.add.reduceat`` call along the pair axis; otherwise each row is
+        scatter-added in pair order with its own ``np.bincount`` call. Sums
+        are accumulated in float64.
+
+        Parameters:
+        -----------
+        values : np.ndarray
+            Vector of length n_pairs or matrix of shape (n_rows, n_pairs)
+
+        Returns:
+        --------
+        np.ndarray
+            Per-group sums of shape (n_groups,) or (n_rows, n_groups)
+        """
+        if self.contiguous:
+            sums = _segment_sums(values, self.offsets)
+        else:
+            sums = _scatter_sums(values, self.codes, self.n_groups)
+        return sums.astype(values.dtype, copy=False)
+
+    def distribute_rows(
+        self,
+        totals: np.ndarray,
+        weights: np.ndarray,
+        scratch: np.ndarray = None,
+    ) -> np.ndarray:
+        """
+        Row-wise ``distribute`` that overwrites a weight matrix in place.
+
+        The totals are broadcast to the pairs once and shared by all rows;
+        the per-row divisors are broadcast as one matrix.
+
+        Parameters:
+        -----------
+        totals : np.ndarray
+            Per-group totals ordered like ``uniques``, shared by all rows
+        weights : np.ndarray
+            Float matrix of shape (n_rows, n_pairs); overwritten with the result
+        scratch : np.ndarray, optional
+            Matrix of the same shape and dtype as ``weights``
+
+        Returns:
+        --------
+        np.ndarray
+            ``weights``, holding the distributed values
+        """
+        divisors = _divisors(self.sum_rows(weights), weights.dtype)
+        totals = totals.astype(weights.dtype, copy=False)
+        weights *= self.expand(totals)
+        if self.contiguous:
+            # Row by row, so the repeated divisors stay one pair-length vector
+            for row, row_divisors in zip(weights, divisors):
+                row /= self.expand(row_divisors)
+        else:
+            weights /= self.expand(divisors, out=scratch)
+        return weights
@@ -0,0 +1,148 @@
+"""
+Incremental evaluation for the R2SFCA package.
+
+This module keeps the flows, denominators and score numerators of one
+parameter point so that changing the demand or supply of a few locations only
+recomputes the pairs reachable from them instead of the whole table.
+"""
+
+from typing import Dict, Hashable, Tuple
+
+import numpy as np
+
+from .grouping import GroupIndex
+
+_OTHER = {"demand": "supply", "supply": "demand"}
+
+
+def group_pairs(groups: GroupIndex, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pair positions of the given groups, gathered group by group.
+
+    Parameters:
+    -----------
+    groups : GroupIndex
+        Index of one side
+    codes : np.ndarray
+        Distinct group codes
+
+    Returns:
+    --------
+    tuple
+        (pair positions, start of every group within them)
+    """
+    starts = groups.offsets[codes]
+    lengths = groups.offsets[codes + 1] - starts
+    segment_starts = np.zeros(len(codes), dtype=np.intp)
+    np.cumsum(lengths[:-1], out=segment_starts[1:])
+    positions = np.arange(int(lengths.sum()), dtype=np.intp)
+    positions += np.repeat(starts - segment_starts, lengths)
+    return groups.order[positions], segment_starts
+
+
+class IncrementalState:
+    """
+    Flows of an R2SFCA model at one parameter point, updated in place.
+
+    For each side (``'demand'`` and ``'supply'``) the state holds the flow
+    distributed within that side's locations (Fij for demand, Tij for
+    supply), its denominator per location (sum of the other side's value
+    times decay) and the per-location sum of the other side's flow, which is
+    the numerator of the accessibility (crowdedness) score.
+
+    After the model changed the values of some locations on one side,
+    ``update`` recomputes the flows of their pairs and of every pair of the
+    locations they reach on the other side; all other pairs keep their flows.
+
+    Parameters:
+    -----------
+    key : hashable
+        Identifier of the parameter point
+    model : R2SFCA
+        Pair-form model whose ``demand``/``supply`` arrays are read live
+    decay : np.ndarray
+        Decay of every pair at the parameter point
+    """
+
+    def __init__(self, key: Hashable, model, decay: np.ndarray):
+        self.key = key
+        self.model = model
+        self.decay = decay
+        self.groups = {
+            "demand": model._demand_groups,
+            "supply": model._supply_groups,
+        }
+        self.denominators: Dict[str, np.ndarray] = {}
+        self.flows: Dict[str, np.ndarray] = {}
+        for side, other in _OTHER.items():
+            groups = self.groups[side]
+            weights = getattr(model, other) * decay
+            self.denominators[side] = groups.sum(weights)
+            totals = getattr(model, side)[groups.first]
+            self.flows[side] = groups.distribute(
+                totals, weights, out=weights, weight_sums=self.denominators[side]
+            )
+        self.flow_sums = {
+            side: self.groups[side].sum(self.flows[other])
+            for side, other in _OTHER.items()
+        }
+
+    def update(self, side: str, codes: np.ndarray):
+        """
+        Propagate new values of the ``side`` locations ``codes``.
+
+        Parameters:
+        -----------
+        side : str
+            'demand' or 'supply'
+        codes : np.ndarray
+            Distinct codes of the changed locations
+        """
+        other = _OTHER[side]
+        values, other_values = getattr(self.model, side), getattr(self.model, other)
+        codes_of = {name: groups.codes for name, groups in self.groups.items()}
+
+        # Flows distributed within the changed locations: denominators unchanged
+        pairs, _ = group_pairs(self.groups[side], codes)
+        if not len(pairs):
+            return
+        self._set_flows(
+            side,
+            pairs,
+            values[pairs] * other_values[pairs] * self.decay[pairs],
+            self.denominators[side][codes_of[side][pairs]],
+        )
+
+        # Flows of every pair of the reached locations: new denominators
+        reached = np.unique(codes_of[other][pairs])
+        pairs, segment_starts = group_pairs(self.groups[other], reached)
+        weights = values[pairs] * self.decay[pairs]
+        denominators = np.add.reduceat(weights, segment_starts, dtype=np.float64)
+        self.denominators[other][reached] = denominators
+        self._set_flows(
+            other,
+            pairs,
+            weights * other_values[pairs],
+            self.denominators[other][codes_of[other][pairs]],
+        )
+
+    def _set_flows(
+        self, side: str, pairs: np.ndarray, numerators: np.ndarray, denominators
+    ):
+        """Replace the ``side`` flows of ``pairs`` and adjust the score sums."""
+        flows = np.zeros(len(pairs), dtype=self.flows[side].dtype)
+        np.divide(numerators, denominators, out=flows, where=denominators > 0)
+        change = flows - self.flows[side][pairs]
+        self.flows[side][pairs] = flows
+        other = _OTHER[side]
+        np.add.at(self.flow_sums[other], self.groups[other].codes[pairs], change)
+
+    def score(self, side: str) -> np.ndarray:
+        """Accessibility (``'demand'``) or crowdedness (``'supply'``) per location."""
+        groups = self.groups[side]
+        location_values = getattr(self.model, side)[groups.first]
+        scores = np.zeros(groups.n_groups)
+        np.divide(
+            self.flow_sums[side], location_values, out=scores, where=location_values > 0
+        )
+        return scores
@@ -0,0 +1,323 @@
+"""
+Single-pass evaluation metrics for the R2SFCA package.
+
+This module accumulates the cross-entropy, the Pearson correlations and the
+error metrics between Fij, Tij and observed flows in one pass over the pairs.
+The pairs may arrive in chunks (e.g. from a streamed table); within a chunk
+they are processed in cache-sized blocks. Correlations merge per-block
+co-moments with the pairwise update of Chan et al., the parallel form of
+Welford's algorithm, so no centered or normalized copy of a whole vector is
+made.
+
+Pairs dropped by a catchment cutoff have zero Fij and Tij. They are added as
+a ``zero_flows`` summary ``(count, observed mean, observed sum of squared
+deviations)`` instead of being materialized, so metrics cover every pair at
+the cost of the retained ones.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Pairs processed per block (three float64 blocks stay in L2 cache)
+_BLOCK_SIZE = 1 << 15
+
+METRICS = (
+    "cross_entropy",
+    "correlation",
+    "rmse",
+    "mse",
+    "mae",
+    "fij_flow_correlation",
+    "tij_flow_correlation",
+)
+
+# Series whose co-moments each correlation needs
+_CORRELATION_SERIES = {
+    "correlation": ("fij", "tij"),
+    "fij_flow_correlation": ("fij", "observed"),
+    "tij_flow_correlation": ("tij", "observed"),
+}
+
+
+class _Comoments:
+    """Running means and co-moment matrix of a few series (Chan et al.)."""
+
+    def __init__(self, n_series: int):
+        self.n = 0
+        self.mean = np.zeros(n_series)
+        self.comoments = np.zeros((n_series, n_series))
+
+    def update(self, block: np.ndarray):
+        """Merge a (n_series x m) float64 block."""
+        m = block.shape[1]
+        mean = block.mean(axis=1)
+        centered = block - mean[:, None]
+        self._merge(m, mean, centered @ centered.T)
+
+    def merge(self, other: "_Comoments"):
+        """Merge the moments of another accumulator over the same series."""
+        self._merge(other.n, other.mean, other.comoments)
+
+    def _merge(self, m: int, mean: np.ndarray, comoments: np.ndarray):
+        if m == 0:
+            return
+        n = self.n + m
+        delta = mean - self.mean
+        self.comoments += comoments + np.outer(delta, delta) * (self.n * m / n)
+        self.mean += delta * (m / n)
+        self.n = n
+
+    def correlation(self, i: int, j: int) -> float:
+        """Pearson correlation of series ``i`` and ``j``."""
+        c = self.comoments
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = c[i, j] / np.sqrt(c[i, i] * c[j, j])
+        return float(np.clip(r, -1.0, 1.0))
+
+
+class MetricAccumulator:
+    """
+    Accumulates evaluation metrics between Fij and Tij over chunks of pairs.
+
+    Call ``update`` once per chunk (in any chunking) and ``result`` at the
+    end. Every chunk is read once: the cross-entropy, error sums and
+    co-moments are all taken from the same cache-sized block, accumulated in
+    float64 whatever the input dtype. Flow correlations are only reported if
+    observed flows were passed to ``update``, which must then be done for
+    every chunk.
+
+    Parameters:
+    -----------
+    metrics : list
+        Metrics to calculate (see ``METRICS``)
+    normalize : bool
+        Whether Fij and Tij are normalized in the cross-entropy
+    fij_total, tij_total : float, optional
+        Sums of Fij and Tij over all pairs; required for the normalized
+        cross-entropy, which needs them before the first chunk
+    epsilon : float
+        Added to the totals
+    log_epsilon : float, optional
+        Added inside the logarithm of the cross-entropy (default: epsilon)
+    """
+
+    def __init__(
+        self,
+        metrics: List[str],
+        normalize: bool = True,
+        fij_total: Optional[float] = None,
+        tij_total: Optional[float] = None,
+        epsilon: float = 1e-15,
+        log_epsilon: Optional[float] = None,
+    ):
+        self.metrics = list(metrics)
+        self.normalize = normalize
+        self.epsilon = epsilon
+        self.log_epsilon = epsilon if log_epsilon is None else log_epsilon
+
+        self._want_cross_entropy = "cross_entropy" in self.metrics
+        if self._want_cross_entropy and normalize:
+            if fij_total is None or tij_total is None:
+                raise ValueError(
+                    "The normalized cross-entropy needs fij_total and tij_total"
+                )
+            self.fij_total = float(fij_total) + epsilon
+            self.tij_total = float(tij_total) + epsilon
+        else:
+            self.fij_total = self.tij_total = 1.0
+        self._want_errors = any(m in ("rmse", "mse", "mae") for m in self.metrics)
+
+        series = []
+        for metric in self.metrics:
+            for name in _CORRELATION_SERIES.get(metric, ()):
+                if name not in series:
+                    series.append(name)
+        self._series = series
+        self._moments = _Comoments(len(series))
+        self._wants_observed = "observed" in series
+
+        self.n = 0
+        self.cross_entropy = 0.0
+        self.squared_error = 0.0
+        self.absolute_error = 0.0
+        self._observed_seen = False
+
+    def update(
+        self,
+        fij: np.ndarray,
+        tij: np.ndarray,
+        observed: Optional[np.ndarray] = None,
+    ):
+        """
+        Add a chunk of pairs.
+
+        Parameters:
+        -----------
+        fij, tij : np.ndarray
+            Flows of the chunk's pairs
+        observed : np.ndarray, optional
+            Observed flows of the same pairs; if flow correlations are
+            requested, give them for every chunk or for none
+
+        Raises:
+        -------
+        ValueError
+            If observed flows are given for some chunks but not for others
+        """
+        if self._wants_observed:
+            if observed is None and self._observed_seen:
+                raise ValueError(
+                    "Observed flows were given for earlier chunks but not for this one"
+                )
+            if observed is not None and "observed" not in self._series:
+                raise ValueError("Observed flows were not given for earlier chunks")
+            if observed is None and "observed" in self._series:
+                # Flow correlations are skipped without observed flows; keep
+                # the moments of the other series
+                keep = [i for i, name in enumerate(self._series) if name != "observed"]
+                self._series = [self._series[i] for i in keep]
+                self._moments.mean = self._moments.mean[keep]
+                self._moments.comoments = self._moments.comoments[np.ix_(keep, keep)]
+        self._observed_seen |= observed is not None
+
+        for start in range(0, len(fij), _BLOCK_SIZE):
+            stop = start + _BLOCK_SIZE
+            f = np.asarray(fij[start:stop], dtype=np.float64)
+            t = np.asarray(tij[start:stop], dtype=np.float64)
+
+            if self._want_cross_entropy:
+                q = t / self.tij_total
+                q += self.log_epsilon
+                self.cross_entropy += np.dot(f, np.log(q, out=q))
+
+            if self._want_errors:
+                diff = f - t
+                self.squared_error += np.dot(diff, diff)
+                self.absolute_error += np.sum(np.abs(diff, out=diff))
+
+            if self._series:
+                columns = {"fij": f, "tij": t}
+                if observed is not None:
+                    columns["observed"] = np.asarray(
+                        observed[start:stop], dtype=np.float64
+                    )
+                self._moments.update(np.stack([columns[s] for s in self._series]))
+
+            self.n += len(f)
+
+    def add_zero_flows(self, zero_flows: Tuple[int, float, float]):
+        """
+        Add pairs whose Fij and Tij are zero from a summary of them.
+
+        Zero flows add nothing to the cross-entropy and error sums; they
+        count towards the number of pairs and the correlation moments.
+
+        Parameters:
+        -----------
+        zero_flows : tuple
+            (count, mean of their observed flows, sum of squared deviations
+            of their observed flows); the observed terms are ignored when no
+            flow correlation is accumulated
+        """
+        count, observed_mean, observed_m2 = zero_flows
+        mean = np.zeros(len(self._series))
+        comoments = np.zeros((len(self._series),) * 2)
+        if "observed" in self._series:
+            i = self._series.index("observed")
+            mean[i] = observed_mean
+            comoments[i, i] = observed_m2
+        self._moments._merge(count, mean, comoments)
+        self.n += count
+
+    def merge(self, other: "MetricAccumulator"):
+        """Merge an accumulator over other pairs with the same settings."""
+        if other._series != self._series:
+            raise ValueError(
+                "Cannot merge accumulators with and without observed flows"
+            )
+        self.n += other.n
+        self.cross_entropy += other.cross_entropy
+        self.squared_error += other.squared_error
+        self.absolute_error += other.absolute_error
+        self._observed_seen |= other._observed_seen
+        self._moments.merge(other._moments)
+
+    def result(self) -> Dict:
+        """
+        Metric values of all pairs added so far.
+
+        Returns:
+        --------
+        dict
+            Metric name -> value, in the order of ``metrics``
+        """
+        n = max(self.n, 1)
+        results = {}
+        for metric in self.metrics:
+            if metric == "cross_entropy":
+                results[metric] = -self.cross_entropy / self.fij_total
+            elif metric == "rmse":
+                results[metric] = np.sqrt(self.squared_error / n)
+            elif metric == "mse":
+                results[metric] = self.squared_error / n
+            elif metric == "mae":
+                results[metric] = self.absolute_error / n
+            elif metric in _CORRELATION_SERIES:
+                x, y = _CORRELATION_SERIES[metric]
+                if y == "observed" and not self._observed_seen:
+                    continue
+                results[metric] = self._moments.correlation(
+                    self._series.index(x), self._series.index(y)
+                )
+        return results
+
+
+def compute_metrics(
+    fij: np.ndarray,
+    tij: np.ndarray,
+    metrics: List[str],
+    observed: Optional[np.ndarray] = None,
+    normalize: bool = True,
+    epsilon: float = 1e-15,
+    log_epsilon: Optional[float] = None,
+    zero_flows: Optional[Tuple[int, float, float]] = None,
+) -> Dict:
+    """
+    Evaluation metrics of in-memory Fij and Tij vectors.
+
+    The totals for the normalized cross-entropy are summed first; all metrics
+    then come from one ``MetricAccumulator`` pass.
+
+    Parameters:
+    -----------
+    fij, tij : np.ndarray
+        Calculated Fij and Tij values
+    metrics : list
+        Metrics to calculate
+    observed : np.ndarray, optional
+        Observed flows, required for the flow correlations
+    normalize : bool
+        Whether Fij and Tij are normalized in the cross-entropy
+    epsilon, log_epsilon : float
+        See ``MetricAccumulator``
+    zero_flows : tuple, optional
+        Summary of further pairs with zero Fij and Tij (see
+        ``MetricAccumulator.add_zero_flows``)
+
+    Returns:
+    --------
+    dict
+        Metric name -> value
+    """
+    fij_total = tij_total = None
+    if normalize and "cross_entropy" in metrics:
+        fij_total = np.sum(fij, dtype=np.float64)
+        tij_total = np.sum(tij, dtype=np.float64)
+    accumulator = MetricAccumulator(
+        metrics, normalize, fij_total, tij_total, epsilon, log_epsilon
+    )
+    accumulator.update(fij, tij, observed)
+    if zero_flows is not None:
+        accumulator.add_zero_flows(zero_flows)
+    return accumulator.result()
@@ -0,0 +1,177 @@
+"""
+Process-pool helpers for the R2SFCA package.
+
+This module publishes the pair arrays of an R2SFCA model once through shared
+memory so that worker processes can rebuild a lightweight model from them
+without pickling the input dataframe.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+# Per-process state set up by the pool initializer
+_worker_model = None
+_worker_blocks = []
+
+
+def resolve_n_jobs(n_jobs: Optional[int]) -> int:
+    """
+    Translate an ``n_jobs`` argument into a number of worker processes.
+
+    ``None`` and ``1`` mean serial execution, ``-1`` uses every CPU and other
+    negative values leave ``|n_jobs| - 1`` CPUs idle, as in scikit-learn.
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs == 0:
+        raise ValueError("n_jobs must be a non-zero integer")
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return int(n_jobs)
+
+
+def split_evenly(items: Sequence, n_chunks: int) -> List[Sequence]:
+    """Split a sequence into at most ``n_chunks`` contiguous, ordered chunks."""
+    n_chunks = max(1, min(n_chunks, len(items)))
+    bounds = np.linspace(0, len(items), n_chunks + 1).astype(int)
+    return [items[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+class SharedArrays:
+    """
+    Numeric arrays copied once into named shared-memory blocks.
+
+    Only the lightweight ``spec`` (block names, shapes and dtypes) is sent to
+    worker processes, which map the blocks read-only with ``attach``. Use as a
+    context manager so the blocks are released when the pool is done.
+
+    Parameters:
+    -----------
+    arrays : dict
+        Name -> numeric numpy array
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._blocks = []
+        self.spec = {}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                if array.dtype.hasobject:
+                    raise TypeError(f"Array '{name}' has object dtype")
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(array.nbytes, 1)
+                )
+                self._blocks.append(block)
+                view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+                view[...] = array
+                self.spec[name] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Release and unlink all shared-memory blocks."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def attach(spec: Dict) -> Dict[str, np.ndarray]:
+        """
+        Map the blocks described by ``spec`` into read-only arrays.
+
+        The block handles are kept alive for the lifetime of the process.
+        """
+        arrays = {}
+        for name, (block_name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            _worker_blocks.append(block)
+            view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+            view.flags.writeable = False
+            arrays[name] = view
+        return arrays
+
+
+def _init_worker(spec: Dict, config: Dict):
+    """Pool initializer: rebuild the model from shared arrays once per worker."""
+    global _worker_model
+    from .core import R2SFCA
+
+    _worker_model = R2SFCA._from_shared_state(SharedArrays.attach(spec), config)
+
+
+def _call_worker_model(task):
+    """Run ``func(model, *args)`` against this worker's model."""
+    func, args = task
+    return func(_worker_model, *args)
+
+
+def imap_with_model(
+    model,
+    func: Callable,
+    arg_list: Sequence[tuple],
+    n_jobs: int,
+) -> Iterator:
+    """
+    Lazy ``map_with_model``: yield each result as soon as it and all earlier
+    tasks are done.
+
+    The shared-memory blocks and the pool live until the iterator is
+    exhausted or closed.
+    """
+    arrays, config = model._shared_state()
+    with SharedArrays(arrays) as shared:
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(n_jobs, len(arg_list))),
+            initializer=_init_worker,
+            initargs=(shared.spec, config),
+        ) as executor:
+            yield from executor.map(
+                _call_worker_model, [(func, args) for args in arg_list]
+            )
+
+
+def map_with_model(
+    model,
+    func: Callable,
+    arg_list: Sequence[tuple],
+    n_jobs: int,
+) -> List:
+    """
+    Evaluate ``func(model, *args)`` for every entry of ``arg_list`` in a pool.
+
+    The model's pair arrays are published once through shared memory and every
+    worker rebuilds the model from them in its initializer. Results come back
+    in the order of ``arg_list``. ``func`` must be a picklable module-level
+    function.
+
+    Parameters:
+    -----------
+    model : R2SFCA
+        Model whose arrays are shared with the workers
+    func : callable
+        Function called as ``func(worker_model, *args)``
+    arg_list : sequence of tuple
+        Argument tuples, one per task
+    n_jobs : int
+        Number of worker processes
+
+    Returns:
+    --------
+    list
+        Results in task order
+    """
+    return list(imap_with_model(model, func, arg_list, n_jobs))
@@ -0,0 +1,222 @@
+"""
+Opt-in profiling for the R2SFCA package.
+
+This module records, per computation stage, the number of calls, the
+cumulative wall time (inclusive and exclusive of nested stages) and
+optionally the bytes allocated, together with the number of objective
+evaluations. Models are instrumented by wrapping their methods on the
+instance, so a model that never enables profiling runs the original methods
+unchanged.
+"""
+
+import functools
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+# Per-stage counters, in report order
+_FIELDS = ("calls", "total_s", "self_s", "bytes", "peak_bytes")
+
+
+class ProfileReport(dict):
+    """
+    Profiling report: a plain dict with table and JSON helpers.
+
+    Keys are 'stages' (stage name -> 'calls', 'total_s', 'self_s', 'bytes',
+    'peak_bytes'), 'objective_evaluations', 'wall_s' and 'track_memory'.
+    Byte counts are None unless memory tracking was enabled.
+    """
+
+    def to_frame(self) -> pd.DataFrame:
+        """Stages as a DataFrame, slowest (exclusive time) first."""
+        frame = pd.DataFrame.from_dict(self["stages"], orient="index", columns=_FIELDS)
+        frame.index.name = "stage"
+        return frame.sort_values("self_s", ascending=False)
+
+    def to_json(self, path: Optional[str] = None, **kwargs) -> str:
+        """Serialize the report; also write it to ``path`` if given."""
+        text = json.dumps(self, indent=2, **kwargs)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(text)
+        return text
+
+
+class Profiler:
+    """
+    Accumulates call counts, times and allocations of nested stages.
+
+    With ``track_memory=True`` allocations are traced with ``tracemalloc``
+    (numpy reports its buffers to it), which slows the traced code down; a
+    stage's bytes are the peak traced memory above its starting level.
+
+    Parameters:
+    -----------
+    track_memory : bool
+        Whether to record bytes allocated per stage
+    """
+
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self._started_tracing = False
+        self.reset()
+
+    def reset(self):
+        """Drop all recorded counters."""
+        self._totals = _Collector()
+        self._collectors = [self._totals]
+        self._stack = []
+
+    def start(self):
+        """Start memory tracing if requested and not already running."""
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Stop memory tracing if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def wrap(
+        self,
+        name: str,
+        func: Callable,
+        evaluations: Optional[Callable] = None,
+        attach: bool = False,
+    ) -> Callable:
+        """
+        Wrap ``func`` so every call is recorded under stage ``name``.
+
+        Parameters:
+        -----------
+        name : str
+            Stage name
+        func : callable
+            Function or bound method to wrap
+        evaluations : callable, optional
+            ``evaluations(*args, **kwargs)`` gives the number of objective
+            evaluations a call performs; not counted inside another stage
+            that counts evaluations
+        attach : bool
+            Attach the report of the call to its result: as the 'profile' key
+            of a dict or in ``attrs['profile']`` of a DataFrame
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if attach:
+                collector = _Collector(depth=len(self._stack))
+                self._collectors.append(collector)
+            self._enter(name, evaluations is not None)
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                self._exit(name)
+                if attach:
+                    self._collectors.remove(collector)
+            if evaluations is not None and not any(frame[5] for frame in self._stack):
+                count = evaluations(*args, **kwargs)
+                for active in self._collectors + ([collector] if attach else []):
+                    active.evaluations += count
+            if attach:
+                report = self._report(collector)
+                if isinstance(result, dict):
+                    result["profile"] = report
+                elif isinstance(result, pd.DataFrame):
+                    result.attrs["profile"] = report
+            return result
+
+        return wrapper
+
+    def _enter(self, name: str, counting: bool = False):
+        """
+        Open a stage frame: [name, start, child time, start bytes, peak,
+        counts evaluations].
+        """
+        start_bytes = peak = None
+        if self.track_memory and tracemalloc.is_tracing():
+            current, outer_peak = tracemalloc.get_traced_memory()
+            if self._stack and self._stack[-1][3] is not None:
+                # Keep the enclosing stage's peak before resetting it
+                parent = self._stack[-1]
+                parent[4] = max(parent[4], outer_peak)
+            tracemalloc.reset_peak()
+            start_bytes = peak = current
+        self._stack.append(
+            [name, time.perf_counter(), 0.0, start_bytes, peak, counting]
+        )
+
+    def _exit(self, name: str):
+        """Close the innermost stage frame and accumulate its counters."""
+        _, start, child_s, start_bytes, peak, _ = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        allocated = None
+        if start_bytes is not None and tracemalloc.is_tracing():
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            allocated = peak - start_bytes
+            if self._stack and self._stack[-1][3] is not None:
+                parent = self._stack[-1]
+                parent[4] = max(parent[4], peak)
+
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        for collector in self._collectors:
+            collector.add(name, elapsed, elapsed - child_s, allocated, len(self._stack))
+
+    def report(self) -> "ProfileReport":
+        """
+        Structured report of everything recorded since the last ``reset``.
+
+        Returns:
+        --------
+        ProfileReport
+            Dict with 'stages', 'objective_evaluations', 'wall_s' and
+            'track_memory'
+        """
+        return self._report(self._totals)
+
+    def _report(self, collector: "_Collector") -> "ProfileReport":
+        """Report of one collector."""
+        return ProfileReport(
+            stages={
+                name: dict(zip(_FIELDS, values))
+                for name, values in collector.stages.items()
+            },
+            objective_evaluations=collector.evaluations,
+            wall_s=collector.wall_s,
+            track_memory=self.track_memory,
+        )
+
+
+class _Collector:
+    """Counters of one profiling scope (all calls, or one attached call)."""
+
+    def __init__(self, depth: int = 0):
+        self.stages: Dict[str, list] = {}
+        self.evaluations = 0
+        self.wall_s = 0.0
+        self.depth = depth
+
+    def add(
+        self,
+        name: str,
+        elapsed: float,
+        self_elapsed: float,
+        allocated: Optional[int],
+        depth: int,
+    ):
+        """Accumulate one finished stage call (``depth``: enclosing stages)."""
+        stage = self.stages.setdefault(name, [0, 0.0, 0.0, None, None])
+        stage[0] += 1
+        stage[1] += elapsed
+        stage[2] += self_elapsed
+        if allocated is not None:
+            stage[3] = (stage[3] or 0) + allocated
+            stage[4] = max(stage[4] or 0, allocated)
+        if depth == self.depth:
+            self.wall_s += elapsed
@@ -0,0 +1,193 @@
+"""
+Matrix-form evaluation for the R2SFCA package.
+
+This module stores the demand-supply pairs as a scipy.sparse CSR matrix
+(demand x supply) with one demand and one supply value per location, so that
+the per-location sums behind Fij, Tij, accessibility and crowdedness become
+sparse matrix-vector products. scipy.sparse is imported when the first
+backend is built.
+"""
+
+from typing import TYPE_CHECKING, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+
+class SparseBackend:
+    """
+    Demand x supply CSR operators over the pairs of an R2SFCA model.
+
+    The sparsity pattern is built once; every evaluation only overwrites the
+    matrix values (one preallocated buffer) with the decay of the pairs, so a
+    returned operator is only valid until the next evaluation. With W the decay matrix, D the
+    demand vector and S the supply vector:
+
+    - Fij = D_i * W_ij * S_j / (W S)_i
+    - Tij = S_j * W_ij * D_i / (W^T D)_j
+    - Ai = (W (S / W^T D))_i and Cj = (W^T (D / W S))_j
+
+    Parameters:
+    -----------
+    demand_codes, supply_codes : np.ndarray
+        Location codes of every pair (0 .. n_locations - 1)
+    demand, supply : np.ndarray
+        Demand and supply value of every pair
+
+    Raises:
+    -------
+    ValueError
+        If a location has more than one demand (supply) value or a
+        demand-supply pair appears more than once
+    """
+
+    def __init__(
+        self,
+        demand_codes: np.ndarray,
+        supply_codes: np.ndarray,
+        demand: np.ndarray,
+        supply: np.ndarray,
+    ):
+        n_demand = int(demand_codes.max()) + 1 if len(demand_codes) else 0
+        n_supply = int(supply_codes.max()) + 1 if len(supply_codes) else 0
+
+        self.demand = self._location_values(demand_codes, demand, n_demand, "demand")
+        self.supply = self._location_values(supply_codes, supply, n_supply, "supply")
+
+        # CSR order: by demand location, then by supply location
+        self.order = np.lexsort((supply_codes, demand_codes))
+        rows = demand_codes[self.order]
+        columns = supply_codes[self.order]
+        duplicated = (rows[1:] == rows[:-1]) & (columns[1:] == columns[:-1])
+        if duplicated.any():
+            raise ValueError(
+                f"{int(duplicated.sum())} demand-supply pairs appear more than once"
+            )
+
+        from scipy import sparse
+
+        indptr = np.zeros(n_demand + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_demand), out=indptr[1:])
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(rows)), columns, indptr), shape=(n_demand, n_supply)
+        )
+        self._rows = rows
+
+    @staticmethod
+    def _location_values(
+        codes: np.ndarray, values: np.ndarray, n_locations: int, name: str
+    ) -> np.ndarray:
+        """One value per location; all pairs of a location must agree."""
+        location_values = np.zeros(
+            n_locations, dtype=np.result_type(values, np.float32)
+        )
+        location_values[codes] = values
+        if not np.array_equal(location_values[codes], values):
+            raise ValueError(
+                f"{name.capitalize()} values are not constant per location"
+            )
+        return location_values
+
+    def _decay_matrix(self, decay: np.ndarray) -> "sparse.csr_matrix":
+        """The cached CSR pattern, its values set to ``decay`` (pair order)."""
+        matrix = self.matrix
+        dtype = np.result_type(decay, self.demand)
+        if matrix.data.dtype != dtype:
+            matrix.data = np.empty(len(self.order), dtype=dtype)
+        if decay.dtype == dtype:
+            np.take(decay, self.order, out=matrix.data)
+        else:
+            matrix.data[:] = decay[self.order]
+        return matrix
+
+    @staticmethod
+    def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        """numerator / denominator, zero where the denominator is not positive."""
+        ratio = np.zeros(denominator.shape, dtype=denominator.dtype)
+        np.divide(numerator, denominator, out=ratio, where=denominator > 0)
+        return ratio
+
+    def _demand_factor(self, matrix: "sparse.csr_matrix") -> np.ndarray:
+        """D / (W S) per demand location, in float64."""
+        # A float32 ratio overflows where the decay sum is tiny
+        supply = self.supply.astype(np.float64, copy=False)
+        return self._safe_ratio(self.demand, matrix @ supply)
+
+    def _supply_factor(self, matrix: "sparse.csr_matrix") -> np.ndarray:
+        """S / (W^T D) per supply location, in float64."""
+        demand = self.demand.astype(np.float64, copy=False)
+        return self._safe_ratio(self.supply, matrix.T @ demand)
+
+    def _to_pairs(self, values: np.ndarray) -> np.ndarray:
+        """Reorder CSR-ordered values to pair order."""
+        out = np.empty_like(values)
+        out[self.order] = values
+        return out
+
+    def fij(self, decay: np.ndarray) -> np.ndarray:
+        """Fij in pair order from the decay of every pair."""
+        matrix = self._decay_matrix(decay)
+        values = matrix.data * self.supply[matrix.indices]
+        values *= self._demand_factor(matrix)[self._rows]
+        return self._to_pairs(values)
+
+    def tij(self, decay: np.ndarray) -> np.ndarray:
+        """Tij in pair order from the decay of every pair."""
+        matrix = self._decay_matrix(decay)
+        values = matrix.data * self.demand[self._rows]
+        values *= self._supply_factor(matrix)[matrix.indices]
+        return self._to_pairs(values)
+
+    def flows(self, decay: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Fij and Tij in pair order, sharing one decay matrix."""
+        matrix = self._decay_matrix(decay)
+        fij = matrix.data * self.supply[matrix.indices]
+        fij *= self._demand_factor(matrix)[self._rows]
+        tij = matrix.data * self.demand[self._rows]
+        tij *= self._supply_factor(matrix)[matrix.indices]
+        return self._to_pairs(fij), self._to_pairs(tij)
+
+    def scores(self, decay: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Accessibility per demand location and crowdedness per supply location.
+
+        Locations with zero demand (supply) score 0, as in the pair form.
+        """
+        matrix = self._decay_matrix(decay)
+        access = matrix @ self._supply_factor(matrix)
+        crowd = matrix.T @ self._demand_factor(matrix)
+        access[self.demand <= 0] = 0.0
+        crowd[self.supply <= 0] = 0.0
+        return access, crowd
+
+    def scenario_scores(
+        self, decay: np.ndarray, demand: np.ndarray, supply: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Accessibility and crowdedness for many demand/supply scenarios.
+
+        Parameters:
+        -----------
+        decay : np.ndarray
+            Decay of every pair (pair order), shared by all scenarios
+        demand : np.ndarray
+            Demand per location and scenario, shape (n_demand, K)
+        supply : np.ndarray
+            Supply per location and scenario, shape (n_supply, K)
+
+        Returns:
+        --------
+        tuple
+            (accessibility of shape (n_demand, K), crowdedness of shape
+            (n_supply, K))
+        """
+        matrix = self._decay_matrix(decay)
+        demand_factor = self._safe_ratio(demand, matrix @ supply)
+        supply_factor = self._safe_ratio(supply, matrix.T @ demand)
+        access = matrix @ supply_factor
+        crowd = matrix.T @ demand_factor
+        access[demand <= 0] = 0.0
+        crowd[supply <= 0] = 0.0
+        return access, crowd
@@ -0,0 +1,410 @@
+"""
+Out-of-core evaluation for the R2SFCA package.
+
+This module evaluates the R2SFCA model on demand-supply tables that are read
+from disk in chunks, so memory use grows with the number of demand and supply
+locations rather than with the number of pairs.
+"""
+
+import os
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .core import DecayFunction, decay_values
+from .metrics import MetricAccumulator
+
+
+_PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+class _IdRegistry:
+    """
+    Incremental ID -> code table for one location type.
+
+    Codes are assigned in order of first appearance; the location value
+    (demand or supply) is taken from the first pair that mentions the ID.
+    """
+
+    def __init__(self):
+        self.index = pd.Index([])
+        self.values = np.empty(0, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def encode(
+        self, ids: np.ndarray, values: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Codes of ``ids``; unseen IDs are registered when ``values`` is given."""
+        codes = self.index.get_indexer(ids)
+        new = codes < 0
+        if new.any():
+            if values is None:
+                raise ValueError("Chunk contains IDs that were not seen in the scan")
+            new_codes, new_ids = pd.factorize(ids[new])
+            _, first = np.unique(new_codes, return_index=True)
+            codes[new] = len(self.index) + new_codes
+            self.index = self.index.append(pd.Index(new_ids))
+            self.values = np.concatenate(
+                [self.values, values[new][first].astype(np.float64)]
+            )
+        return codes
+
+    def sorted_series(self, scores: np.ndarray) -> pd.Series:
+        """Per-code scores as a Series indexed by ID in sorted order."""
+        order = np.argsort(self.index.values, kind="stable")
+        return pd.Series(scores[order], index=self.index.values[order])
+
+
+class StreamingR2SFCA:
+    """
+    R2SFCA model evaluated out of core over a chunked demand-supply table.
+
+    The table is read from a CSV (optionally compressed, e.g. ``.csv.gz``) or
+    Parquet file in chunks; pairs may come in any order. Construction scans
+    the file once to register the demand and supply locations. Every
+    evaluation then takes two passes: the first accumulates, per demand and
+    per supply location, the sums of supply * decay and demand * decay; the
+    second turns them into Fij and Tij chunk by chunk. Only per-location
+    arrays are kept in memory, never the pair table.
+
+    Parameters:
+    -----------
+    source : str or path-like
+        Path of a CSV/CSV.GZ or Parquet (``.parquet``/``.pq``) file
+    demand_col : str
+        Column name for demand values
+    supply_col : str
+        Column name for supply values
+    travel_cost_col : str
+        Column name for travel cost/distance values
+    demand_id_col : str
+        Column name for demand location IDs
+    supply_id_col : str
+        Column name for supply location IDs
+    observed_flow_col : str, optional
+        Column name for observed flow values (for validation)
+    decay_function : str or DecayFunction, default 'exponential'
+        Type of decay function to use
+    epsilon : float, default 1e-15
+        Small value to avoid division by zero
+    chunksize : int, default 1_000_000
+        Number of pairs read per chunk
+    median_travel_cost : float, optional
+        Median travel cost used to scale beta for the sigmoid decay. If not
+        given for a sigmoid model, the scan keeps the travel-cost column (one
+        float per pair) to compute it.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, os.PathLike],
+        demand_col: str = "Demand",
+        supply_col: str = "Supply",
+        travel_cost_col: str = "TravelCost",
+        demand_id_col: str = "DemandID",
+        supply_id_col: str = "SupplyID",
+        observed_flow_col: Optional[str] = None,
+        decay_function: Union[str, DecayFunction] = "exponential",
+        epsilon: float = 1e-15,
+        chunksize: int = 1_000_000,
+        median_travel_cost: Optional[float] = None,
+    ):
+        if chunksize < 1:
+            raise ValueError("chunksize must be a positive integer")
+
+        self.source = os.fspath(source)
+        self.demand_col = demand_col
+        self.supply_col = supply_col
+        self.travel_cost_col = travel_cost_col
+        self.demand_id_col = demand_id_col
+        self.supply_id_col = supply_id_col
+        self.observed_flow_col = observed_flow_col
+        self.chunksize = chunksize
+        self.epsilon = epsilon
+        self.decay_function = (
+            DecayFunction(decay_function)
+            if isinstance(decay_function, str)
+            else decay_function
+        )
+
+        self._columns = [
+            demand_id_col,
+            supply_id_col,
+            demand_col,
+            supply_col,
+            travel_cost_col,
+        ]
+        if observed_flow_col:
+            self._columns.append(observed_flow_col)
+
+        self._demand_registry = _IdRegistry()
+        self._supply_registry = _IdRegistry()
+        self._weight_sums_key = None
+        self._weight_sums = None
+
+        # Scan: register locations, count pairs and (if needed) the median
+        keep_costs = (
+            self.decay_function == DecayFunction.SIGMOID and median_travel_cost is None
+        )
+        costs = []
+        self.n_pairs = 0
+        for chunk in self._read_chunks():
+            self._demand_registry.encode(chunk[demand_id_col], chunk[demand_col])
+            self._supply_registry.encode(chunk[supply_id_col], chunk[supply_col])
+            self.n_pairs += len(chunk[travel_cost_col])
+            if keep_costs:
+                costs.append(chunk[travel_cost_col])
+
+        if keep_costs:
+            median_travel_cost = np.median(np.concatenate(costs)) if costs else 0.0
+        self.median_travel_cost = median_travel_cost
+
+        if self.decay_function == DecayFunction.SIGMOID:
+            print(
+                f"Using median value of travel cost ({self.median_travel_cost:.2f}) for scaling beta in sigmoid function"
+            )
+
+    @property
+    def demand_values(self) -> pd.Series:
+        """Demand value of every demand location, indexed by ID."""
+        return self._demand_registry.sorted_series(self._demand_registry.values)
+
+    @property
+    def supply_values(self) -> pd.Series:
+        """Supply value of every supply location, indexed by ID."""
+        return self._supply_registry.sorted_series(self._supply_registry.values)
+
+    def _read_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield the required columns of the source, chunk by chunk."""
+        if self.source.lower().endswith(_PARQUET_SUFFIXES):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError as exc:
+                raise ImportError(
+                    "Reading Parquet files requires pyarrow: pip install pyarrow"
+                ) from exc
+
+            parquet_file = pq.ParquetFile(self.source)
+            for batch in parquet_file.iter_batches(
+                batch_size=self.chunksize, columns=self._columns
+            ):
+                yield {
+                    col: batch.column(col).to_numpy(zero_copy_only=False)
+                    for col in self._columns
+                }
+        else:
+            with pd.read_csv(
+                self.source, usecols=self._columns, chunksize=self.chunksize
+            ) as reader:
+                for frame in reader:
+                    yield {col: frame[col].to_numpy() for col in self._columns}
+
+    def _chunks(self) -> Iterator[Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray]]:
+        """Yield (columns, demand codes, supply codes) for every chunk."""
+        for chunk in self._read_chunks():
+            demand_codes = self._demand_registry.encode(chunk[self.demand_id_col])
+            supply_codes = self._supply_registry.encode(chunk[self.supply_id_col])
+            yield chunk, demand_codes, supply_codes
+
+    def _decay(self, travel_cost: np.ndarray, beta: float, kwargs: Dict) -> np.ndarray:
+        return decay_values(
+            self.decay_function,
+            travel_cost,
+            beta,
+            self.median_travel_cost,
+            **{"epsilon": self.epsilon, **kwargs},
+        )
+
+    def _group_weight_sums(
+        self, beta: float, kwargs: Dict
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        First pass: per-location sums of supply * decay and demand * decay.
+
+        The sums of the last evaluated parameter point are cached, so the
+        first pass is skipped when the same point is evaluated again.
+        """
+        key = (beta, tuple(sorted(kwargs.items())))
+        if self._weight_sums_key == key:
+            return self._weight_sums
+
+        n_demand = len(self._demand_registry)
+        n_supply = len(self._supply_registry)
+        demand_sums = np.zeros(n_demand)
+        supply_sums = np.zeros(n_supply)
+        for chunk, demand_codes, supply_codes in self._chunks():
+            decay = self._decay(chunk[self.travel_cost_col], beta, kwargs)
+            demand_sums += np.bincount(
+                demand_codes, weights=chunk[self.supply_col] * decay, minlength=n_demand
+            )
+            supply_sums += np.bincount(
+                supply_codes, weights=chunk[self.demand_col] * decay, minlength=n_supply
+            )
+
+        self._weight_sums_key = key
+        self._weight_sums = (demand_sums, supply_sums)
+        return self._weight_sums
+
+    def _iter_chunk_flows(self, beta: float, kwargs: Dict):
+        """Second pass: yield (chunk, demand codes, supply codes, fij, tij)."""
+        demand_sums, supply_sums = self._group_weight_sums(beta, kwargs)
+
+        # Per-location factors: D_i / sum_j(S_j f_ij) and S_j / sum_i(D_i f_ij)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            demand_factor = np.where(
+                demand_sums > 0, self._demand_registry.values / demand_sums, 0.0
+            )
+            supply_factor = np.where(
+                supply_sums > 0, self._supply_registry.values / supply_sums, 0.0
+            )
+
+        for chunk, demand_codes, supply_codes in self._chunks():
+            decay = self._decay(chunk[self.travel_cost_col], beta, kwargs)
+            fij = chunk[self.supply_col] * decay
+            fij *= demand_factor[demand_codes]
+            tij = np.multiply(chunk[self.demand_col], decay, out=decay)
+            tij *= supply_factor[supply_codes]
+            yield chunk, demand_codes, supply_codes, fij, tij
+
+    def iter_flows(self, beta: float, **kwargs) -> Iterator[pd.DataFrame]:
+        """
+        Yield Fij and Tij chunk by chunk, in file order.
+
+        Parameters:
+        -----------
+        beta : float
+            Decay parameter
+        **kwargs
+            Additional parameters for decay function
+
+        Yields:
+        -------
+        pd.DataFrame
+            Demand ID, supply ID, 'Fij' and 'Tij' columns for one chunk
+        """
+        for chunk, _, _, fij, tij in self._iter_chunk_flows(beta, kwargs):
+            yield pd.DataFrame(
+                {
+                    self.demand_id_col: chunk[self.demand_id_col],
+                    self.supply_id_col: chunk[self.supply_id_col],
+                    "Fij": fij,
+                    "Tij": tij,
+                }
+            )
+
+    def fij(self, beta: float, **kwargs) -> np.ndarray:
+        """
+        Calculate Fij values in file order.
+
+        The result holds one value per pair; use ``iter_flows`` to avoid
+        materializing it.
+        """
+        flows = [fij for _, _, _, fij, _ in self._iter_chunk_flows(beta, kwargs)]
+        return np.concatenate(flows) if flows else np.empty(0)
+
+    def tij(self, beta: float, **kwargs) -> np.ndarray:
+        """
+        Calculate Tij values in file order.
+
+        The result holds one value per pair; use ``iter_flows`` to avoid
+        materializing it.
+        """
+        flows = [tij for _, _, _, _, tij in self._iter_chunk_flows(beta, kwargs)]
+        return np.concatenate(flows) if flows else np.empty(0)
+
+    def scores(self, beta: float, **kwargs) -> Tuple[pd.Series, pd.Series]:
+        """
+        Calculate accessibility (Ai) and crowdedness (Cj) scores together.
+
+        Parameters:
+        -----------
+        beta : float
+            Decay parameter
+        **kwargs
+            Additional parameters for decay function
+
+        Returns:
+        --------
+        tuple
+            (accessibility indexed by demand IDs, crowdedness indexed by
+            supply IDs)
+        """
+        n_demand = len(self._demand_registry)
+        n_supply = len(self._supply_registry)
+        tij_sums = np.zeros(n_demand)
+        fij_sums = np.zeros(n_supply)
+        for _, demand_codes, supply_codes, fij, tij in self._iter_chunk_flows(
+            beta, kwargs
+        ):
+            tij_sums += np.bincount(demand_codes, weights=tij, minlength=n_demand)
+            fij_sums += np.bincount(supply_codes, weights=fij, minlength=n_supply)
+
+        demand = self._demand_registry.values
+        supply = self._supply_registry.values
+        with np.errstate(divide="ignore", invalid="ignore"):
+            access = np.where(demand > 0, tij_sums / demand, 0.0)
+            crowd = np.where(supply > 0, fij_sums / supply, 0.0)
+        return (
+            self._demand_registry.sorted_series(access),
+            self._supply_registry.sorted_series(crowd),
+        )
+
+    def access_score(self, beta: float, **kwargs) -> pd.Series:
+        """Calculate accessibility scores (Ai) indexed by demand IDs."""
+        return self.scores(beta, **kwargs)[0]
+
+    def crowd_score(self, beta: float, **kwargs) -> pd.Series:
+        """Calculate crowdedness scores (Cj) indexed by supply IDs."""
+        return self.scores(beta, **kwargs)[1]
+
+    def evaluate(
+        self,
+        beta: float,
+        metrics: List[str] = ["cross_entropy", "correlation", "rmse"],
+        normalize: bool = True,
+        **kwargs,
+    ) -> Dict:
+        """
+        Evaluate metrics between Fij and Tij without materializing them.
+
+        Supports the same metrics as ``R2SFCA.search_fij``. Fij and Tij
+        totals are known after the first pass, so the cross-entropy and all
+        other metrics accumulate in the second pass.
+
+        Parameters:
+        -----------
+        beta : float
+            Decay parameter
+        metrics : list
+            Metrics to calculate
+        normalize : bool
+            Whether to normalize Fij and Tij in the cross-entropy
+        **kwargs
+            Additional parameters for decay function
+
+        Returns:
+        --------
+        dict
+            Metric name -> value
+        """
+        demand_sums, supply_sums = self._group_weight_sums(beta, kwargs)
+        fij_total = tij_total = None
+        if normalize:
+            fij_total = np.sum(self._demand_registry.values[demand_sums > 0])
+            tij_total = np.sum(self._supply_registry.values[supply_sums > 0])
+        accumulator = MetricAccumulator(
+            metrics, normalize, fij_total, tij_total, epsilon=self.epsilon
+        )
+
+        want_flow = self.observed_flow_col is not None and any(
+            m.endswith("_flow_correlation") for m in metrics
+        )
+        for chunk, _, _, fij, tij in self._iter_chunk_flows(beta, kwargs):
+            observed = None
+            if want_flow:
+                observed = np.asarray(chunk[self.observed_flow_col], dtype=np.float64)
+            accumulator.update(fij, tij, observed)
+        return accumulator.result()
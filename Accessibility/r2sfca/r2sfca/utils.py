@@ -2,14 +2,18 @@
 Utility functions for the R2SFCA package.
 
 This module contains helper functions for evaluation, plotting, and data processing.
+matplotlib and seaborn are imported by the plotting functions on first use, so
+importing the package (e.g. in headless worker processes) does not load them.
 """
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import List, Dict, Optional, Tuple
-from scipy.stats import pearsonr
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
+
+from .metrics import compute_metrics
+
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
 
 
 def evaluate_model(
@@ -45,38 +49,14 @@ def evaluate_model(
         if observed_flow is not None:
             metrics.extend(["fij_flow_correlation", "tij_flow_correlation"])
 
-    results = {}
-
-    # Normalize Fij and Tij for cross-entropy calculation
-    fij_norm = fij / (np.sum(fij) + epsilon)
-    tij_norm = tij / (np.sum(tij) + epsilon)
-
-    for metric in metrics:
-        if metric == "cross_entropy":
-            results[metric] = -np.sum(fij_norm * np.log(tij_norm + epsilon))
-
-        elif metric == "correlation":
-            corr, _ = pearsonr(fij, tij)
-            results[metric] = corr
-
-        elif metric == "rmse":
-            results[metric] = np.sqrt(np.mean((fij - tij) ** 2))
-
-        elif metric == "mse":
-            results[metric] = np.mean((fij - tij) ** 2)
-
-        elif metric == "mae":
-            results[metric] = np.mean(np.abs(fij - tij))
-
-        elif metric == "fij_flow_correlation" and observed_flow is not None:
-            corr, _ = pearsonr(fij, observed_flow)
-            results[metric] = corr
-
-        elif metric == "tij_flow_correlation" and observed_flow is not None:
-            corr, _ = pearsonr(tij, observed_flow)
-            results[metric] = corr
-
-    return results
+    # All metrics in one pass, without normalized copies of Fij and Tij
+    return compute_metrics(
+        np.asarray(fij),
+        np.asarray(tij),
+        metrics,
+        observed=None if observed_flow is None else np.asarray(observed_flow),
+        epsilon=epsilon,
+    )
 
 
 def plot_grid_search_results(
@@ -86,7 +66,7 @@ def plot_grid_search_results(
     title: str = None,
     figsize: Tuple[int, int] = (10, 6),
     save_path: Optional[str] = None,
-) -> plt.Figure:
+) -> "plt.Figure":
     """
     Plot grid search results showing how metrics change with parameters.
 
@@ -126,6 +106,8 @@ def plot_grid_search_results(
     if not y_cols:
         raise ValueError("No valid y-axis columns found in results dataframe")
 
+    import matplotlib.pyplot as plt
+
     # Create figure
     fig, axes = plt.subplots(len(y_cols), 1, figsize=figsize, sharex=True)
     if len(y_cols) == 1:
@@ -210,7 +192,7 @@ def plot_model_comparison(
     title: str = "Model Comparison",
     figsize: Tuple[int, int] = (12, 8),
     save_path: Optional[str] = None,
-) -> plt.Figure:
+) -> "plt.Figure":
     """
     Plot comparison of multiple models' performance.
 
@@ -239,6 +221,9 @@ def plot_model_comparison(
     if len(results_dfs) != len(labels):
         raise ValueError("Number of dataframes must match number of labels")
 
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # Create figure
     fig, ax = plt.subplots(figsize=figsize)
 
@@ -0,0 +1,57 @@
+"""Shared fixtures for the R2SFCA tests."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from r2sfca import R2SFCA
+
+COLUMNS = dict(
+    demand_col="Demand",
+    supply_col="Supply",
+    travel_cost_col="TravelCost",
+    demand_id_col="DemandID",
+    supply_id_col="SupplyID",
+    observed_flow_col="O_Fij",
+)
+
+
+def make_table(n_demand=40, n_supply=15, seed=0, shuffle=False):
+    """Small OD table: every demand location linked to most supply locations."""
+    rng = np.random.default_rng(seed)
+    demand_xy = rng.uniform(0, 100, (n_demand, 2))
+    supply_xy = rng.uniform(0, 100, (n_supply, 2))
+    demand_ids, supply_ids = np.meshgrid(
+        np.arange(n_demand), np.arange(n_supply), indexing="ij"
+    )
+    demand_ids, supply_ids = demand_ids.ravel(), supply_ids.ravel()
+    linked = rng.random(len(demand_ids)) < 0.8
+    demand_ids, supply_ids = demand_ids[linked], supply_ids[linked]
+
+    travel_cost = np.hypot(*(demand_xy[demand_ids] - supply_xy[supply_ids]).T) + 1.0
+    demand = rng.integers(100, 5000, n_demand)[demand_ids]
+    supply = rng.integers(1, 50, n_supply)[supply_ids]
+    observed = rng.gamma(2.0, 50.0, len(demand_ids)) * np.exp(-0.05 * travel_cost)
+    table = pd.DataFrame(
+        {
+            "DemandID": demand_ids + 1000,
+            "SupplyID": supply_ids + 500,
+            "Demand": demand.astype(float),
+            "Supply": supply.astype(float),
+            "TravelCost": travel_cost,
+            "O_Fij": observed,
+        }
+    )
+    if shuffle:
+        table = table.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+    return table
+
+
+@pytest.fixture
+def table():
+    return make_table()
+
+
+@pytest.fixture
+def model(table):
+    return R2SFCA(table, decay_function="exponential", **COLUMNS)
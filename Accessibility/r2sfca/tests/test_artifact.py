@@ -0,0 +1,77 @@
+"""save/load round trip of preprocessed models."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS
+
+
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+@pytest.mark.parametrize("backend", ["pairs", "sparse"])
+def test_round_trip(tmp_path, table, mmap_mode, backend):
+    model = R2SFCA(table, decay_function="gaussian", backend=backend, **COLUMNS)
+    model.solve_beta(metric="cross_entropy", param2=30.0)
+    model.save(tmp_path / "model")
+
+    loaded = R2SFCA.load(tmp_path / "model", mmap_mode=mmap_mode)
+    assert loaded.decay_function == model.decay_function
+    assert loaded.backend == backend
+    assert loaded.fitted_params == model.fitted_params
+    for method in ("fij", "tij"):
+        np.testing.assert_array_equal(
+            getattr(loaded, method)(0.7, d0=30.0), getattr(model, method)(0.7, d0=30.0)
+        )
+    for expected, actual in zip(
+        model.scores(0.7, d0=30.0), loaded.scores(0.7, d0=30.0)
+    ):
+        pd.testing.assert_series_equal(actual, expected)
+    kwargs = dict(beta_range=(0.2, 1.0, 0.2), param2_range=30.0)
+    pd.testing.assert_frame_equal(
+        loaded.search_fij(**kwargs), model.search_fij(**kwargs)
+    )
+
+
+def test_string_ids_round_trip(tmp_path, table):
+    table["DemandID"] = "d" + table["DemandID"].astype(str)
+    model = R2SFCA(table, **COLUMNS)
+    model.save(tmp_path / "model")
+    loaded = R2SFCA.load(tmp_path / "model")
+    pd.testing.assert_series_equal(loaded.access_score(0.5), model.access_score(0.5))
+
+
+def test_loaded_model_can_be_updated(tmp_path, table, model):
+    model.save(tmp_path / "model")
+    loaded = R2SFCA.load(tmp_path / "model")
+    supply_id = table["SupplyID"].iloc[0]
+    expected = model.update_supply({supply_id: 50.0}, 0.5)
+    actual = loaded.update_supply({supply_id: 50.0}, 0.5)
+    for a, b in zip(actual, expected):
+        pd.testing.assert_series_equal(a, b)
+
+
+def test_resave_replaces_artifact(tmp_path, table, model):
+    model.save(tmp_path / "model")
+    R2SFCA(table, decay_function="power", **COLUMNS).save(tmp_path / "model")
+    assert R2SFCA.load(tmp_path / "model").decay_function.value == "power"
+
+
+def test_save_loaded_model_to_its_own_path(tmp_path, table, model):
+    path = tmp_path / "model"
+    model.save(path)
+    loaded = R2SFCA.load(path)  # arrays memory-mapped from ``path``
+    loaded.solve_beta(metric="cross_entropy")
+    loaded.save(path)
+
+    reloaded = R2SFCA.load(path)
+    assert reloaded.fitted_params == loaded.fitted_params
+    np.testing.assert_array_equal(reloaded.fij(0.6), model.fij(0.6))
+    np.testing.assert_array_equal(loaded.tij(0.6), model.tij(0.6))
+    assert sorted(p.name for p in path.iterdir() if p.name.startswith(".")) == []
+
+
+def test_load_rejects_other_directories(tmp_path):
+    with pytest.raises(ValueError):
+        R2SFCA.load(tmp_path)
@@ -0,0 +1,43 @@
+"""Bootstrap resampling of the optimal beta."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS, make_table
+
+
+@pytest.fixture(params=["DemandID", "SupplyID"])
+def sorted_model(request):
+    table = make_table().sort_values(request.param, kind="stable")
+    return R2SFCA(table.reset_index(drop=True), **COLUMNS)
+
+
+@pytest.mark.parametrize("unit", ["demand", "pairs"])
+def test_resample_matches_rebuilt_model(sorted_model, unit):
+    resampled = sorted_model._resample(unit, np.random.default_rng(1))
+    rebuilt = R2SFCA(
+        pd.DataFrame(
+            {
+                "DemandID": resampled._demand_groups.codes,
+                "SupplyID": resampled._supply_groups.codes,
+                "Demand": resampled.demand,
+                "Supply": resampled.supply,
+                "TravelCost": resampled.travel_cost,
+                "O_Fij": resampled.observed_flow,
+            }
+        ),
+        **COLUMNS,
+    )
+    for method in ("fij", "tij"):
+        np.testing.assert_allclose(
+            getattr(resampled, method)(0.4), getattr(rebuilt, method)(0.4), rtol=1e-12
+        )
+
+
+def test_interval_contains_estimate(sorted_model):
+    result = sorted_model.bootstrap_beta(n_boot=20, random_state=0)
+    assert result["ci_lower"] <= result["optimal_beta"] <= result["ci_upper"]
+    assert result["n_failed"] == 0
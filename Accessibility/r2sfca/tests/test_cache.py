@@ -0,0 +1,87 @@
+"""ArrayCache and the model's decay/flow cache."""
+
+import numpy as np
+import pytest
+
+from r2sfca import R2SFCA
+from r2sfca.cache import ArrayCache
+
+from conftest import COLUMNS
+
+
+def test_array_cache_counts_and_evicts_least_recent():
+    cache = ArrayCache(max_bytes=3 * 80)
+    arrays = {key: np.full(10, float(key)) for key in range(4)}
+    for key in range(3):
+        cache.put(key, arrays[key])
+    assert cache.get(0) is arrays[0]  # 0 becomes most recent
+    assert cache.get(5) is None
+
+    cache.put(3, arrays[3])  # evicts 1, the least recently used
+    assert cache.get(1) is None
+    assert cache.get(2) is arrays[2]
+    assert cache.info() == {
+        "hits": 2,
+        "misses": 2,
+        "entries": 3,
+        "nbytes": 240,
+        "max_bytes": 240,
+    }
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.info()["hits"] == cache.info()["misses"] == 0
+
+
+def test_array_cache_marks_stored_arrays_read_only():
+    cache = ArrayCache(max_bytes=80)
+    stored = cache.put("small", np.zeros(10))
+    assert not stored.flags.writeable
+    with pytest.raises(ValueError):
+        stored[0] = 1.0
+
+    # Larger than the whole budget: returned untouched and not stored
+    large = cache.put("large", np.zeros(11))
+    assert large.flags.writeable
+    assert cache.get("large") is None
+
+
+def test_array_cache_rejects_negative_budget():
+    with pytest.raises(ValueError, match="max_bytes"):
+        ArrayCache(-1)
+
+
+def test_model_cache_hits_and_matches_uncached(table, model):
+    cached = R2SFCA(table, cache_bytes=1 << 20, **COLUMNS)
+    assert model.cache_info() is None
+
+    for beta in (0.2, 0.5, 0.2):
+        np.testing.assert_array_equal(cached.fij(beta), model.fij(beta))
+        np.testing.assert_array_equal(cached.tij(beta), model.tij(beta))
+        np.testing.assert_array_equal(cached.dist_decay(beta), model.dist_decay(beta))
+
+    info = cached.cache_info()
+    assert info["hits"] > 0 and info["misses"] > 0
+    assert cached.fij(0.2) is cached.fij(0.2)
+    assert not cached.fij(0.2).flags.writeable
+    assert not cached.dist_decay(0.2).flags.writeable
+
+    cached.clear_cache()
+    assert cached.cache_info()["entries"] == 0
+
+
+def test_model_cache_respects_byte_budget(table, model):
+    budget = 2 * len(table) * 8
+    cached = R2SFCA(table, cache_bytes=budget, **COLUMNS)
+    for beta in np.linspace(0.1, 1.0, 6):
+        np.testing.assert_array_equal(cached.fij(beta), model.fij(beta))
+        assert cached.cache_info()["nbytes"] <= budget
+    assert cached.cache_info()["entries"] == 2
+
+
+def test_cache_flows_false_keeps_flows_writeable(table):
+    cached = R2SFCA(table, cache_bytes=1 << 20, cache_flows=False, **COLUMNS)
+    fij = cached.fij(0.3)
+    assert fij.flags.writeable
+    assert cached.fij(0.3) is not fij
+    assert cached.cache_info()["entries"] == 1  # the decay vector only
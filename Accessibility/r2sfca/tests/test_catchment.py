@@ -0,0 +1,62 @@
+"""Catchment truncation (max_travel_cost / min_decay)."""
+
+import numpy as np
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS
+
+METRICS = [
+    "cross_entropy",
+    "correlation",
+    "rmse",
+    "mae",
+    "fij_flow_correlation",
+    "tij_flow_correlation",
+]
+
+
+@pytest.fixture
+def truncated(table):
+    return R2SFCA(table, decay_function="exponential", min_decay=1e-6, **COLUMNS)
+
+
+def test_min_decay_drops_pairs(truncated):
+    report = truncated.catchment_report(0.5)
+    assert 0.0 < report["kept_fraction"] < 1.0
+
+
+@pytest.mark.parametrize("memory_budget", [None, 1 << 20])
+def test_search_fij_matches_untruncated(model, truncated, memory_budget):
+    kwargs = dict(beta_range=(0.05, 1.0, 0.05), metrics=METRICS)
+    full = model.search_fij(**kwargs)
+    reduced = truncated.search_fij(memory_budget=memory_budget, **kwargs)
+    for metric in METRICS:
+        scale = np.max(np.abs(full[metric]))
+        np.testing.assert_allclose(reduced[metric], full[metric], atol=1e-5 * scale)
+
+
+@pytest.mark.parametrize("metric", ["cross_entropy", "mae", "correlation"])
+def test_solve_beta_matches_untruncated(model, truncated, metric):
+    full = model.solve_beta(metric=metric)
+    reduced = truncated.solve_beta(metric=metric)
+    assert reduced["optimal_beta"] == pytest.approx(full["optimal_beta"], rel=1e-3)
+    for name, value in full["final_metrics"].items():
+        assert reduced["final_metrics"][name] == pytest.approx(value, rel=1e-5)
+
+
+def test_dropped_pairs_count_as_zero_flows(truncated):
+    beta = 0.8
+    metrics, fij, tij = truncated._evaluate(beta, None, METRICS)
+    assert truncated.catchment_report(beta)["kept_fraction"] < 1.0
+    # Metrics of the expanded flows, dropped pairs included as zeros
+    expected = truncated._calculate_metrics(fij, tij, METRICS)
+    for metric in METRICS:
+        assert metrics[metric] == pytest.approx(expected[metric], rel=1e-12)
+
+
+def test_catchment_report_metric_errors(truncated):
+    report = truncated.catchment_report(0.8, metrics=METRICS)
+    assert set(report["metric_errors"]) == set(METRICS)
+    assert all(abs(error) < 1e-3 for error in report["metric_errors"].values())
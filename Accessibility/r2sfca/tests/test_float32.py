@@ -0,0 +1,49 @@
+"""float32 compute mode against float64."""
+
+import numpy as np
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS
+
+
+@pytest.fixture(params=["pairs", "sparse"])
+def models(request, table):
+    return tuple(
+        R2SFCA(table, dtype=dtype, backend=request.param, **COLUMNS)
+        for dtype in ("float32", "float64")
+    )
+
+
+def test_flows_are_float32(models):
+    model32, _ = models
+    assert model32.fij(0.5).dtype == np.float32
+    assert model32.tij(0.5).dtype == np.float32
+
+
+@pytest.mark.parametrize("beta", [0.05, 0.2, 0.5])
+def test_flows_within_tolerance(models, beta):
+    model32, model64 = models
+    for method in ("fij", "tij"):
+        flows32 = getattr(model32, method)(beta)
+        flows64 = getattr(model64, method)(beta)
+        assert np.all(np.isfinite(flows32))
+        np.testing.assert_allclose(flows32, flows64, atol=1e-5 * flows64.max())
+
+
+def test_metrics_within_tolerance(models):
+    model32, model64 = models
+    kwargs = dict(beta_range=(0.1, 1.0, 0.1), metrics=["cross_entropy", "rmse"])
+    search32 = model32.search_fij(**kwargs)
+    search64 = model64.search_fij(**kwargs)
+    for metric in kwargs["metrics"]:
+        np.testing.assert_allclose(search32[metric], search64[metric], rtol=1e-4)
+
+
+def test_optimal_beta_within_tolerance(models):
+    # Documented agreement of the float32 mode (see validate_float32.py)
+    model32, model64 = models
+    beta32 = model32.solve_beta(metric="cross_entropy")["optimal_beta"]
+    beta64 = model64.solve_beta(metric="cross_entropy")["optimal_beta"]
+    assert beta32 == pytest.approx(beta64, rel=1e-4)
@@ -0,0 +1,79 @@
+"""Fij, Tij and scores against the original per-ID loop."""
+
+import numpy as np
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS, make_table
+
+# Per-location sums are segmented reductions rather than one np.sum per mask,
+# so the summation order (and the last bit) differs from the loop
+RTOL = 1e-13
+
+
+def loop_flows(table, decay):
+    """Fij and Tij computed with one boolean mask per location."""
+    demand = table["Demand"].to_numpy()
+    supply = table["Supply"].to_numpy()
+    fij = np.zeros(len(table))
+    tij = np.zeros(len(table))
+    for ids, flows, totals, weights in (
+        (table["DemandID"].to_numpy(), fij, demand, supply * decay),
+        (table["SupplyID"].to_numpy(), tij, supply, demand * decay),
+    ):
+        for location in np.unique(ids):
+            mask = ids == location
+            weight_sum = np.sum(weights[mask])
+            if weight_sum > 0:
+                flows[mask] = totals[mask][0] * weights[mask] / weight_sum
+    return fij, tij
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("backend", ["pairs", "sparse"])
+@pytest.mark.parametrize(
+    "decay_function, kwargs",
+    [("exponential", {}), ("power", {}), ("gaussian", {"d0": 30.0})],
+)
+def test_flows_match_loop(shuffle, backend, decay_function, kwargs):
+    table = make_table(shuffle=shuffle)
+    model = R2SFCA(table, decay_function=decay_function, backend=backend, **COLUMNS)
+    beta = 0.6
+    fij, tij = loop_flows(table, model.dist_decay(beta, **kwargs))
+    np.testing.assert_allclose(model.fij(beta, **kwargs), fij, rtol=RTOL)
+    np.testing.assert_allclose(model.tij(beta, **kwargs), tij, rtol=RTOL)
+
+
+def test_scores_match_flow_sums(table, model):
+    beta = 0.4
+    fij, tij = loop_flows(table, model.dist_decay(beta))
+    access, crowd = model.scores(beta)
+
+    by_demand = table.assign(tij=tij).groupby("DemandID")
+    expected_access = by_demand["tij"].sum() / by_demand["Demand"].first()
+    by_supply = table.assign(fij=fij).groupby("SupplyID")
+    expected_crowd = by_supply["fij"].sum() / by_supply["Supply"].first()
+
+    np.testing.assert_allclose(access.loc[expected_access.index], expected_access)
+    np.testing.assert_allclose(crowd.loc[expected_crowd.index], expected_crowd)
+    np.testing.assert_allclose(model.access_score(beta), access)
+    np.testing.assert_allclose(model.crowd_score(beta), crowd)
+
+
+def test_location_without_weight_gets_zero_flows(table):
+    # Demand location reaching only a site without supply
+    demand_id, supply_id = table.loc[0, ["DemandID", "SupplyID"]]
+    table.loc[table["SupplyID"] == supply_id, "Supply"] = 0.0
+    table = table[(table["DemandID"] != demand_id) | (table.index == 0)]
+    model = R2SFCA(table, **COLUMNS)
+    fij, tij = loop_flows(table, model.dist_decay(0.5))
+    assert model.fij(0.5)[0] == 0.0
+    np.testing.assert_allclose(model.fij(0.5), fij, rtol=RTOL)
+    np.testing.assert_allclose(model.tij(0.5), tij, rtol=RTOL)
+
+
+def test_exponential_transform_reuses_travel_cost(model):
+    decay = model.dist_decay(0.5)
+    assert model._transformed_cost(model.epsilon) is model.travel_cost
+    np.testing.assert_allclose(decay, np.exp(-0.5 * model.travel_cost))
@@ -0,0 +1,57 @@
+"""Analytic metric gradients against central finite differences."""
+
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS
+
+METRICS = [
+    "cross_entropy",
+    "correlation",
+    "rmse",
+    "mse",
+    "mae",
+    "fij_flow_correlation",
+    "tij_flow_correlation",
+]
+
+
+def finite_difference(model, beta, param2, metric, wrt, h=1e-6):
+    def value(beta, param2):
+        return model._evaluate(beta, param2, [metric], full_flows=False)[0][metric]
+
+    if wrt == "beta":
+        return (value(beta + h, param2) - value(beta - h, param2)) / (2 * h)
+    return (value(beta, param2 + h) - value(beta, param2 - h)) / (2 * h)
+
+
+@pytest.mark.parametrize("metric", METRICS)
+@pytest.mark.parametrize("decay_function", ["exponential", "power", "sqrt_exponential"])
+def test_beta_gradient(table, metric, decay_function):
+    model = R2SFCA(table, decay_function=decay_function, **COLUMNS)
+    beta = 0.3
+    _, gradient, _, _ = model._evaluate_gradient(beta, None, metric)
+    expected = finite_difference(model, beta, None, metric, "beta")
+    assert gradient[0] == pytest.approx(expected, rel=1e-4, abs=1e-6)
+
+
+@pytest.mark.parametrize("metric", ["cross_entropy", "correlation", "rmse"])
+@pytest.mark.parametrize(
+    "decay_function, param2", [("gaussian", 40.0), ("sigmoid", 0.2)]
+)
+def test_two_parameter_gradient(table, metric, decay_function, param2):
+    model = R2SFCA(table, decay_function=decay_function, **COLUMNS)
+    beta = 0.8
+    _, gradient, _, _ = model._evaluate_gradient(
+        beta, param2, metric, wrt=("beta", "param2")
+    )
+    for value, wrt in zip(gradient, ("beta", "param2")):
+        expected = finite_difference(model, beta, param2, metric, wrt)
+        assert value == pytest.approx(expected, rel=1e-4, abs=1e-6)
+
+
+def test_analytic_and_numeric_solve_agree(model):
+    analytic = model.solve_beta(metric="cross_entropy", gradient="analytic")
+    numeric = model.solve_beta(metric="cross_entropy", gradient="numeric")
+    assert analytic["optimal_beta"] == pytest.approx(numeric["optimal_beta"], rel=1e-3)
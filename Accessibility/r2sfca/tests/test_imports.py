@@ -0,0 +1,58 @@
+"""Heavy optional modules are imported on first use, not by ``import r2sfca``."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# As checked by benchmarks/import_time.py
+LAZY_MODULES = [
+    "matplotlib",
+    "seaborn",
+    "scipy.optimize",
+    "scipy.sparse",
+    "scipy.stats",
+]
+
+PACKAGE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def loaded_after(statement):
+    """Lazy modules in ``sys.modules`` after running ``statement`` afresh."""
+    code = (
+        f"import sys; {statement}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [m for m in completed.stdout.strip().split(",") if m]
+
+
+def test_import_does_not_load_lazy_modules():
+    assert loaded_after("import r2sfca") == []
+
+
+@pytest.mark.parametrize(
+    "call, module",
+    [
+        ("model.solve_beta('rmse')", "scipy.optimize"),
+        ("model.scenario_scores(0.5)", "scipy.sparse"),
+    ],
+)
+def test_lazy_modules_load_on_first_use(call, module):
+    setup = (
+        "import numpy as np, pandas as pd, r2sfca; "
+        "df = pd.DataFrame({'Demand': [10.0, 10.0, 20.0], "
+        "'Supply': [1.0, 2.0, 2.0], 'TravelCost': [1.0, 2.0, 3.0], "
+        "'DemandID': [1, 1, 2], 'SupplyID': [1, 2, 2], 'O_Fij': [3.0, 7.0, 20.0]}); "
+        "model = r2sfca.R2SFCA(df, observed_flow_col='O_Fij')"
+    )
+    assert module not in loaded_after(setup)
+    assert module in loaded_after(f"{setup}; {call}")
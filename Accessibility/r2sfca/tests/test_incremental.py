@@ -0,0 +1,62 @@
+"""update_supply/update_demand against a model rebuilt from the changed table."""
+
+import numpy as np
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS
+
+BETA = 0.4
+
+
+def rebuilt(table, column, id_column, changes):
+    table = table.copy()
+    for location, value in changes.items():
+        table.loc[table[id_column] == location, column] = value
+    return R2SFCA(table, **COLUMNS)
+
+
+def assert_same_state(model, expected):
+    access, crowd = model.scores(BETA)
+    expected_access, expected_crowd = expected.scores(BETA)
+    np.testing.assert_allclose(access, expected_access, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(crowd, expected_crowd, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(
+        model.fij(BETA), expected.fij(BETA), rtol=1e-10, atol=1e-12
+    )
+    np.testing.assert_allclose(
+        model.tij(BETA), expected.tij(BETA), rtol=1e-10, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize(
+    "side, column, id_column",
+    [("supply", "Supply", "SupplyID"), ("demand", "Demand", "DemandID")],
+)
+def test_updates_match_recompute(table, model, side, column, id_column):
+    ids = np.unique(table[id_column])
+    update = getattr(model, f"update_{side}")
+    # A chain of updates, including removing a location
+    steps = [{ids[0]: 123.0}, {ids[1]: 0.0, ids[2]: 77.0}, {ids[0]: 5.0}]
+    applied = {}
+    for changes in steps:
+        access, crowd = update(changes, BETA)
+        applied.update(changes)
+        expected = rebuilt(table, column, id_column, applied)
+        expected_access, expected_crowd = expected.scores(BETA)
+        np.testing.assert_allclose(access, expected_access, rtol=1e-10, atol=1e-12)
+        np.testing.assert_allclose(crowd, expected_crowd, rtol=1e-10, atol=1e-12)
+    assert_same_state(model, expected)
+
+
+def test_update_applies_to_other_parameters(table, model):
+    supply_id = table["SupplyID"].iloc[0]
+    model.update_supply({supply_id: 99.0}, BETA)
+    expected = rebuilt(table, "Supply", "SupplyID", {supply_id: 99.0})
+    np.testing.assert_allclose(model.fij(0.9), expected.fij(0.9), rtol=1e-10)
+
+
+def test_unknown_location_raises(model):
+    with pytest.raises(ValueError):
+        model.update_supply({-1: 10.0}, BETA)
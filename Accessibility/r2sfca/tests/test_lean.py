@@ -0,0 +1,56 @@
+"""Lean construction from dataframes, mappings and typed arrays."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS
+
+
+@pytest.fixture
+def lean(table):
+    return R2SFCA(table, lean=True, **COLUMNS)
+
+
+def test_lean_model_owns_its_arrays(table, lean):
+    assert lean.df is None
+    for name, column in (
+        ("demand", "Demand"),
+        ("supply", "Supply"),
+        ("travel_cost", "TravelCost"),
+        ("observed_flow", "O_Fij"),
+    ):
+        array = getattr(lean, name)
+        assert array.flags.owndata
+        assert not np.shares_memory(array, table[column].to_numpy())
+
+
+def test_lean_matches_full_model(model, lean):
+    np.testing.assert_array_equal(lean.fij(0.5), model.fij(0.5))
+    np.testing.assert_array_equal(lean.tij(0.5), model.tij(0.5))
+    for expected, actual in zip(model.scores(0.5), lean.scores(0.5)):
+        pd.testing.assert_series_equal(actual, expected)
+    assert lean.demand_ids.dtype == np.int32
+
+
+def test_from_arrays_and_mapping_match(table, model):
+    from_arrays = R2SFCA.from_arrays(
+        table["Demand"].to_numpy(),
+        table["Supply"].to_numpy(),
+        table["TravelCost"].to_numpy(),
+        table["DemandID"].to_numpy(),
+        table["SupplyID"].to_numpy(),
+        observed_flow=table["O_Fij"].to_numpy(),
+    )
+    mapping = R2SFCA({name: table[name].to_numpy() for name in table}, **COLUMNS)
+    for other in (from_arrays, mapping):
+        np.testing.assert_array_equal(other.fij(0.5), model.fij(0.5))
+        pd.testing.assert_series_equal(other.access_score(0.5), model.access_score(0.5))
+
+
+def test_lean_float32(table):
+    model = R2SFCA(table, lean=True, dtype="float32", **COLUMNS)
+    assert model.demand.dtype == np.float32
+    assert model.travel_cost.dtype == np.float32
@@ -0,0 +1,115 @@
+"""MetricAccumulator and compute_metrics."""
+
+import numpy as np
+import pytest
+from scipy.stats import pearsonr
+
+from r2sfca import MetricAccumulator
+from r2sfca.metrics import METRICS, compute_metrics
+
+
+@pytest.fixture
+def flows():
+    rng = np.random.default_rng(3)
+    n = 100_003  # several blocks and a partial one
+    fij = rng.gamma(1.5, 10.0, n)
+    tij = fij * rng.lognormal(0.0, 0.3, n)
+    observed = fij + rng.normal(0.0, 5.0, n)
+    return fij, tij, observed
+
+
+def test_compute_metrics_matches_direct_formulas(flows):
+    fij, tij, observed = flows
+    result = compute_metrics(fij, tij, list(METRICS), observed=observed)
+    p = fij / (fij.sum() + 1e-15)
+    q = tij / (tij.sum() + 1e-15)
+    assert result["cross_entropy"] == pytest.approx(-np.sum(p * np.log(q + 1e-15)))
+    assert result["rmse"] == pytest.approx(np.sqrt(np.mean((fij - tij) ** 2)))
+    assert result["mse"] == pytest.approx(np.mean((fij - tij) ** 2))
+    assert result["mae"] == pytest.approx(np.mean(np.abs(fij - tij)))
+    assert result["correlation"] == pytest.approx(pearsonr(fij, tij)[0])
+    assert result["fij_flow_correlation"] == pytest.approx(pearsonr(fij, observed)[0])
+    assert result["tij_flow_correlation"] == pytest.approx(pearsonr(tij, observed)[0])
+
+
+@pytest.mark.parametrize("normalize", [True, False])
+def test_merged_chunks_match_single_pass(flows, normalize):
+    fij, tij, observed = flows
+    metrics = list(METRICS)
+    expected = compute_metrics(
+        fij, tij, metrics, observed=observed, normalize=normalize
+    )
+
+    totals = (fij.sum(), tij.sum()) if normalize else (None, None)
+    bounds = [0, 17, 40_000, 40_001, 77_777, len(fij)]
+    merged = MetricAccumulator(metrics, normalize, *totals)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        chunk = MetricAccumulator(metrics, normalize, *totals)
+        chunk.update(fij[start:stop], tij[start:stop], observed[start:stop])
+        merged.merge(chunk)
+    result = merged.result()
+    for metric in metrics:
+        assert result[metric] == pytest.approx(expected[metric], rel=1e-12)
+
+
+def test_zero_flows_match_explicit_zeros(flows):
+    fij, tij, observed = flows
+    extra = np.random.default_rng(4).gamma(1.0, 3.0, 5000)
+    metrics = list(METRICS)
+    expected = compute_metrics(
+        np.concatenate([fij, np.zeros(len(extra))]),
+        np.concatenate([tij, np.zeros(len(extra))]),
+        metrics,
+        observed=np.concatenate([observed, extra]),
+    )
+    summary = (len(extra), extra.mean(), np.sum((extra - extra.mean()) ** 2))
+    result = compute_metrics(fij, tij, metrics, observed=observed, zero_flows=summary)
+    for metric in metrics:
+        assert result[metric] == pytest.approx(expected[metric], rel=1e-12)
+
+
+def test_flow_correlations_need_observed(flows):
+    fij, tij, _ = flows
+    result = compute_metrics(fij, tij, ["rmse", "fij_flow_correlation"])
+    assert set(result) == {"rmse"}
+
+
+def test_observed_flows_must_be_given_for_every_chunk(flows):
+    fij, tij, observed = flows
+    metrics = ["correlation", "fij_flow_correlation"]
+    accumulator = MetricAccumulator(metrics)
+    accumulator.update(fij[:10], tij[:10], observed[:10])
+    with pytest.raises(ValueError, match="earlier chunks but not for this one"):
+        accumulator.update(fij[10:], tij[10:])
+
+    accumulator = MetricAccumulator(metrics)
+    accumulator.update(fij[:10], tij[:10])
+    with pytest.raises(ValueError, match="not given for earlier chunks"):
+        accumulator.update(fij[10:], tij[10:], observed[10:])
+
+
+def test_dropping_observed_keeps_other_moments(flows):
+    fij, tij, _ = flows
+    metrics = ["correlation", "fij_flow_correlation"]
+    accumulator = MetricAccumulator(metrics)
+    accumulator.add_zero_flows((1000, 3.0, 50.0))
+    accumulator.update(fij, tij)
+    expected = compute_metrics(
+        np.concatenate([fij, np.zeros(1000)]),
+        np.concatenate([tij, np.zeros(1000)]),
+        ["correlation"],
+    )
+    assert accumulator.result() == pytest.approx(expected, rel=1e-12)
+
+
+def test_float32_is_accumulated_in_float64(flows):
+    fij, tij, _ = flows
+    metrics = ["rmse", "correlation"]
+    expected = compute_metrics(
+        fij.astype(np.float32).astype(np.float64),
+        tij.astype(np.float32).astype(np.float64),
+        metrics,
+    )
+    result = compute_metrics(fij.astype(np.float32), tij.astype(np.float32), metrics)
+    for metric in metrics:
+        assert result[metric] == pytest.approx(expected[metric], rel=1e-12)
@@ -0,0 +1,41 @@
+"""Process-pool evaluation gives the same results as serial evaluation."""
+
+import numpy as np
+import pandas as pd
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS
+
+
+def test_search_fij_parallel_matches_serial(model):
+    kwargs = dict(beta_range=(0.1, 1.5, 0.1), metrics=["cross_entropy", "rmse"])
+    serial = model.search_fij(n_jobs=1, **kwargs)
+    parallel = model.search_fij(n_jobs=2, **kwargs)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_search_fij_parallel_two_parameters(table):
+    model = R2SFCA(table, decay_function="gaussian", **COLUMNS)
+    kwargs = dict(beta_range=(0.5, 1.5, 0.5), param2_range=(20.0, 60.0, 20.0))
+    pd.testing.assert_frame_equal(
+        model.search_fij(n_jobs=2, **kwargs), model.search_fij(n_jobs=1, **kwargs)
+    )
+
+
+def test_bootstrap_does_not_depend_on_n_jobs(model):
+    kwargs = dict(n_boot=6, metric="cross_entropy", random_state=7)
+    serial = model.bootstrap_beta(n_jobs=1, **kwargs)
+    parallel = model.bootstrap_beta(n_jobs=2, **kwargs)
+    np.testing.assert_array_equal(parallel["betas"], serial["betas"])
+    assert parallel["ci_lower"] == serial["ci_lower"]
+    assert parallel["ci_upper"] == serial["ci_upper"]
+
+
+def test_compare_decay_functions_parallel_matches_serial(model):
+    kwargs = dict(decay_functions=["exponential", "power"], beta_range=(0.2, 1.0, 0.2))
+    serial_summary, serial = model.compare_decay_functions(n_jobs=1, **kwargs)
+    parallel_summary, parallel = model.compare_decay_functions(n_jobs=2, **kwargs)
+    pd.testing.assert_frame_equal(parallel_summary, serial_summary)
+    for name in serial:
+        pd.testing.assert_frame_equal(parallel[name], serial[name])
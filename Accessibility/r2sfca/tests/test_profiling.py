@@ -0,0 +1,67 @@
+"""Opt-in profiling of the computation stages."""
+
+import json
+
+import pandas as pd
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS
+
+
+def test_profiling_leaves_results_unchanged(table, model):
+    profiled = R2SFCA(table, **COLUMNS)
+    profiled.enable_profiling()
+
+    fit = profiled.solve_beta("rmse")
+    assert fit["optimal_beta"] == model.solve_beta("rmse")["optimal_beta"]
+    grid = profiled.search_fij((0.0, 1.0, 0.1), metrics=["rmse", "correlation"])
+    expected = model.search_fij((0.0, 1.0, 0.1), metrics=["rmse", "correlation"])
+    pd.testing.assert_frame_equal(grid, expected)
+
+
+def test_report_counts_stages_and_evaluations(model):
+    model.enable_profiling()
+    grid = model.search_fij((0.0, 1.0, 0.1), metrics=["rmse"])
+    search_report = grid.attrs["profile"]
+    assert search_report["objective_evaluations"] == len(grid)
+    assert search_report["stages"]["search_fij"]["calls"] == 1
+
+    fit = model.solve_beta("rmse")
+    fit_report = fit["profile"]
+    assert fit_report["objective_evaluations"] > 0
+    assert {"solve_beta", "dist_decay", "metrics"} <= set(fit_report["stages"])
+
+    report = model.profile_report()
+    assert report["objective_evaluations"] == (
+        search_report["objective_evaluations"] + fit_report["objective_evaluations"]
+    )
+    assert report["track_memory"] is False
+    for stage in report["stages"].values():
+        assert stage["calls"] > 0
+        assert stage["total_s"] >= stage["self_s"] >= 0
+        assert stage["bytes"] is None
+
+    frame = report.to_frame()
+    assert frame.index.name == "stage"
+    assert frame["self_s"].is_monotonic_decreasing
+    assert json.loads(report.to_json()) == json.loads(json.dumps(report))
+
+
+def test_memory_tracking_records_bytes(model):
+    model.enable_profiling(track_memory=True)
+    try:
+        model.fij(0.5)
+        stage = model.profile_report()["stages"]["fij"]
+    finally:
+        model.disable_profiling()
+    assert stage["bytes"] >= model.fij(0.5).nbytes
+
+
+def test_disable_profiling_restores_methods(model):
+    model.enable_profiling()
+    assert "solve_beta" in vars(model)
+    model.disable_profiling()
+    assert "solve_beta" not in vars(model)
+    assert model.profile_report() is None
+    assert "profile" not in model.solve_beta("rmse")
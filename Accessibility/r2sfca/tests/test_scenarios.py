@@ -0,0 +1,83 @@
+"""Batched scenario scores against models rebuilt per scenario."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS, make_table
+
+
+def rebuilt_scores(table, beta, column, values):
+    """Scores of a model whose ``column`` is replaced per location ID."""
+    id_col = "SupplyID" if column == "Supply" else "DemandID"
+    scenario = table.assign(**{column: table[id_col].map(values)})
+    return R2SFCA(scenario, **COLUMNS).scores(beta)
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_supply_scenarios_match_rebuilt_models(shuffle):
+    table = make_table(shuffle=shuffle)
+    model = R2SFCA(table, **COLUMNS)
+    ids = model.supply_id_values
+    baseline = table.groupby("SupplyID")["Supply"].first().loc[ids]
+
+    expanded = baseline.copy()
+    expanded.iloc[0] *= 2.0
+    closed = baseline.copy()
+    closed.iloc[1] = 0.0
+    scenarios = pd.DataFrame(
+        {"baseline": baseline, "expanded": expanded, "closed": closed}
+    )
+    beta = 0.3
+    access, crowd = model.scenario_scores(beta, supply=scenarios)
+
+    assert list(access.columns) == list(scenarios.columns)
+    for name in scenarios:
+        expected_access, expected_crowd = rebuilt_scores(
+            table, beta, "Supply", scenarios[name]
+        )
+        np.testing.assert_allclose(
+            access[name], expected_access.loc[access.index], rtol=1e-12
+        )
+        np.testing.assert_allclose(
+            crowd[name], expected_crowd.loc[crowd.index], rtol=1e-12
+        )
+
+
+def test_demand_scenarios_from_array(table, model):
+    ids = model.demand_id_values
+    baseline = table.groupby("DemandID")["Demand"].first().loc[ids].to_numpy()
+    demand = np.column_stack([baseline, baseline * np.linspace(0.5, 1.5, len(ids))])
+    beta = 0.5
+    access, crowd = model.scenario_scores(beta, demand=demand)
+
+    assert list(access.columns) == [0, 1]
+    for k in range(demand.shape[1]):
+        expected_access, expected_crowd = rebuilt_scores(
+            table, beta, "Demand", pd.Series(demand[:, k], index=ids)
+        )
+        np.testing.assert_allclose(access[k], expected_access.loc[access.index])
+        np.testing.assert_allclose(crowd[k], expected_crowd.loc[crowd.index])
+
+
+def test_default_scenario_is_baseline(model):
+    access, crowd = model.scenario_scores(0.4)
+    expected_access, expected_crowd = model.scores(0.4)
+    np.testing.assert_allclose(access[0], expected_access.loc[access.index])
+    np.testing.assert_allclose(crowd[0], expected_crowd.loc[crowd.index])
+
+
+def test_invalid_scenarios(model):
+    n_supply = len(model.supply_id_values)
+    n_demand = len(model.demand_id_values)
+    with pytest.raises(ValueError, match="shape"):
+        model.scenario_scores(0.4, supply=np.ones((n_supply + 1, 2)))
+    with pytest.raises(ValueError, match="scenarios, expected"):
+        model.scenario_scores(
+            0.4, supply=np.ones((n_supply, 2)), demand=np.ones((n_demand, 3))
+        )
+    partial = pd.Series(1.0, index=model.supply_id_values[1:])
+    with pytest.raises(ValueError, match="miss 1 location IDs"):
+        model.scenario_scores(0.4, supply=partial)
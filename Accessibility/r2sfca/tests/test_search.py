@@ -0,0 +1,64 @@
+"""Adaptive coarse-to-fine search against the full grid."""
+
+import numpy as np
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS
+
+
+@pytest.mark.parametrize(
+    "decay_function, beta_range, param2_range, metric",
+    [
+        ("exponential", (0.0, 0.5, 0.005), None, "cross_entropy"),
+        ("exponential", (0.0, 0.5, 0.005), None, "fij_flow_correlation"),
+        ("sigmoid", (0.1, 3.0, 0.05), (0.05, 1.0, 0.05), "rmse"),
+    ],
+)
+def test_adaptive_finds_grid_optimum(
+    table, decay_function, beta_range, param2_range, metric
+):
+    model = R2SFCA(table, decay_function=decay_function, **COLUMNS)
+    grid = model.search_fij(beta_range, param2_range, metrics=[metric])
+    adaptive = model.search_fij(
+        beta_range, param2_range, metrics=[metric], strategy="adaptive"
+    )
+
+    sign = -1.0 if metric.endswith("correlation") else 1.0
+    grid_best = grid.loc[(sign * grid[metric]).idxmin()]
+    adaptive_best = adaptive.loc[(sign * adaptive[metric]).idxmin()]
+    assert abs(adaptive_best["beta"] - grid_best["beta"]) <= beta_range[2]
+    assert adaptive_best[metric] == pytest.approx(grid_best[metric], rel=1e-3)
+    assert len(adaptive) < len(grid)
+
+
+def test_adaptive_returns_evaluated_points(table):
+    model = R2SFCA(table, decay_function="sigmoid", **COLUMNS)
+    adaptive = model.search_fij(
+        (0.1, 3.0, 0.05),
+        (0.05, 1.0, 0.05),
+        metrics=["rmse"],
+        strategy="adaptive",
+        target_metric="correlation",
+    )
+
+    assert list(adaptive.columns) == [
+        "beta",
+        "param2",
+        "decay_function",
+        "rmse",
+        "correlation",
+    ]
+    points = adaptive[["beta", "param2"]].to_numpy()
+    assert len(np.unique(points, axis=0)) == len(points)
+    assert (np.diff(points[:, 0]) >= 0).all()
+    assert points[:, 0].min() >= 0.1 and points[:, 0].max() <= 3.0 + 1e-12
+    assert points[:, 1].min() >= 0.05 and points[:, 1].max() <= 1.0 + 1e-12
+
+    # Every returned row is the metric at that point
+    beta, param2 = points[len(points) // 2]
+    expected = model.search_fij(beta, (param2, param2 + 1.0, 1.0), metrics=["rmse"])
+    assert adaptive["rmse"].iloc[len(points) // 2] == pytest.approx(
+        expected["rmse"].iloc[0]
+    )
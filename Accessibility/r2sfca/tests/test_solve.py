@@ -0,0 +1,49 @@
+"""Joint two-parameter fits with solve_params."""
+
+import numpy as np
+import pytest
+
+from r2sfca import R2SFCA
+
+from conftest import COLUMNS
+
+GRIDS = {
+    "gaussian": ((0.1, 3.0, 0.1), (10.0, 60.0, 5.0)),
+    "sigmoid": ((0.1, 3.0, 0.1), (0.05, 1.0, 0.05)),
+}
+
+
+@pytest.mark.parametrize("decay_function", ["gaussian", "sigmoid"])
+def test_joint_fit_improves_on_grid(table, decay_function):
+    model = R2SFCA(table, decay_function=decay_function, **COLUMNS)
+    beta_range, param2_range = GRIDS[decay_function]
+    grid = model.search_fij(beta_range, param2_range, metrics=["rmse"])
+    best = grid.loc[grid["rmse"].idxmin()]
+
+    bounds = [(0.001, 10.0), (0.01, 100.0)]
+    fit = model.solve_params("rmse", x0=(best["beta"], best["param2"]), bounds=bounds)
+
+    assert fit["optimization_success"]
+    assert np.isfinite([fit["optimal_beta"], fit["optimal_param2"]]).all()
+    for value, (low, high) in zip((fit["optimal_beta"], fit["optimal_param2"]), bounds):
+        assert low <= value <= high
+    assert fit["final_metrics"]["rmse"] <= best["rmse"] + 1e-9
+    assert fit["n_evaluations"] < len(grid)
+    assert model.fitted_params["beta"] == fit["optimal_beta"]
+    assert model.fitted_params["param2"] == fit["optimal_param2"]
+
+
+def test_analytic_and_numeric_joint_fit_agree(table):
+    model = R2SFCA(table, decay_function="sigmoid", **COLUMNS)
+    x0 = (2.5, 0.05)
+    analytic = model.solve_params("rmse", x0=x0, gradient="analytic")
+    numeric = model.solve_params("rmse", x0=x0, gradient="numeric")
+    assert analytic["optimal_beta"] == pytest.approx(numeric["optimal_beta"], rel=1e-3)
+    assert analytic["optimal_param2"] == pytest.approx(
+        numeric["optimal_param2"], rel=1e-3
+    )
+
+
+def test_one_parameter_decay_is_rejected(model):
+    with pytest.raises(ValueError, match="solve_beta"):
+        model.solve_params("rmse")
@@ -0,0 +1,70 @@
+"""Out-of-core StreamingR2SFCA against the in-memory model."""
+
+import numpy as np
+import pytest
+
+from r2sfca import R2SFCA, StreamingR2SFCA
+
+from conftest import COLUMNS, make_table
+
+METRICS = [
+    "cross_entropy",
+    "correlation",
+    "rmse",
+    "mse",
+    "mae",
+    "fij_flow_correlation",
+    "tij_flow_correlation",
+]
+
+
+@pytest.fixture
+def shuffled():
+    return make_table(shuffle=True)
+
+
+@pytest.fixture(params=["table.csv", "table.csv.gz"])
+def source(request, tmp_path, shuffled):
+    path = tmp_path / request.param
+    shuffled.to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("decay_function", ["exponential", "sigmoid"])
+def test_streaming_matches_in_memory(source, shuffled, decay_function):
+    model = R2SFCA(shuffled, decay_function=decay_function, **COLUMNS)
+    streaming = StreamingR2SFCA(
+        source, decay_function=decay_function, chunksize=97, **COLUMNS
+    )
+    beta = 0.4
+    assert streaming.n_pairs == len(shuffled)
+    if decay_function == "sigmoid":
+        assert streaming.median_travel_cost == pytest.approx(model.median_travel_cost)
+
+    np.testing.assert_allclose(streaming.fij(beta), model.fij(beta), rtol=1e-12)
+    np.testing.assert_allclose(streaming.tij(beta), model.tij(beta), rtol=1e-12)
+    access, crowd = streaming.scores(beta)
+    expected_access, expected_crowd = model.scores(beta)
+    np.testing.assert_allclose(access, expected_access.loc[access.index], rtol=1e-12)
+    np.testing.assert_allclose(crowd, expected_crowd.loc[crowd.index], rtol=1e-12)
+
+    for normalize in (True, False):
+        result = streaming.evaluate(beta, metrics=METRICS, normalize=normalize)
+        expected = model._evaluate(beta, None, METRICS, normalize=normalize)[0]
+        for metric in METRICS:
+            assert result[metric] == pytest.approx(expected[metric], rel=1e-9)
+
+
+def test_iter_flows_keeps_file_order(source, shuffled):
+    streaming = StreamingR2SFCA(source, chunksize=50, **COLUMNS)
+    chunks = list(streaming.iter_flows(0.3))
+    assert [len(chunk) for chunk in chunks[:-1]] == [50] * (len(chunks) - 1)
+    flows = np.concatenate([chunk["Fij"].to_numpy() for chunk in chunks])
+    ids = np.concatenate([chunk["DemandID"].to_numpy() for chunk in chunks])
+    np.testing.assert_array_equal(ids, shuffled["DemandID"])
+    np.testing.assert_allclose(flows, streaming.fij(0.3))
+
+
+def test_invalid_chunksize(source):
+    with pytest.raises(ValueError, match="chunksize"):
+        StreamingR2SFCA(source, chunksize=0, **COLUMNS)
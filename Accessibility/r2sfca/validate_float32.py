@@ -0,0 +1,104 @@
+"""
+Validate the float32 compute mode of the R2SFCA package against float64.
+
+For every decay function, this script fits beta on the shipped
+r2SFCA_data.csv.gz in both precisions and reports the differences in optimal
+beta, metrics and flows. It exits with status 1 if any difference exceeds
+the documented tolerances.
+
+Usage:
+    python validate_float32.py [path/to/r2SFCA_data.csv.gz]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from r2sfca import R2SFCA
+
+DEFAULT_DATA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "r2SFCA_data.csv.gz"
+)
+
+# Documented float32 tolerances (relative)
+BETA_RTOL = 1e-4
+METRIC_RTOL = 1e-5
+FLOW_RTOL = 1e-5
+
+DECAY_FUNCTIONS = [
+    "exponential",
+    "power",
+    "sigmoid",
+    "sqrt_exponential",
+    "gaussian",
+    "log_squared",
+]
+
+
+def relative_difference(a, b):
+    """Largest absolute difference relative to the largest magnitude of ``b``."""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    scale = np.max(np.abs(b))
+    return float(np.max(np.abs(a - b)) / scale) if scale > 0 else 0.0
+
+
+def fit(df, decay_function, dtype):
+    """Fit beta by cross-entropy and return the result and the elapsed time."""
+    model = R2SFCA(
+        df,
+        observed_flow_col="O_Fij",
+        decay_function=decay_function,
+        lean=True,
+        dtype=dtype,
+    )
+    start = time.perf_counter()
+    result = model.solve_beta(metric="cross_entropy", method="minimize")
+    return result, time.perf_counter() - start
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATA
+    df = pd.read_csv(path)
+    print(f"Loaded {len(df)} pairs from {path}\n")
+
+    header = f"{'decay':18s} {'beta64':>10s} {'beta32':>10s} {'d_beta':>9s} {'d_metric':>9s} {'d_flow':>9s} {'t64':>6s} {'t32':>6s}"
+    print(header)
+    print("-" * len(header))
+
+    all_ok = True
+    for decay_function in DECAY_FUNCTIONS:
+        result64, time64 = fit(df, decay_function, "float64")
+        result32, time32 = fit(df, decay_function, "float32")
+
+        d_beta = relative_difference(result32["optimal_beta"], result64["optimal_beta"])
+        d_metric = max(
+            relative_difference(
+                result32["final_metrics"][name], result64["final_metrics"][name]
+            )
+            for name in result64["final_metrics"]
+        )
+        d_flow = max(
+            relative_difference(result32["fij"], result64["fij"]),
+            relative_difference(result32["tij"], result64["tij"]),
+        )
+        ok = d_beta <= BETA_RTOL and d_metric <= METRIC_RTOL and d_flow <= FLOW_RTOL
+        all_ok &= ok
+
+        print(
+            f"{decay_function:18s} {result64['optimal_beta']:10.6f} "
+            f"{result32['optimal_beta']:10.6f} {d_beta:9.1e} {d_metric:9.1e} "
+            f"{d_flow:9.1e} {time64:6.2f} {time32:6.2f} {'OK' if ok else 'FAIL'}"
+        )
+
+    print(
+        f"\nTolerances: beta {BETA_RTOL:.0e}, metrics {METRIC_RTOL:.0e}, "
+        f"flows {FLOW_RTOL:.0e} (relative)"
+    )
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())